@@ -0,0 +1,318 @@
+"""
+Submission Bundles
+==================
+Packs reports into one archive for the registrar while they are being
+generated: each report is added as soon as it is written, read once from
+the page cache, hashed and compressed on the way into the archive. No staged
+copy is made, and closing the bundle after the last report only writes that
+report, the manifest and the archive directory.
+
+Formats, chosen by the file name:
+
+    .zip      members deflated in parallel by a thread pool (zlib releases
+              the GIL), then written in order; a member that does not shrink
+              (most PDF streams are already compressed) is stored
+    .tar.zst  a tar stream through zstandard's multi-threaded compressor
+              (pip install zstandard)
+
+Every bundle ends with manifest.json (semester, file, size, SHA-256) and
+SHA256SUMS, so the contents can be checked with `sha256sum -c SHA256SUMS`
+after unpacking.
+"""
+
+import hashlib
+import io
+import json
+import os
+import queue
+import struct
+import tarfile
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+from mooc_mappings import SEMESTER
+
+BUNDLE_FORMATS = (".zip", ".tar.zst")
+MANIFEST_NAME = "manifest.json"
+CHECKSUMS_NAME = "SHA256SUMS"
+ZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_CHUNK_SIZE = 1 << 20
+_DONE = object()
+
+
+class BundleError(ValueError):
+    """Raised for an unsupported bundle name or a failed bundle"""
+
+
+def bundle_format(path):
+    """".zip" or ".tar.zst" from a bundle file name"""
+    for suffix in BUNDLE_FORMATS:
+        if path.lower().endswith(suffix):
+            return suffix
+    raise BundleError(f"{path}: bundle name must end in {' or '.join(BUNDLE_FORMATS)}")
+
+
+def zstandard_available():
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def open_bundle(path, workers=None, level=None):
+    """Start writing a ZIP or tar.zst bundle at path"""
+    if bundle_format(path) == ".zip":
+        return ZipBundle(path, workers, level)
+    return TarZstBundle(path, workers, level)
+
+
+class Bundle:
+    """Archive that files are streamed into from any thread; close() adds the manifest"""
+
+    def __init__(self, path, workers=None, level=None):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.level = level
+        self.entries = []
+        self.bytes_in = 0
+        self._names = set()
+        self._lock = threading.Lock()
+        self._error = None
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._start()
+        # Bounded, so a slow disk holds back the producers instead of filling memory
+        self._queue = queue.Queue(maxsize=2 * self.workers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, path, arcname):
+        """Queue a file for the archive (a name already added is ignored)"""
+        with self._lock:
+            if arcname in self._names:
+                return
+            self._names.add(arcname)
+        self._queue.put((arcname, self._prepare(path)))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is not None:
+                continue  # keep draining so producers never block on a failed bundle
+            try:
+                self._record(*self._store(*item))
+            except Exception as e:
+                self._error = e
+
+    def _record(self, arcname, size, sha256):
+        self.entries.append({"file": arcname, "size": size, "sha256": sha256})
+        self.bytes_in += size
+
+    def close(self):
+        """Finish the archive: wait for queued files, add manifest.json and SHA256SUMS; returns the manifest"""
+        self._queue.put(_DONE)
+        self._thread.join()
+        try:
+            if self._error is not None:
+                raise BundleError(f"{self.path}: {self._error}") from self._error
+            manifest = {
+                "semester": SEMESTER,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "files": self.entries,
+            }
+            checksums = "".join(f"{e['sha256']}  {e['file']}\n" for e in self.entries)
+            self._store_bytes(MANIFEST_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+            self._store_bytes(CHECKSUMS_NAME, checksums.encode("utf-8"))
+            self._finish()
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+            return manifest
+        finally:
+            self._shutdown()
+            self._file.close()
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def abort(self):
+        """Stop and remove the partial archive"""
+        self._error = self._error or BundleError("aborted")
+        try:
+            self.close()
+        except BundleError:
+            pass
+
+    # Format hooks
+    def _start(self):
+        pass
+
+    def _prepare(self, path):
+        """Called in the producer's thread; the result is passed to _store in the writer thread"""
+        return path
+
+    def _store(self, arcname, prepared):
+        """Write one queued member; returns (arcname, size, sha256)"""
+        raise NotImplementedError
+
+    def _store_bytes(self, arcname, data):
+        """Write a generated member (manifest) from the closing thread; not listed in the manifest"""
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def _shutdown(self):
+        pass
+
+
+def _dos_time(timestamp):
+    """(time, date) fields of a ZIP entry"""
+    t = time.localtime(timestamp)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+def _zip_member(chunks, level, mtime):
+    """Hash and deflate data given as chunks: (size, crc32, sha256, method, data, mtime)"""
+    sha, crc, size, raw, packed = hashlib.sha256(), 0, 0, [], []
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if level else None
+    for chunk in chunks:
+        sha.update(chunk)
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        raw.append(chunk)
+        if compressor:
+            packed.append(compressor.compress(chunk))
+    if compressor:
+        packed.append(compressor.flush())
+        data = b"".join(packed)
+        if len(data) < size:
+            return size, crc, sha.hexdigest(), 8, data, mtime
+    return size, crc, sha.hexdigest(), 0, b"".join(raw), mtime
+
+
+def _read_zip_member(path, level):
+    with open(path, "rb") as f:
+        mtime = os.fstat(f.fileno()).st_mtime
+        return _zip_member(iter(lambda: f.read(_CHUNK_SIZE), b""), level, mtime)
+
+
+class ZipBundle(Bundle):
+    """ZIP bundle; members are read, hashed and deflated by a thread pool
+
+    Written without ZIP64, so the archive and each member stay below 4 GiB.
+    """
+
+    def _start(self):
+        self.level = ZIP_LEVEL if self.level is None else self.level
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._central = []
+        self._offset = 0
+
+    def _prepare(self, path):
+        return self._pool.submit(_read_zip_member, path, self.level)
+
+    def _store(self, arcname, prepared):
+        member = prepared.result() if isinstance(prepared, Future) else prepared
+        size, crc, sha256, method, data, mtime = member
+        name = arcname.replace(os.sep, "/").encode("utf-8")
+        if self._offset + len(data) + 30 + len(name) >= 1 << 32:
+            raise BundleError("ZIP bundles are limited to 4 GiB, use .tar.zst")
+        mod_time, mod_date = _dos_time(mtime)
+        fields = (0x800, method, mod_time, mod_date, crc, len(data), size, len(name))
+        self._file.write(struct.pack("<I5H3I2H", 0x04034B50, 20, *fields[:4], *fields[4:], 0) + name)
+        self._file.write(data)
+        self._central.append((fields, name, self._offset))
+        self._offset += 30 + len(name) + len(data)
+        return arcname, size, sha256
+
+    def _store_bytes(self, arcname, data):
+        self._store(arcname, _zip_member([data], self.level, time.time()))
+
+    def _finish(self):
+        start = self._offset
+        for fields, name, offset in self._central:
+            self._file.write(struct.pack("<I6H3I5H2I", 0x02014B50, (3 << 8) | 20, 20, *fields[:4],
+                                         *fields[4:], 0, 0, 0, 0, 0o100644 << 16, offset) + name)
+        size = self._file.tell() - start
+        count = len(self._central)
+        if count > 0xFFFF:
+            raise BundleError("ZIP bundles are limited to 65535 files, use .tar.zst")
+        self._file.write(struct.pack("<I4H2IH", 0x06054B50, 0, 0, count, count, size, start, 0))
+
+    def _shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class _HashingReader:
+    """File wrapper that hashes what tarfile reads from it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.sha.update(data)
+        return data
+
+
+class TarZstBundle(Bundle):
+    """tar.zst bundle; zstandard compresses on its own worker threads"""
+
+    def _start(self):
+        try:
+            import zstandard
+        except ImportError:
+            self._file.close()
+            os.remove(self._tmp_path)
+            raise BundleError(".tar.zst bundles need zstandard (pip install zstandard)")
+        self.level = ZSTD_LEVEL if self.level is None else self.level
+        compressor = zstandard.ZstdCompressor(level=self.level, threads=self.workers if self.workers > 1 else 0)
+        self._zst = compressor.stream_writer(self._file, closefd=False)
+        self._tar = tarfile.open(fileobj=self._zst, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def _tarinfo(self, arcname, size, mtime):
+        info = tarfile.TarInfo(arcname.replace(os.sep, "/"))
+        info.size, info.mtime, info.mode = size, int(mtime), 0o644
+        return info
+
+    def _store(self, arcname, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            reader = _HashingReader(f)
+            self._tar.addfile(self._tarinfo(arcname, stat.st_size, stat.st_mtime), reader)
+        return arcname, stat.st_size, reader.sha.hexdigest()
+
+    def _store_bytes(self, arcname, data):
+        self._tar.addfile(self._tarinfo(arcname, len(data), time.time()), io.BytesIO(data))
+
+    def _finish(self):
+        self._tar.close()
+        self._zst.close()
+
+
+def folder_files(folder):
+    """(path, archive name) of the files under folder, named <folder name>/<relative path>
+
+    Hidden files (.checkpoint.jsonl, ...) and unfinished *.tmp files are skipped.
+    """
+    base = os.path.basename(os.path.normpath(folder))
+    files = []
+    for root, dirs, names in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            if name.startswith(".") or name.endswith(".tmp"):
+                continue
+            path = os.path.join(root, name)
+            files.append((path, os.path.join(base, os.path.relpath(path, folder))))
+    return files
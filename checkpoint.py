@@ -0,0 +1,64 @@
+"""
+Checkpoint Journal for Resumable Runs
+=====================================
+An append-only JSON-lines journal in the output folder recording every report
+that was written successfully, together with the digest of its inputs.
+
+A run started with --resume skips each mapping whose last journal entry has
+the same input digest and whose report file is still present, so a crashed
+department-wide run continues from the last good report.
+"""
+
+import json
+import os
+from datetime import datetime
+
+JOURNAL_NAME = ".checkpoint.jsonl"
+
+
+class CheckpointJournal:
+    """Journal of completed reports for one output folder"""
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, JOURNAL_NAME)
+        self._torn_tail = False
+        self.entries = self._load()
+
+    def _load(self):
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            content = f.read()
+        self._torn_tail = bool(content) and not content.endswith("\n")
+        for line in content.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # line torn by a crash mid-write
+            entries[entry["ktu_code"]] = entry
+        return entries
+
+    def is_done(self, ktu_code, digest):
+        """True if the report was completed from identical inputs and still exists"""
+        entry = self.entries.get(ktu_code)
+        return (entry is not None and entry["input_digest"] == digest
+                and os.path.exists(os.path.join(self.output_folder, entry["output"])))
+
+    def record(self, ktu_code, digest, output_path):
+        """Append a completed report to the journal (flushed to disk immediately)"""
+        entry = {
+            "ktu_code": ktu_code,
+            "input_digest": digest,
+            "output": os.path.basename(output_path),
+            "completed": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._torn_tail:
+                f.write("\n")
+                self._torn_tail = False
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[ktu_code] = entry
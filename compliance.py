@@ -0,0 +1,130 @@
+"""
+KTU Regulations Section 17 Compliance Rules
+===========================================
+Declarative checks of each mapping against the MOOC rules of the KTU B.Tech
+Regulations 2024:
+
+    R 17.1  Approved agency       NPTEL / SWAYAM course URL
+    R 17.2  Minimum duration      nptel_duration >= 8 weeks
+    R 17.3  Examination mode      proctored end semester examination
+    R 17.4  Content overlap       mean of the comparison rows >= 70%
+
+A rule is a dict naming the check, the mapping field it reads and its limit;
+evaluate() runs all rules over a whole mapping set in one pass (no PDF is
+opened), so it is cheap enough to gate every build. The results drive the
+tick/cross column of the report front page and the non-compliance report.
+
+Result record:
+    {"rule": "R 17.2", "label": "Minimum Duration", "passed": True,
+     "value": 12, "text": "12 Weeks >= 8 Weeks"}
+"""
+
+import re
+
+from mooc_mappings import MAPPINGS
+
+APPROVED_HOSTS = ("nptel.ac.in", "swayam.gov.in")
+MIN_WEEKS = 8
+MIN_OVERLAP = 70
+
+RULES = [
+    {"rule": "R 17.1", "label": "Approved Agency", "check": "approved_host", "field": "nptel_url",
+     "allowed": APPROVED_HOSTS},
+    {"rule": "R 17.2", "label": "Minimum Duration", "check": "min_weeks", "field": "nptel_duration",
+     "minimum": MIN_WEEKS},
+    {"rule": "R 17.3", "label": "Examination Mode", "check": "one_of", "field": "exam_mode",
+     "allowed": ("Proctored",)},
+    {"rule": "R 17.4", "label": "Content Overlap", "check": "min_overlap", "field": "comparison",
+     "minimum": MIN_OVERLAP},
+]
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_URL_HOST = re.compile(r"^\w+://([^/:?#]+)")
+_WEEKS = re.compile(r"(\d+)\s*weeks?", re.IGNORECASE)
+
+
+def parse_weeks(duration):
+    """Weeks in a duration such as "12 Weeks (52 lectures)", or None"""
+    match = _WEEKS.search(duration or "")
+    return int(match.group(1)) if match else None
+
+
+def row_percents(mapping):
+    """Match percentages given by the comparison rows"""
+    percents = []
+    for row in mapping.get("comparison") or []:
+        match = _NUMBER.search(str(row[2])) if len(row) > 2 else None
+        if match:
+            percents.append(float(match.group()))
+    return percents
+
+
+def computed_overlap(mapping):
+    """Mean match percentage of the comparison rows (typed overlap_percentage if there are none)"""
+    percents = row_percents(mapping)
+    if percents:
+        return round(sum(percents) / len(percents), 1)
+    match = _NUMBER.search(str(mapping.get("overlap_percentage", "")))
+    return float(match.group()) if match else None
+
+
+def _approved_host(rule, mapping):
+    match = _URL_HOST.match(mapping.get(rule["field"]) or "")
+    host = match.group(1).lower() if match else ""
+    passed = any(host == h or host.endswith("." + h) for h in rule["allowed"])
+    return passed, host, f"{host or 'no course URL'} ({'AICTE/UGC Approved' if passed else 'not an approved agency'})"
+
+
+def _min_weeks(rule, mapping):
+    weeks = parse_weeks(mapping.get(rule["field"]))
+    passed = weeks is not None and weeks >= rule["minimum"]
+    return passed, weeks, f"{mapping.get(rule['field']) or 'unknown'} {'>=' if passed else '<'} {rule['minimum']} Weeks"
+
+
+def _one_of(rule, mapping):
+    # A value the mapping does not record is unknown, which fails the rule
+    value = mapping.get(rule["field"])
+    if not value:
+        return False, None, f"{rule['field']} not recorded (must be {' or '.join(rule['allowed'])})"
+    passed = value in rule["allowed"]
+    return passed, value, f"{value} End Semester Examination"
+
+
+def _min_overlap(rule, mapping):
+    overlap = computed_overlap(mapping)
+    passed = overlap is not None and overlap >= rule["minimum"]
+    shown = "unknown" if overlap is None else f"{overlap:g}%"
+    return passed, overlap, f"{shown} {'>=' if passed else '<'} {rule['minimum']}%"
+
+
+_CHECKS = {
+    "approved_host": _approved_host,
+    "min_weeks": _min_weeks,
+    "one_of": _one_of,
+    "min_overlap": _min_overlap,
+}
+
+
+def check_mapping(mapping, rules=RULES):
+    """Results of all rules for one mapping"""
+    results = []
+    for rule in rules:
+        passed, value, text = _CHECKS[rule["check"]](rule, mapping)
+        results.append({"rule": rule["rule"], "label": rule["label"], "passed": passed,
+                        "value": value, "text": text})
+    return results
+
+
+def evaluate(mappings=None, rules=RULES):
+    """Run the rules over a mapping set in one pass: {ktu_code: [results]}"""
+    return {m["ktu_code"]: check_mapping(m, rules) for m in (MAPPINGS if mappings is None else mappings)}
+
+
+def failures(results):
+    """Only the non-compliant mappings and their failed rules: {ktu_code: [results]}"""
+    failed = {}
+    for code, checks in results.items():
+        bad = [r for r in checks if not r["passed"]]
+        if bad:
+            failed[code] = bad
+    return failed
@@ -0,0 +1,303 @@
+"""
+NPTEL Catalog Index
+===================
+Extracts the course tables of the two catalog PDFs into an indexed SQLite
+store (.mooc_cache/catalog.sqlite):
+
+- "NPTEL Courses.pdf": one table per page (S.No., Discipline Name,
+  Subject ID, Subject Name, Institute, Content Type, Coordinator Name)
+  -> table nptel_courses
+- "Final Course List (Jan - Apr 2026)(1).pdf": a printed spreadsheet. Each
+  sheet is printed as several groups of pages, every group carrying a few of
+  the columns for the same rows. Rows are stitched back together by page
+  offset within the group and row position -> table offerings
+
+Both tables are indexed on course ID, subject ID, institute and discipline,
+so lookups by nptel_id / nptel_subject_id are single index probes. Pages
+are extracted in parallel processes; a catalog whose file digest is
+unchanged is not extracted again.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from mooc_cache import CACHE_DIR, file_digest
+from mooc_mappings import get_file_path
+
+NPTEL_COURSES_PDF = "NPTEL Courses.pdf"
+FINAL_COURSE_LIST_PDF = "Final Course List (Jan - Apr 2026)(1).pdf"
+CATALOG_DB = os.path.join(CACHE_DIR, "catalog.sqlite")
+
+_PAGES_PER_TASK = 25
+_SUBJECT_ID = re.compile(r"\b\d{9}\b")
+_COURSE_ID = re.compile(r"^noc\d{2}[-_][a-z]{2}\d+$", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    file TEXT PRIMARY KEY, sha256 TEXT, rows INTEGER, built TEXT
+);
+CREATE TABLE IF NOT EXISTS nptel_courses (
+    subject_id TEXT, subject_name TEXT, discipline TEXT, institute TEXT,
+    content_type TEXT, coordinators TEXT, page INTEGER
+);
+CREATE INDEX IF NOT EXISTS nptel_courses_subject ON nptel_courses (subject_id);
+CREATE INDEX IF NOT EXISTS nptel_courses_institute ON nptel_courses (institute);
+CREATE INDEX IF NOT EXISTS nptel_courses_discipline ON nptel_courses (discipline);
+CREATE TABLE IF NOT EXISTS offerings (
+    course_id TEXT, subject_id TEXT, course_name TEXT, discipline TEXT,
+    institute TEXT, coordinators TEXT, duration TEXT, start_date TEXT,
+    end_date TEXT, exam_date TEXT, url TEXT, sheet INTEGER, data TEXT
+);
+CREATE INDEX IF NOT EXISTS offerings_course ON offerings (course_id);
+CREATE INDEX IF NOT EXISTS offerings_subject ON offerings (subject_id);
+CREATE INDEX IF NOT EXISTS offerings_institute ON offerings (institute);
+CREATE INDEX IF NOT EXISTS offerings_discipline ON offerings (discipline);
+"""
+
+
+def normalize_course_id(course_id):
+    """noc26-ee31 / NOC26_EE31 -> noc26_ee31 (the form used in MAPPINGS)"""
+    return course_id.strip().lower().replace("-", "_")
+
+
+def _cell(value):
+    value = value or ""
+    if "http" in value:
+        # Links wrap inside the cell and lose their underscore: "noc26 ae01", "126105\n548"
+        value = re.sub(r"(noc\d{2}) ", r"\1_", value.replace("\n", "").strip(" _"))
+    return re.sub(r"\s+", " ", value).strip(" _")
+
+
+def _column_name(header):
+    # Overprinted glyphs leave stray letters in front of some headers ("p p NPTEL URL")
+    return re.sub(r"^(?:[a-z] )+", "", header)
+
+
+def _extract_page_tables(task):
+    """Worker: table rows of pages [start, stop) -> [(page_no, [[cells]])]"""
+    import fitz  # PyMuPDF
+
+    path, start, stop = task
+    result = []
+    with fitz.open(path) as doc:
+        for page_no in range(start, stop):
+            rows = []
+            for table in doc[page_no].find_tables().tables:
+                rows.extend(table.extract())
+            result.append((page_no, rows))
+    return result
+
+
+def extract_tables(path, workers=None):
+    """Table rows of every page of a PDF, extracted in parallel: [rows per page]"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        page_count = doc.page_count
+    tasks = [(path, start, min(start + _PAGES_PER_TASK, page_count))
+             for start in range(0, page_count, _PAGES_PER_TASK)]
+    pages = [None] * page_count
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_extract_page_tables, tasks):
+            for page_no, rows in chunk:
+                pages[page_no] = rows
+    return pages
+
+
+def parse_nptel_courses(pages):
+    """Rows of NPTEL Courses.pdf as dicts"""
+    courses = []
+    for page_no, rows in enumerate(pages):
+        for row in rows:
+            cells = [_cell(c) for c in row]
+            if len(cells) < 7:
+                continue
+            if _SUBJECT_ID.fullmatch(cells[2]):
+                courses.append({
+                    "subject_id": cells[2], "discipline": cells[1], "subject_name": cells[3],
+                    "institute": cells[4], "content_type": cells[5], "coordinators": cells[6],
+                    "page": page_no,
+                })
+            elif courses and not cells[0] and not cells[2]:
+                # Row broken across a page: continue the previous one
+                previous = courses[-1]
+                for key, value in (("subject_name", cells[3]), ("coordinators", cells[6])):
+                    if value:
+                        previous[key] = f"{previous[key]} {value}"
+    return courses
+
+
+def _is_data_row(cells):
+    return len(cells) >= 2 and cells[0].isdigit() and _COURSE_ID.match(cells[1])
+
+
+def stitch_sheets(pages):
+    """Re-assemble spreadsheet rows printed as groups of column pages
+
+    A sheet starts at a page containing the "S NO | Course ID" header. Its
+    first group of pages holds the leading columns; the group size is the
+    number of consecutive pages with data rows. Page j of every later group
+    holds further columns of the same rows, aligned at the bottom of the
+    page (only the first page of a group carries banner rows above the
+    header). Returns a list of (sheet_no, {column: value}) rows.
+    """
+    starts = [n for n, rows in enumerate(pages)
+              if any(_cell(r[0]).upper() == "S NO" for r in rows if r)]
+    result = []
+    for sheet_no, start in enumerate(starts):
+        end = starts[sheet_no + 1] if sheet_no + 1 < len(starts) else len(pages)
+        group_size = 0
+        while start + group_size < end and any(
+                _is_data_row([_cell(c) for c in r]) for r in pages[start + group_size]):
+            group_size += 1
+        if not group_size:
+            continue
+
+        data_counts = [sum(1 for r in pages[start + j] if _is_data_row([_cell(c) for c in r]))
+                       for j in range(group_size)]
+        groups = range(0, (end - start) // group_size)
+        headers = []
+        for k in groups:
+            first_rows = pages[start + k * group_size]
+            header_index = len(first_rows) - data_counts[0] - 1
+            header = [_column_name(_cell(c)) for c in first_rows[header_index]] if header_index >= 0 else []
+            headers.append(header)
+
+        for j in range(group_size):
+            rows = [{} for _ in range(data_counts[j])]
+            for k in groups:
+                page_rows = pages[start + k * group_size + j]
+                if len(page_rows) < data_counts[j]:
+                    continue
+                tail = page_rows[len(page_rows) - data_counts[j]:]
+                for row, cells in zip(rows, tail):
+                    for idx, value in enumerate(cells):
+                        name = headers[k][idx] if idx < len(headers[k]) and headers[k][idx] else f"column {k}.{idx}"
+                        key, repeat = name, 2
+                        while key in row:
+                            key, repeat = f"{name} ({repeat})", repeat + 1
+                        row[key] = _cell(value)
+            result.extend((sheet_no, row) for row in rows)
+    return result
+
+
+def _first(row, *names):
+    for name in names:
+        for key, value in row.items():
+            if key.lower().startswith(name.lower()) and value:
+                return value
+    return ""
+
+
+def parse_offerings(pages):
+    """Rows of the final course list as offering dicts"""
+    offerings = []
+    for sheet_no, row in stitch_sheets(pages):
+        text = " ".join(row.values())
+        subject = re.search(r"nptel\.ac\.in/courses/(\d{9})", text)
+        url = re.search(r"https://onlinecourses\.nptel\.ac\.in/noc\d{2}_\w+/\w+", text)
+        offerings.append({
+            "course_id": normalize_course_id(row.get("Course ID", "")),
+            "subject_id": subject.group(1) if subject else "",
+            "course_name": _first(row, "Course Name"),
+            "discipline": row.get("Discipline", ""),
+            "institute": _first(row, "Institute"),
+            "coordinators": _first(row, "SME Name", "Coordinator"),
+            "duration": _first(row, "Duration"),
+            "start_date": _first(row, "Start date"),
+            "end_date": _first(row, "End date"),
+            "exam_date": _first(row, "Exam date"),
+            "url": url.group(0) if url else "",
+            "sheet": sheet_no,
+            "data": json.dumps(row, ensure_ascii=False),
+        })
+    return offerings
+
+
+def connect(db_path=CATALOG_DB):
+    """Open the catalog store, creating the schema if needed"""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _replace_rows(conn, table, filename, digest, rows):
+    with conn:
+        conn.execute(f"DELETE FROM {table}")
+        if rows:
+            columns = list(rows[0])
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [tuple(row[c] for c in columns) for row in rows])
+        conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                     (filename, digest, len(rows), datetime.now().isoformat(timespec="seconds")))
+
+
+def build_catalog(db_path=CATALOG_DB, nptel_pdf=NPTEL_COURSES_PDF,
+                  course_list_pdf=FINAL_COURSE_LIST_PDF, workers=None, force=False):
+    """(Re)build the catalog store; returns {file: row count or None if unchanged}"""
+    conn = connect(db_path)
+    built = {}
+    for filename, table, parse in ((nptel_pdf, "nptel_courses", parse_nptel_courses),
+                                   (course_list_pdf, "offerings", parse_offerings)):
+        path = get_file_path(filename)
+        digest = file_digest(path)
+        known = conn.execute("SELECT sha256 FROM sources WHERE file = ?", (filename,)).fetchone()
+        if known and known["sha256"] == digest and not force:
+            built[filename] = None
+            continue
+        rows = parse(extract_tables(path, workers))
+        _replace_rows(conn, table, filename, digest, rows)
+        built[filename] = len(rows)
+    conn.close()
+    return built
+
+
+def lookup(conn, key):
+    """Catalog rows for a course ID (noc26_ee31) or subject ID (108103174)
+
+    Returns (nptel_courses rows, offerings rows). Offerings come main sheet
+    first; the later sheets repeat courses with narrower, truncated columns.
+    """
+    key = key.strip()
+    if _SUBJECT_ID.fullmatch(key):
+        courses = conn.execute("SELECT * FROM nptel_courses WHERE subject_id = ?", (key,)).fetchall()
+        offerings = conn.execute("SELECT * FROM offerings WHERE subject_id = ? ORDER BY sheet",
+                                 (key,)).fetchall()
+    else:
+        offerings = conn.execute("SELECT * FROM offerings WHERE course_id = ? ORDER BY sheet",
+                                 (normalize_course_id(key),)).fetchall()
+        subject_ids = {o["subject_id"] for o in offerings if o["subject_id"]}
+        courses = [c for s in subject_ids
+                   for c in conn.execute("SELECT * FROM nptel_courses WHERE subject_id = ?", (s,))]
+    return [dict(c) for c in courses], [dict(o) for o in offerings]
+
+
+def check_mapping(conn, mapping):
+    """Cross-check a mapping's NPTEL IDs against the catalog; returns a list of problems"""
+    problems = []
+    subject_id = mapping.get("nptel_subject_id")
+    if subject_id and subject_id != "N/A":
+        courses, offerings = lookup(conn, subject_id)
+        institutes = [row["institute"] for row in courses + offerings]
+        if not institutes:
+            problems.append(f"subject ID {subject_id} is in neither catalog PDF")
+        elif not any(mapping["nptel_institute"].lower() in i.lower() for i in institutes):
+            problems.append(f"institute: mapping says {mapping['nptel_institute']}, "
+                            f"catalog says {institutes[0]}")
+    course_id = mapping.get("nptel_id", "")
+    if _COURSE_ID.match(course_id):
+        _, offerings = lookup(conn, course_id)
+        if not offerings:
+            problems.append(f"course ID {course_id} not in the final course list")
+    else:
+        # Not a course ID the catalog can hold, so it cannot be checked: never a pass
+        problems.append(f"course ID {course_id or '(none)'} is unverifiable: not an NPTEL course ID "
+                        f"(e.g. noc26_cs34), so not in the catalog")
+    return problems
@@ -0,0 +1,235 @@
+"""
+Per-Student Credit-Transfer Sheets
+==================================
+Mail merge of a student roster (CSV) into one credit-transfer PDF per
+student who completed an approved NPTEL course.
+
+Roster columns (header row, case-insensitive):
+    register_no, name                 required
+    ktu_code or nptel_id              the approved course taken
+    branch, score, certificate_id     optional, printed when present
+
+Everything that is the same for all students of a course - the transfer
+sheet with its course equivalence table, the summary front page and the
+comparison page - is rendered once per ktu_code into a template. Worker
+processes receive the templates once, and per student only open the
+in-memory template, stamp the student fields into the blank boxes and save.
+
+Output: <output>/credit_transfer/<ktu_code>/<register_no>.pdf (register numbers that map to
+the same file name are reported as roster problems; only the first is written)
+"""
+
+import csv
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from compliance import computed_overlap
+from mooc_cache import atomic_output
+from mooc_mappings import SEMESTER
+from pdf_fonts import subset, text_font
+
+TRANSFER_FOLDER = "credit_transfer"
+
+# Stamped student fields: (roster column, label) in box order on the sheet
+STUDENT_FIELDS = [
+    ("name", "Student Name"),
+    ("register_no", "Register Number"),
+    ("branch", "Branch"),
+    ("score", "NPTEL Final Score"),
+    ("certificate_id", "Certificate ID"),
+]
+_FIELD_TOP = 135
+# Resource name of the Unicode font for stamped names (the template's own is already subset)
+STAMP_FONT = "dejavu-stamp"
+_ROW = 22
+
+_templates = {}
+
+
+class RosterError(ValueError):
+    """Raised when a roster file lacks the required columns"""
+
+
+def read_roster(path, mappings):
+    """Roster rows matched to mappings: (students by ktu_code, [(line, problem)])
+
+    A student whose sheet would have the same file name as an earlier one
+    (same register_no, or one safe_filename maps to the same name) is
+    reported and left out, so no sheet overwrites another.
+    """
+    by_code = {m["ktu_code"].upper(): m["ktu_code"] for m in mappings}
+    by_nptel = {m["nptel_id"].lower(): m["ktu_code"] for m in mappings}
+    groups, problems = {}, []
+    sheets = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = {c.strip().lower(): c for c in reader.fieldnames or []}
+        missing = {"register_no", "name"} - columns.keys()
+        if missing or not {"ktu_code", "nptel_id"} & columns.keys():
+            raise RosterError(f"{path}: roster needs register_no, name and ktu_code or nptel_id columns")
+        for line, row in enumerate(reader, 2):
+            student = {key: (row[col] or "").strip() for key, col in columns.items()}
+            code = (by_code.get(student.get("ktu_code", "").upper())
+                    or by_nptel.get(student.get("nptel_id", "").lower()))
+            if not student["register_no"]:
+                problems.append((line, "no register_no"))
+            elif code is None:
+                problems.append((line, f"{student['register_no']}: no approved mapping for "
+                                       f"{student.get('ktu_code') or student.get('nptel_id')!r}"))
+            else:
+                sheet = (code, safe_filename(student["register_no"]).lower())
+                if sheet in sheets:
+                    problems.append((line, f"{student['register_no']}: same sheet file as line "
+                                           f"{sheets[sheet]} ({safe_filename(student['register_no'])}.pdf), skipped"))
+                    continue
+                sheets[sheet] = line
+                groups.setdefault(code, []).append(student)
+    return groups, problems
+
+
+def overlap_text(mapping):
+    """The overlap the Section 17.4 check uses (compliance.computed_overlap)"""
+    overlap = computed_overlap(mapping)
+    return "unknown" if overlap is None else f"{overlap:g}% (mean of the comparison rows)"
+
+
+def create_transfer_page(doc, mapping):
+    """Credit-transfer sheet with blank student boxes and the course equivalence table"""
+    import fitz  # PyMuPDF
+
+    page = doc.new_page(width=595, height=842)
+    page.draw_rect(fitz.Rect(50, 30, 545, 80), fill=(0.1, 0.2, 0.4))
+    page.insert_text(fitz.Point(135, 60), "MOOC CREDIT TRANSFER", fontsize=22, fontname="helv", color=(1, 1, 1))
+    page.insert_text(fitz.Point(120, 100),
+                     f"KTU B.Tech Regulations 2024, Section 17 (MOOC) - {SEMESTER}",
+                     fontsize=10, fontname="helv", color=(0.4, 0.4, 0.4))
+    page.draw_line(fitz.Point(50, 115), fitz.Point(545, 115), width=1)
+
+    page.insert_text(fitz.Point(50, _FIELD_TOP - 5), "STUDENT DETAILS", fontsize=12, fontname="helv")
+    for n, (_, label) in enumerate(STUDENT_FIELDS):
+        y = _FIELD_TOP + 8 + n * _ROW
+        page.draw_rect(fitz.Rect(60, y, 200, y + _ROW), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
+        page.draw_rect(fitz.Rect(200, y, 535, y + _ROW), color=(0.8, 0.8, 0.8))
+        page.insert_text(fitz.Point(65, y + 15), label, fontsize=9, fontname="helv", color=(0.3, 0.3, 0.3))
+
+    y = _FIELD_TOP + 8 + len(STUDENT_FIELDS) * _ROW + 30
+    page.insert_text(fitz.Point(50, y), "COURSE EQUIVALENCE", fontsize=12, fontname="helv")
+    y += 8
+    rows = [
+        ("KTU Course", f"{mapping['ktu_code']} - {mapping['ktu_name']}"),
+        ("Course Category", mapping.get("category", "N/A")),
+        ("NPTEL Course", mapping["nptel_name"]),
+        ("NPTEL Course ID", mapping["nptel_id"]),
+        ("Offering Institute", mapping["nptel_institute"]),
+        ("Duration", mapping["nptel_duration"]),
+        ("Content Overlap", overlap_text(mapping)),
+    ]
+    for label, value in rows:
+        page.draw_rect(fitz.Rect(60, y, 200, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
+        page.draw_rect(fitz.Rect(200, y, 535, y + 20), color=(0.8, 0.8, 0.8))
+        page.insert_text(fitz.Point(65, y + 14), label, fontsize=8, fontname="helv", color=(0.3, 0.3, 0.3))
+        value = str(value)[:62]
+        page.insert_text(fitz.Point(205, y + 14), value, fontsize=8, fontname=text_font(page, value))
+        y += 20
+
+    y += 30
+    page.insert_text(fitz.Point(50, y),
+                     "The student named above has successfully completed the NPTEL course listed, approved as",
+                     fontsize=9, fontname="helv")
+    text = f"equivalent to {mapping['ktu_code']}. Credits are transferred as per Section 17 of the regulations."
+    page.insert_text(fitz.Point(50, y + 15), text, fontsize=9, fontname=text_font(page, text))
+    y += 90
+    for x, role in ((60, "MOOC Coordinator"), (240, "Head of Department"), (420, "Principal")):
+        page.draw_line(fitz.Point(x, y), fitz.Point(x + 120, y), width=0.5)
+        page.insert_text(fitz.Point(x, y + 14), role, fontsize=9, fontname="helv", color=(0.3, 0.3, 0.3))
+
+    page.insert_text(fitz.Point(200, 810), f"Generated: {datetime.now().strftime('%B %d, %Y')}",
+                     fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
+
+
+def render_template(mapping):
+    """PDF bytes of the shared pages for a course: transfer sheet, summary and comparison
+
+    The template's fonts are subset here; stamp_student adds its own
+    Unicode font resource for names that need one.
+    """
+    import fitz  # PyMuPDF
+    from report_builder import create_comparison_page, create_summary_front_page
+
+    doc = fitz.open()
+    create_transfer_page(doc, mapping)
+    create_summary_front_page(doc, mapping)
+    create_comparison_page(doc, mapping)
+    subset(doc)
+    try:
+        return doc.tobytes(garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+
+def safe_filename(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_") or "student"
+
+
+def stamp_student(template, student, output_path):
+    """Write a copy of a template PDF with the student fields filled in"""
+    import fitz  # PyMuPDF
+
+    with fitz.open("pdf", template) as doc:
+        page = doc[0]
+        for n, (key, _) in enumerate(STUDENT_FIELDS):
+            value = student.get(key)
+            if value:
+                y = _FIELD_TOP + 8 + n * _ROW
+                value = value[:60]
+                page.insert_text(fitz.Point(205, y + 15), value, fontsize=10,
+                                 fontname=text_font(page, value, unicode_font=STAMP_FONT))
+        if any(font[4] == STAMP_FONT for font in page.get_fonts()):
+            doc.subset_fonts()
+        with atomic_output(output_path) as tmp_path:
+            doc.save(tmp_path, garbage=1, deflate=True)
+
+
+def _init_worker(templates):
+    _templates.update(templates)
+
+
+def _stamp_batch(task):
+    """Worker: stamp a batch of students of one course; returns (written, [(register_no, error)])"""
+    code, students, folder = task
+    written, errors = 0, []
+    for student in students:
+        try:
+            stamp_student(_templates[code], student,
+                          os.path.join(folder, f"{safe_filename(student['register_no'])}.pdf"))
+            written += 1
+        except Exception as e:
+            errors.append((student["register_no"], str(e)))
+    return written, errors
+
+
+def merge_roster(groups, mappings, output_folder, workers=None, batch_size=50):
+    """Write one PDF per student; returns {"written": n, "courses": n, "errors": [...]}"""
+    by_code = {m["ktu_code"]: m for m in mappings}
+    templates = {code: render_template(by_code[code]) for code in groups}
+
+    tasks = []
+    for code, students in groups.items():
+        folder = os.path.join(output_folder, TRANSFER_FOLDER, safe_filename(code))
+        os.makedirs(folder, exist_ok=True)
+        tasks += [(code, students[i:i + batch_size], folder) for i in range(0, len(students), batch_size)]
+
+    if len(tasks) < 2 or workers == 1:
+        _init_worker(templates)
+        results = [_stamp_batch(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(templates,)) as pool:
+            results = list(pool.map(_stamp_batch, tasks))
+    return {
+        "written": sum(written for written, _ in results),
+        "courses": len(templates),
+        "errors": [error for _, errors in results for error in errors],
+    }
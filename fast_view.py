@@ -0,0 +1,109 @@
+"""
+Linearized ("Fast Web View") PDF Output
+=======================================
+A linearized PDF starts with the objects of page 1 (here the summary front
+page) and hint tables, so a browser can show page 1 after downloading only
+the first part of the file instead of all of it.
+
+MuPDF dropped linearisation (PyMuPDF raises "Linearisation is no longer
+supported"), so the linearizing pass is done by qpdf: through pikepdf when it
+is installed, otherwise with the qpdf command line tool.
+
+first_page_bytes() measures how much of a file has to be downloaded,
+front to back, before page 1 can be rendered.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+
+_LINEARIZED = re.compile(rb"/Linearized\s")
+_FIRST_PAGE_END = re.compile(rb"/E\s+(\d+)")
+
+
+class LinearizeUnavailable(RuntimeError):
+    """Raised when neither pikepdf nor the qpdf tool is available"""
+
+
+def linearizer():
+    """Name of the available linearizer ("pikepdf" or "qpdf"), or None"""
+    try:
+        import pikepdf  # noqa: F401
+        return "pikepdf"
+    except ImportError:
+        pass
+    return "qpdf" if shutil.which("qpdf") else None
+
+
+def linearize_file(src_path, dst_path):
+    """Write a linearized copy of src_path to dst_path"""
+    tool = linearizer()
+    if tool == "pikepdf":
+        import pikepdf
+        with pikepdf.open(src_path) as pdf:
+            pdf.save(dst_path, linearize=True)
+    elif tool == "qpdf":
+        subprocess.run(["qpdf", "--linearize", src_path, dst_path], check=True, capture_output=True)
+    else:
+        raise LinearizeUnavailable("linearized output needs pikepdf (pip install pikepdf) or the qpdf tool")
+
+
+def save_linearized(doc, path):
+    """Save a PyMuPDF document as a linearized PDF"""
+    plain_path = f"{path}.plain"
+    try:
+        doc.save(plain_path, garbage=3, deflate=True)
+        linearize_file(plain_path, path)
+    finally:
+        if os.path.exists(plain_path):
+            os.remove(plain_path)
+
+
+def is_linearized(path):
+    """True if the file starts with a linearization dictionary"""
+    with open(path, "rb") as f:
+        return bool(_LINEARIZED.search(f.read(1024)))
+
+
+def first_page_bytes(path):
+    """Bytes to download front to back before page 1 can render
+
+    For a linearized file that is the end of the first-page section (/E of
+    the linearization dictionary); otherwise the whole file, because the
+    cross-reference table is at its end.
+    """
+    with open(path, "rb") as f:
+        head = f.read(1024)
+    if _LINEARIZED.search(head):
+        match = _FIRST_PAGE_END.search(head)
+        if match:
+            return int(match.group(1))
+    return os.path.getsize(path)
+
+
+def check_linearization(path):
+    """qpdf's check of the linearization data (hint tables); None if it cannot be checked"""
+    tool = linearizer()
+    if tool == "pikepdf":
+        import pikepdf
+        with pikepdf.open(path) as pdf, open(os.devnull, "w") as quiet:
+            return pdf.check_linearization(stream=quiet)
+    if tool == "qpdf":
+        return subprocess.run(["qpdf", "--check-linearization", path], capture_output=True).returncode == 0
+    return None
+
+
+def benchmark(doc, folder, name):
+    """Save doc plainly and linearized into folder; returns the page-1 byte counts of both"""
+    plain_path = os.path.join(folder, f"{name}.pdf")
+    linear_path = os.path.join(folder, f"{name}.linear.pdf")
+    doc.save(plain_path)
+    save_linearized(doc, linear_path)
+    return {
+        "plain_size": os.path.getsize(plain_path),
+        "plain_first_page": first_page_bytes(plain_path),
+        "linear_size": os.path.getsize(linear_path),
+        "linear_first_page": first_page_bytes(linear_path),
+        "hints_valid": check_linearization(linear_path),
+    }
@@ -10,799 +10,1034 @@ Structure (As per KTU Regulations 2024, Section 17):
 4. Syllabus Comparison Report (70% Overlap Verification)
 
 Output: All PDFs in "Final Output" folder
+
+Usage:
+    python generate_final_reports.py                    # generate all reports
+    python generate_final_reports.py generate PECST745  # generate selected reports
+    python generate_final_reports.py generate --resume  # continue an interrupted run
+    python generate_final_reports.py generate --shard 2/4 --queue /shared/queue -o /shared/out
+    python generate_final_reports.py generate --pipeline  # overlap I/O with rendering
+    python generate_final_reports.py pipeline           # benchmark pipeline vs. plain loop
+    python generate_final_reports.py memory -j 8        # RSS/PSS: path vs. mmap vs. bytes
+    python generate_final_reports.py fonts              # embedded Unicode font size per report
+    python generate_final_reports.py verify             # page counts, placeholders, PDF structure
+    python generate_final_reports.py analytics --by category -w "overlap>=80"  # breakdowns
+    python generate_final_reports.py fingerprint        # text changes in re-issued NPTEL PDFs
+    python generate_final_reports.py generate --html --json  # portal page + registrar feed
+    python generate_final_reports.py generate --bundle submission.zip  # pack as generated
+    python generate_final_reports.py bundle submission.tar.zst  # pack finished folders
+    python generate_final_reports.py merge /shared/out  # manifest + principal proposal
+    python generate_final_reports.py syllabus -v        # parse KTU syllabus modules
+    python generate_final_reports.py nptel --json       # extract NPTEL course PDFs
+    python generate_final_reports.py catalog            # index the NPTEL catalog PDFs
+    python generate_final_reports.py catalog noc26_ee31 # look up a course or subject ID
+    python generate_final_reports.py generate --linear  # fast web view PDFs for the portal
+    python generate_final_reports.py fastview           # page-1 bytes: plain vs. linearized
+    python generate_final_reports.py preview --pdf      # page thumbnail contact sheets
+    python generate_final_reports.py store archive MOOC_Reports  # dedup into .mooc_store
+    python generate_final_reports.py diff git:HEAD~5 --outputs old_out "Final Output"
+    python generate_final_reports.py credit roster.csv  # per-student credit-transfer sheets
+    python generate_final_reports.py search --update "design patterns"  # find a topic
+    python generate_final_reports.py serve --port 8765  # render reports on request
+    python generate_final_reports.py list               # list mappings
+    python generate_final_reports.py validate           # check mapping fields
+    python generate_final_reports.py preflight          # check all input PDFs
+    python generate_final_reports.py compliance         # check Section 17 rules
+
+Course data lives in mooc_mappings.py and the PyMuPDF drawing code in
+report_builder.py. Only the commands that render PDFs import PyMuPDF, so
+listing and validation start in a few tens of milliseconds.
 """
 
-import fitz  # PyMuPDF
+import argparse
 import os
-from datetime import datetime
-
-# Configuration
-OUTPUT_FOLDER = "Final Output"
-SEMESTER = "Jan-Apr 2026"
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# ============================================================================
-# COURSE MAPPINGS - All 15 Courses
-# Details extracted from NPTEL Courses.pdf and individual course PDFs
-# ============================================================================
-
-MAPPINGS = [
-    # PE4 - Computer Vision
-    {
-        "category": "PE4",
-        "ktu_code": "PECST745",
-        "ktu_name": "Computer Vision",
-        "ktu_source": "Computer Science and Engineering.pdf",
-        "ktu_pages": [329, 330, 331, 332],  # 0-indexed
-        "nptel_pdf": "108103174.pdf",
-        "nptel_name": "Computer Vision and Image Processing - Fundamentals and Applications",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_ee31/preview",
-        "nptel_id": "noc26_ee31",
-        "nptel_subject_id": "108103174",
-        "nptel_instructor": "Prof. M. K. Bhuyan",
-        "nptel_department": "Department of Electrical Engineering",
-        "nptel_institute": "IIT Guwahati",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Basic co-ordinate geometry, matrix algebra, linear algebra and random process",
-        "nptel_intended_audience": "UG, PG and Ph.D students",
-        "nptel_industry_support": "Software industries that develop computer vision apps",
-        "comparison": [
-            ("Module 1: Camera Calibration, Geometric Features, Stereopsis", "Weeks 1-3: Image Formation, Camera Models, Stereo Vision", "90%"),
-            ("Module 2: Linear Filters, Edge Detection, Image Gradients", "Weeks 4-5: Spatial Filtering, Edge Detection, Enhancement", "85%"),
-            ("Module 3: ML for Vision, CNN, Transfer Learning", "Weeks 6-8: Neural Networks, Deep Learning for Vision", "80%"),
-            ("Module 4: Segmentation, Object Detection, YOLO", "Weeks 9-12: Image Segmentation, Object Detection, Applications", "85%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # PE4 - Blockchain and Cryptocurrencies
-    {
-        "category": "PE4",
-        "ktu_code": "PECST747",
-        "ktu_name": "Blockchain and Cryptocurrencies",
-        "ktu_source": "Computer Science and Engineering.pdf",
-        "ktu_pages": [318, 319, 320, 321],
-        "nptel_pdf": "106105235.pdf",
-        "nptel_name": "Blockchain and its Applications",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs34/preview",
-        "nptel_id": "noc26_cs34",
-        "nptel_subject_id": "106105235",
-        "nptel_instructor": "Prof. Sandip Chakraborty, Prof. Shamik Sural",
-        "nptel_department": "Department of Computer Science and Engineering",
-        "nptel_institute": "IIT Kharagpur",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Computer Networks; Operating Systems; Cryptography and Network Security",
-        "nptel_intended_audience": "Undergraduate Students, Postgraduate Students, Industry Associates",
-        "nptel_industry_support": "IBM, HPE, Intel, Blockchain startups",
-        "comparison": [
-            ("Module 1: Cryptographic Hash, Digital Signatures", "Weeks 1-2: Cryptographic Foundations, Hash Functions", "90%"),
-            ("Module 2: Bitcoin Network, Mining, Consensus", "Weeks 3-5: Bitcoin Protocol, Mining, Proof of Work", "85%"),
-            ("Module 3: Ethereum, Smart Contracts, DApps", "Weeks 6-8: Ethereum, Smart Contracts, Solidity", "80%"),
-            ("Module 4: Hyperledger, Enterprise Blockchain", "Weeks 9-12: Hyperledger Fabric, Permissioned Chains, Applications", "75%"),
-        ],
-        "overlap_percentage": "82%"
-    },
-    
-    # PE5 - Algorithms for Data Science
-    {
-        "category": "PE5",
-        "ktu_code": "PECST785",
-        "ktu_name": "Algorithms For Data Science",
-        "ktu_source": "Computer Science and Engineering.pdf",
-        "ktu_pages": [372, 373, 374, 375, 376],
-        "nptel_pdf": "106106179.pdf",
-        "nptel_name": "Data Science for Engineers",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs65/preview",
-        "nptel_id": "noc26_cs65",
-        "nptel_subject_id": "106106179",
-        "nptel_instructor": "Prof. Ragunathan Rengasamy, Prof. Shankar Narasimhan",
-        "nptel_department": "Department of Chemical Engineering",
-        "nptel_institute": "IIT Madras",
-        "nptel_duration": "8 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "10 hrs of pre-course material will be provided",
-        "nptel_intended_audience": "Any interested learner",
-        "nptel_industry_support": "HONEYWELL, ABB, FORD, GYAN DATA PVT. LTD",
-        "comparison": [
-            ("Module 1: Linear Algebra, Matrix Operations", "Weeks 1-2: Linear Algebra, Matrix Computations, PCA", "85%"),
-            ("Module 2: Probability, Statistics", "Weeks 3-4: Probability, Statistics, Hypothesis Testing", "90%"),
-            ("Module 3: Regression, Classification Algorithms", "Weeks 5-6: Regression Analysis, Classification Models", "80%"),
-            ("Module 4: Clustering, Dimensionality Reduction", "Weeks 7-8: Clustering Algorithms, Feature Engineering", "75%"),
-        ],
-        "overlap_percentage": "82%"
-    },
-    
-    # PE5 - High Performance Computing
-    {
-        "category": "PE5",
-        "ktu_code": "PECST757",
-        "ktu_name": "High Performance Computing",
-        "ktu_source": "Computer Science and Engineering.pdf",
-        "ktu_pages": [357, 358, 359, 360],
-        "nptel_pdf": "111101611.pdf",
-        "nptel_name": "High Performance Scientific Computing",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_ma16/preview",
-        "nptel_id": "noc26_ma16",
-        "nptel_subject_id": "111101611",
-        "nptel_instructor": "Multi-Faculty (Prof. Shiva Gopalakrishnan and others)",
-        "nptel_department": "Department of Mechanical Engineering",
-        "nptel_institute": "IIT Bombay",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Basic course on programming and applied mathematics",
-        "nptel_intended_audience": "Researchers, graduate students, postdocs working in computational science",
-        "nptel_industry_support": "Aerospace, automotive, defence, chemical, electrical, materials, biomedical and nuclear industries",
-        "comparison": [
-            ("Module 1: Parallel Computing Architectures", "Weeks 1-3: HPC Architecture, Parallel Computing Basics", "85%"),
-            ("Module 2: OpenMP, Shared Memory Programming", "Weeks 4-6: OpenMP, Shared Memory Parallelism", "90%"),
-            ("Module 3: MPI, Distributed Memory Programming", "Weeks 7-9: MPI Programming, Distributed Systems", "85%"),
-            ("Module 4: GPU Computing, CUDA", "Weeks 10-12: GPU Programming, Performance Optimization", "80%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # OE2 - Optimization Techniques (ECE)
-    {
-        "category": "OE2",
-        "ktu_code": "OEECT723",
-        "ktu_name": "Optimization Techniques",
-        "ktu_source": "Ece.pdf",
-        "ktu_pages": [321, 322, 323, 324],
-        "nptel_pdf": "112101298.pdf",
-        "nptel_name": "Optimization from Fundamentals",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_me09/preview",
-        "nptel_id": "noc26_me09",
-        "nptel_subject_id": "112101298",
-        "nptel_instructor": "Prof. Ankur A. Kulkarni",
-        "nptel_department": "Department of Systems and Control Engineering",
-        "nptel_institute": "IIT Bombay",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "None specified",
-        "nptel_intended_audience": "Mathematics, any engineering and science discipline",
-        "nptel_industry_support": "Quantitative Finance and related industries",
-        "comparison": [
-            ("Module 1: Linear Programming, Simplex Method", "Weeks 1-3: Linear Programming, Duality, Simplex", "90%"),
-            ("Module 2: Unconstrained Optimization", "Weeks 4-6: Unconstrained Optimization, Gradient Methods", "85%"),
-            ("Module 3: Constrained Optimization, KKT", "Weeks 7-9: Constrained Optimization, KKT Conditions", "85%"),
-            ("Module 4: Metaheuristics, GA", "Weeks 10-12: Convex Optimization, Advanced Algorithms", "70%"),
-        ],
-        "overlap_percentage": "82%"
-    },
-    
-    # OE2 - Robotics (Mechanical)
-    {
-        "category": "OE2",
-        "ktu_code": "OEMET722",
-        "ktu_name": "Robotics",
-        "ktu_source": "Mechnaical.pdf",
-        "ktu_pages": [365, 366, 367, 368],
-        "nptel_pdf": "112107289.pdf",
-        "nptel_name": "Robotics and Control: Theory and Practice",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_me72/preview",
-        "nptel_id": "noc26_me72",
-        "nptel_subject_id": "112107289",
-        "nptel_instructor": "Prof. N. Sukavanam, Prof. M. Felix Orlando",
-        "nptel_department": "Department of Mathematics & Department of Electrical Engineering",
-        "nptel_institute": "IIT Roorkee",
-        "nptel_duration": "8 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Basic Mathematics",
-        "nptel_intended_audience": "Electrical Engineering, Computer Science Engineering, Mechanical Engineering, Electronics and Communication Engineering, Mathematics students",
-        "nptel_industry_support": "Industrial Robotics, Healthcare Robotics, Field Robotics",
-        "comparison": [
-            ("Module 1: Robot Kinematics, DH Parameters", "Weeks 1-2: Forward Kinematics, DH Convention", "90%"),
-            ("Module 2: Inverse Kinematics, Workspace", "Weeks 3-4: Inverse Kinematics, Jacobian Analysis", "85%"),
-            ("Module 3: Trajectory Planning, Motion", "Weeks 5-6: Trajectory Generation, Motion Planning", "80%"),
-            ("Module 4: Robot Dynamics, Control", "Weeks 7-8: Robot Dynamics, Control Theory, Practice", "85%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # PE6 - Natural Language Processing
-    {
-        "category": "PE6",
-        "ktu_code": "PECST862",
-        "ktu_name": "Natural Language Processing",
-        "ktu_source": "Computer Science and Engineering.pdf",
-        "ktu_pages": [399, 400, 401, 402],
-        "nptel_pdf": "106105158.pdf",
-        "nptel_name": "Natural Language Processing",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs45/preview",
-        "nptel_id": "noc26_cs45",
-        "nptel_subject_id": "106105158",
-        "nptel_instructor": "Prof. Pawan Goyal",
-        "nptel_department": "Department of Computer Science and Engineering",
-        "nptel_institute": "IIT Kharagpur",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Basic knowledge of probabilities for lectures and python for programming assignment",
-        "nptel_intended_audience": "CSE, IT students",
-        "nptel_industry_support": "Microsoft Research, Google, Adobe, Xerox, Flipkart, Amazon",
-        "comparison": [
-            ("Module 1: Text Processing, Tokenization, Morphology", "Weeks 1-2: Text Processing, Spelling Correction, Tokenization", "90%"),
-            ("Module 2: Language Modeling, POS Tagging", "Weeks 3-5: Language Models, POS Tagging, NER", "85%"),
-            ("Module 3: Parsing, Syntax Analysis", "Weeks 6-8: Constituency Parsing, Dependency Parsing", "85%"),
-            ("Module 4: Semantic Analysis, Word Embeddings", "Weeks 9-12: Word Embeddings, Sentiment Analysis, Applications", "80%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # OE3 - Internet of Things (ECE)
-    {
-        "category": "OE3",
-        "ktu_code": "OEECT831",
-        "ktu_name": "Internet of Things",
-        "ktu_source": "Ece.pdf",
-        "ktu_pages": [360, 361, 362, 363],
-        "nptel_pdf": "106105166.pdf",
-        "nptel_name": "Introduction to Internet of Things",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs37/preview",
-        "nptel_id": "noc26_cs37",
-        "nptel_subject_id": "106105166",
-        "nptel_instructor": "Prof. Sudip Misra",
-        "nptel_department": "Department of Computer Science and Engineering",
-        "nptel_institute": "IIT Kharagpur",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Basic programming knowledge",
-        "nptel_intended_audience": "CSE, IT, ECE, EE, Instrumentation Engineering, Industrial Engineering",
-        "nptel_industry_support": "IoT solutions providers across multiple sectors",
-        "comparison": [
-            ("Module 1: IoT Architecture, Sensors, Actuators", "Weeks 1-3: IoT Architecture, Sensing, Actuation", "90%"),
-            ("Module 2: IoT Protocols - MQTT, CoAP, HTTP", "Weeks 4-6: IoT Protocols, MQTT, CoAP, Communication", "85%"),
-            ("Module 3: IoT Platforms, Cloud Integration", "Weeks 7-9: IoT Cloud Platforms, Data Analytics", "80%"),
-            ("Module 4: IoT Security, Smart Applications", "Weeks 10-12: IoT Security, Smart City Applications", "85%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # OE3 - PLC & Automation (EEE)
-    {
-        "category": "OE3",
-        "ktu_code": "OEEET832",
-        "ktu_name": "PLC and Automation",
-        "ktu_source": "Elecel.pdf",
-        "ktu_pages": [329, 330, 331, 332],
-        "nptel_pdf": "108105088.pdf",
-        "nptel_name": "Industrial Automation and Control",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_ee47/preview",
-        "nptel_id": "noc26_ee47",
-        "nptel_subject_id": "108105088",
-        "nptel_instructor": "Prof. Alok Kanti Deb",
-        "nptel_department": "Department of Electrical Engineering",
-        "nptel_institute": "IIT Kharagpur",
-        "nptel_duration": "12 Weeks (52 lectures)",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Electrical Networks, Control Systems",
-        "nptel_intended_audience": "Any interested student",
-        "nptel_industry_support": "All Process Control (Oil and Gas, Chemical), Manufacturing (Machine tools, Textile)",
-        "comparison": [
-            ("Module 1: PLC Architecture, Programming Basics", "Weeks 1-3: PLC Fundamentals, Ladder Logic", "85%"),
-            ("Module 2: Sensors, Actuators, Industrial I/O", "Weeks 4-6: Industrial Sensors, Actuators, Interfacing", "80%"),
-            ("Module 3: SCADA, DCS Systems", "Weeks 7-9: SCADA Systems, DCS Architecture", "80%"),
-            ("Module 4: Industrial Networks, Protocols", "Weeks 10-12: Industrial Communication, Fieldbus", "75%"),
-        ],
-        "overlap_percentage": "80%"
-    },
-    
-    # HMC Elective 1 - Project Management
-    {
-        "category": "HMC Elective 1",
-        "ktu_code": "HMCET502",
-        "ktu_name": "Project Management: Planning, Execution, Evaluation and Control",
-        "ktu_source": None,  # HMC courses - general management
-        "ktu_pages": None,
-        "nptel_pdf": "110107430.pdf",
-        "nptel_name": "Project Management",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_mg77/preview",
-        "nptel_id": "noc26_mg77",
-        "nptel_subject_id": "110107430",
-        "nptel_instructor": "Prof. Ramesh Anbanandam",
-        "nptel_department": "Department of Management Studies",
-        "nptel_institute": "IIT Roorkee",
-        "nptel_duration": "8 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "None specified",
-        "nptel_intended_audience": "Undergraduate Engineering Courses-All discipline, Management Courses-All discipline",
-        "nptel_industry_support": "All software companies, Manufacturing Companies, Construction companies",
-        "comparison": [
-            ("Topic: Project Planning, WBS, Scheduling", "Weeks 1-2: Project Planning, WBS, Scheduling Techniques", "90%"),
-            ("Topic: Resource Management, Budgeting", "Weeks 3-4: Resource Allocation, Cost Management", "85%"),
-            ("Topic: Risk Management, Quality Control", "Weeks 5-6: Risk Analysis, Quality Management", "85%"),
-            ("Topic: Monitoring, Control, Evaluation", "Weeks 7-8: Monitoring, Earned Value, Project Closure", "80%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # Honours - Object Oriented Design using UML
-    {
-        "category": "Honours",
-        "ktu_code": "HNCST509",
-        "ktu_name": "Object Oriented Design using UML",
-        "ktu_source": "Honours - Computer Science  and  Engineering.pdf",
-        "ktu_pages": [9, 10, 11, 12],
-        "nptel_pdf": "106105224.pdf",
-        "nptel_name": "Object Oriented System Development using UML, Java and Patterns",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs46/preview",
-        "nptel_id": "noc26_cs46",
-        "nptel_subject_id": "106105224",
-        "nptel_instructor": "Prof. Rajib Mall",
-        "nptel_department": "Department of Computer Science and Engineering",
-        "nptel_institute": "IIT Kharagpur",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Programming Using Java, Software Engineering",
-        "nptel_intended_audience": "CSE, IT",
-        "nptel_industry_support": "Software development companies",
-        "comparison": [
-            ("Module 1: OO Concepts, UML Basics, Use Cases", "Weeks 1-3: OO Concepts, UML Diagrams, Use Case Modeling", "90%"),
-            ("Module 2: Class Diagrams, Sequence Diagrams", "Weeks 4-6: Class Diagrams, Interaction Diagrams, State", "85%"),
-            ("Module 3: System Design, Architecture", "Weeks 7-9: System Design, Architecture Patterns", "80%"),
-            ("Module 4: Object Design, Design Patterns", "Weeks 10-12: Design Patterns, Implementation, Testing", "85%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # Honours - Advanced Algorithms
-    {
-        "category": "Honours",
-        "ktu_code": "HNCST609",
-        "ktu_name": "Advanced Algorithms",
-        "ktu_source": "Honours - Computer Science  and  Engineering.pdf",
-        "ktu_pages": [16, 17, 18, 19],
-        "nptel_pdf": "106106131.pdf",
-        "nptel_name": "Design and Analysis of Algorithms",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs67/preview",
-        "nptel_id": "noc26_cs67",
-        "nptel_subject_id": "106106131",
-        "nptel_instructor": "Prof. Madhavan Mukund",
-        "nptel_department": "Department of Computer Science and Engineering",
-        "nptel_institute": "Chennai Mathematical Institute",
-        "nptel_duration": "8 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "Exposure to introductory courses on programming and data structures",
-        "nptel_intended_audience": "Students in BE/BTech Computer Science, 2nd/3rd year",
-        "nptel_industry_support": "Any company working in the area of software services and products",
-        "comparison": [
-            ("Module 1: Algorithm Analysis, Recurrences", "Weeks 1-2: Asymptotic Analysis, Recurrence Relations", "90%"),
-            ("Module 2: Divide & Conquer, Dynamic Programming", "Weeks 3-4: Divide and Conquer, Dynamic Programming", "90%"),
-            ("Module 3: Greedy Algorithms, Graph Algorithms", "Weeks 5-6: Greedy Algorithms, Shortest Paths, MST", "85%"),
-            ("Module 4: Approximation, NP-Hardness", "Weeks 7-8: NP-Completeness, Approximation Algorithms", "80%"),
-        ],
-        "overlap_percentage": "86%"
-    },
-    
-    # Honours - Advanced Cryptography
-    {
-        "category": "Honours",
-        "ktu_code": "HNCST709",
-        "ktu_name": "Advanced Cryptography",
-        "ktu_source": "Honours - Computer Science  and  Engineering.pdf",
-        "ktu_pages": [23, 24, 25, 26],
-        "nptel_pdf": "106105162.pdf",
-        "nptel_name": "Cryptography and Network Security",
-        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs57/preview",
-        "nptel_id": "noc26_cs57",
-        "nptel_subject_id": "106105162",
-        "nptel_instructor": "Prof. Sourav Mukhopadhyay",
-        "nptel_department": "Department of Computer Science and Engineering",
-        "nptel_institute": "IIT Kharagpur",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "None specified",
-        "nptel_intended_audience": "CSE, IT students",
-        "nptel_industry_support": "Stratign FZE Dubai(UAE), SAG, DRDO, ISRO, WESEE, NTRO",
-        "comparison": [
-            ("Module 1: Classical Ciphers, Modern Ciphers", "Weeks 1-3: Block Ciphers, Stream Ciphers, DES, AES", "85%"),
-            ("Module 2: Public Key Cryptography", "Weeks 4-6: Public Key Crypto, RSA, ElGamal, ECC", "90%"),
-            ("Module 3: Hash Functions, Digital Signatures", "Weeks 7-9: Hash Functions, SHA, Digital Signatures", "85%"),
-            ("Module 4: Network Security, Protocols", "Weeks 10-12: Network Security, SSL/TLS, IPSec", "80%"),
-        ],
-        "overlap_percentage": "85%"
-    },
-    
-    # Fuzzy Systems - From separate syllabus PDF
-    {
-        "category": "Elective",
-        "ktu_code": "FUZZY_SYSTEMS",
-        "ktu_name": "Fuzzy Systems",
-        "ktu_source": "FUZZY SYSTEMS SYLLABUS.pdf",
-        "ktu_pages": [0, 1, 2, 3, 4],  # All pages
-        "nptel_pdf": None,  # No specific NPTEL PDF - use general info
-        "nptel_name": "Fuzzy Logic and Neural Networks",
-        "nptel_url": "https://nptel.ac.in",
-        "nptel_id": "noc26_cs_fuzzy",
-        "nptel_subject_id": "N/A",
-        "nptel_instructor": "To be determined from NPTEL",
-        "nptel_department": "N/A",
-        "nptel_institute": "IIT",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "N/A",
-        "nptel_intended_audience": "N/A",
-        "nptel_industry_support": "N/A",
-        "comparison": [
-            ("Module 1: Fuzzy Sets, Membership Functions", "Weeks 1-3: Fuzzy Set Theory, Membership Functions", "85%"),
-            ("Module 2: Fuzzy Relations, Operations", "Weeks 4-6: Fuzzy Relations, Fuzzy Operations", "80%"),
-            ("Module 3: Fuzzy Logic, Inference Systems", "Weeks 7-9: Fuzzy Inference, Rule-Based Systems", "85%"),
-            ("Module 4: Fuzzy Control Systems", "Weeks 10-12: Fuzzy Controllers, Applications", "80%"),
-        ],
-        "overlap_percentage": "82%",
-        "note": "Course syllabus extracted from provided PDF"
-    },
-    
-    # Approximation Algorithms - From separate syllabus PDF
-    {
-        "category": "Elective",
-        "ktu_code": "APPROX_ALGO",
-        "ktu_name": "Approximation Algorithms",
-        "ktu_source": "APPROXIMATION ALGORITHM SYLLABUS.pdf",
-        "ktu_pages": [0, 1, 2, 3, 4],  # All pages
-        "nptel_pdf": None,  # No specific NPTEL PDF
-        "nptel_name": "Approximation Algorithms",
-        "nptel_url": "https://nptel.ac.in",
-        "nptel_id": "noc26_cs_approx",
-        "nptel_subject_id": "N/A",
-        "nptel_instructor": "To be determined from NPTEL",
-        "nptel_department": "N/A",
-        "nptel_institute": "IIT",
-        "nptel_duration": "12 Weeks",
-        "nptel_content_type": "Video",
-        "nptel_prerequisites": "N/A",
-        "nptel_intended_audience": "N/A",
-        "nptel_industry_support": "N/A",
-        "comparison": [
-            ("Module 1: Approximation Concepts, Complexity", "Weeks 1-3: Introduction, Complexity Classes, Basics", "85%"),
-            ("Module 2: Greedy Approximation Algorithms", "Weeks 4-6: Greedy Techniques, Set Cover, Vertex Cover", "85%"),
-            ("Module 3: LP-based Approximations", "Weeks 7-9: Linear Programming Relaxations, Rounding", "80%"),
-            ("Module 4: Advanced Techniques", "Weeks 10-12: Randomized Algorithms, PTAS, FPTAS", "80%"),
-        ],
-        "overlap_percentage": "82%",
-        "note": "Course syllabus extracted from provided PDF"
-    },
-]
-
-
-def get_file_path(filename):
-    """Get absolute file path"""
-    return os.path.join(BASE_DIR, filename)
-
-
-def create_summary_front_page(doc, mapping):
-    """Create professional summary front page with tabular course details from NPTEL Courses.pdf"""
-    page = doc.new_page(width=595, height=842)  # A4
-    
-    # Header
-    rect = fitz.Rect(50, 30, 545, 80)
-    page.draw_rect(rect, fill=(0.1, 0.2, 0.4))
-    page.insert_text(fitz.Point(120, 60), "MOOC APPROVAL REQUEST", 
-                     fontsize=22, fontname="helv", color=(1, 1, 1))
-    
-    # Sub-header
-    page.insert_text(fitz.Point(140, 100), 
-                     "As per KTU B.Tech Regulations 2024, Section 17 (MOOC)",
-                     fontsize=10, fontname="helv", color=(0.4, 0.4, 0.4))
-    
-    page.draw_line(fitz.Point(50, 115), fitz.Point(545, 115), width=1)
-    
-    y = 135
-    
-    # KTU Course Details Table
-    page.insert_text(fitz.Point(50, y), "KTU COURSE DETAILS", fontsize=12, fontname="helv")
-    y += 18
-    
-    ktu_data = [
-        ("Course Category", mapping.get('category', 'N/A')),
-        ("Course Code", mapping['ktu_code']),
-        ("Course Name", mapping['ktu_name']),
-    ]
-    
-    for label, value in ktu_data:
-        page.draw_rect(fitz.Rect(60, y, 200, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
-        page.draw_rect(fitz.Rect(200, y, 535, y + 20), color=(0.8, 0.8, 0.8))
-        page.insert_text(fitz.Point(65, y + 14), label, fontsize=9, fontname="helv", color=(0.3, 0.3, 0.3))
-        page.insert_text(fitz.Point(205, y + 14), str(value)[:55], fontsize=9, fontname="helv")
-        y += 20
-    
-    y += 20
-    
-    # NPTEL Course Details Table (from NPTEL Courses.pdf)
-    page.insert_text(fitz.Point(50, y), "NPTEL COURSE DETAILS (from NPTEL Courses.pdf)", fontsize=12, fontname="helv")
-    y += 18
-    
-    nptel_data = [
-        ("Course Name", mapping['nptel_name']),
-        ("NPTEL Subject ID", mapping.get('nptel_subject_id', 'N/A')),
-        ("Course ID", mapping['nptel_id']),
-        ("Course URL", mapping['nptel_url']),
-        ("Coordinator(s)", mapping['nptel_instructor']),
-        ("Department", mapping.get('nptel_department', 'N/A')),
-        ("Offering Institute", mapping['nptel_institute']),
-        ("Duration", mapping['nptel_duration']),
-        ("Content Type", mapping.get('nptel_content_type', 'Video')),
-        ("Prerequisites", mapping.get('nptel_prerequisites', 'N/A')),
-        ("Intended Audience", mapping.get('nptel_intended_audience', 'N/A')),
-        ("Industry Support", mapping.get('nptel_industry_support', 'N/A')),
-        ("Semester", SEMESTER),
-        ("Platform", "NPTEL/SWAYAM (AICTE Approved)"),
-    ]
-    
-    for label, value in nptel_data:
-        page.draw_rect(fitz.Rect(60, y, 200, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
-        page.draw_rect(fitz.Rect(200, y, 535, y + 20), color=(0.8, 0.8, 0.8))
-        page.insert_text(fitz.Point(65, y + 14), label, fontsize=8, fontname="helv", color=(0.3, 0.3, 0.3))
-        # Handle long text
-        val_str = str(value)
-        if len(val_str) > 60:
-            page.insert_text(fitz.Point(205, y + 14), val_str[:60] + "...", fontsize=7, fontname="helv")
-        else:
-            page.insert_text(fitz.Point(205, y + 14), val_str, fontsize=8, fontname="helv")
-        y += 20
-        
-        # Check if we need a new page
-        if y > 750:
-            page = doc.new_page(width=595, height=842)
-            y = 50
-    
-    y += 15
-    
-    # Compliance Information
-    page.insert_text(fitz.Point(50, y), "COMPLIANCE WITH KTU REGULATIONS", fontsize=11, fontname="helv")
-    y += 18
-    
-    compliance_data = [
-        ("Minimum Duration (R 17.2)", f"{mapping['nptel_duration']} >= 8 Weeks ✓"),
-        ("Content Overlap (R 17.4)", f"{mapping.get('overlap_percentage', '>=70%')} >= 70% ✓"),
-        ("Approved Agency (R 17.1)", "NPTEL/SWAYAM (AICTE/UGC Approved) ✓"),
-        ("Examination Mode (R 17.3)", "Proctored End Semester Examination ✓"),
-    ]
-    
-    for label, value in compliance_data:
-        page.draw_rect(fitz.Rect(60, y, 250, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
-        page.draw_rect(fitz.Rect(250, y, 535, y + 20), fill=(0.95, 1.0, 0.95), color=(0.8, 0.8, 0.8))
-        page.insert_text(fitz.Point(65, y + 14), label, fontsize=8, fontname="helv", color=(0.3, 0.3, 0.3))
-        page.insert_text(fitz.Point(255, y + 14), value, fontsize=8, fontname="helv", color=(0, 0.5, 0))
-        y += 20
-    
-    # Footer
-    page.insert_text(fitz.Point(200, 810), f"Generated: {datetime.now().strftime('%B %d, %Y')}", 
-                     fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
-
-
-def create_section_header(doc, title, subtitle=""):
-    """Create a section header page"""
-    page = doc.new_page(width=595, height=842)
-    
-    # Centered title
-    page.draw_rect(fitz.Rect(50, 380, 545, 450), fill=(0.1, 0.2, 0.4))
-    page.insert_text(fitz.Point(150, 420), title, fontsize=18, fontname="helv", color=(1, 1, 1))
-    
-    if subtitle:
-        page.insert_text(fitz.Point(100, 470), subtitle, fontsize=12, fontname="helv", color=(0.4, 0.4, 0.4))
-
-
-def create_comparison_page(doc, mapping):
-    """Create detailed syllabus comparison page"""
-    page = doc.new_page(width=595, height=842)
-    
-    # Header
-    page.draw_rect(fitz.Rect(50, 30, 545, 65), fill=(0.1, 0.4, 0.2))
-    page.insert_text(fitz.Point(170, 52), "SYLLABUS COMPARISON REPORT", 
-                     fontsize=14, fontname="helv", color=(1, 1, 1))
-    
-    y = 85
-    
-    # Course Info Box
-    page.draw_rect(fitz.Rect(50, y, 545, y + 55), fill=(0.97, 0.97, 0.97), color=(0.8, 0.8, 0.8))
-    page.insert_text(fitz.Point(60, y + 20), f"KTU Course: {mapping['ktu_code']} - {mapping['ktu_name']}", 
-                     fontsize=10, fontname="helv")
-    page.insert_text(fitz.Point(60, y + 40), f"NPTEL Course: {mapping['nptel_name']}", 
-                     fontsize=10, fontname="helv")
-    
-    y += 70
-    
-    # Comparison Table Header
-    col_widths = [210, 210, 60]  # KTU, NPTEL, Match%
-    headers = ["KTU SYLLABUS CONTENT", "NPTEL SYLLABUS CONTENT", "MATCH"]
-    colors = [(0.2, 0.3, 0.5), (0.2, 0.4, 0.3), (0.4, 0.4, 0.4)]
-    
-    x = 50
-    for i, (header, color) in enumerate(zip(headers, colors)):
-        page.draw_rect(fitz.Rect(x, y, x + col_widths[i], y + 25), fill=color)
-        page.insert_text(fitz.Point(x + 5, y + 17), header, fontsize=8, fontname="helv", color=(1, 1, 1))
-        x += col_widths[i]
-    
-    y += 25
-    
-    # Comparison Rows
-    comparisons = mapping.get('comparison', [])
-    row_height = 55
-    
-    for idx, comp in enumerate(comparisons):
-        ktu_topic = comp[0] if len(comp) > 0 else ""
-        nptel_topic = comp[1] if len(comp) > 1 else ""
-        match_pct = comp[2] if len(comp) > 2 else "✓"
-        
-        fill = (1, 1, 1) if idx % 2 == 0 else (0.97, 0.97, 0.97)
-        
-        x = 50
-        # KTU Column
-        page.draw_rect(fitz.Rect(x, y, x + col_widths[0], y + row_height), fill=fill, color=(0.85, 0.85, 0.85))
-        lines = wrap_text(ktu_topic, 38)
-        ly = y + 15
-        for line in lines[:3]:
-            page.insert_text(fitz.Point(x + 5, ly), line, fontsize=8, fontname="helv")
-            ly += 12
-        x += col_widths[0]
-        
-        # NPTEL Column
-        page.draw_rect(fitz.Rect(x, y, x + col_widths[1], y + row_height), fill=fill, color=(0.85, 0.85, 0.85))
-        lines = wrap_text(nptel_topic, 38)
-        ly = y + 15
-        for line in lines[:3]:
-            page.insert_text(fitz.Point(x + 5, ly), line, fontsize=8, fontname="helv")
-            ly += 12
-        x += col_widths[1]
-        
-        # Match Column
-        match_fill = (0.9, 1.0, 0.9) if "✓" in str(match_pct) or int(match_pct.replace('%', '')) >= 70 else fill
-        page.draw_rect(fitz.Rect(x, y, x + col_widths[2], y + row_height), fill=match_fill, color=(0.85, 0.85, 0.85))
-        page.insert_text(fitz.Point(x + 15, y + 30), str(match_pct), fontsize=10, fontname="helv", color=(0, 0.5, 0))
-        
-        y += row_height
-    
-    y += 20
-    
-    # Summary Box
-    page.draw_rect(fitz.Rect(50, y, 545, y + 90), fill=(0.95, 1.0, 0.95), color=(0, 0.5, 0), width=2)
-    
-    page.insert_text(fitz.Point(60, y + 25), f"OVERALL CONTENT OVERLAP: {mapping.get('overlap_percentage', '>=70%')}", 
-                     fontsize=14, fontname="helv", color=(0, 0.4, 0))
-    
-    page.insert_text(fitz.Point(60, y + 50), 
-                     "VERIFICATION: The NPTEL course content meets the minimum 70% overlap requirement",
-                     fontsize=10, fontname="helv")
-    page.insert_text(fitz.Point(60, y + 68),
-                     "as mandated by KTU B.Tech Regulations 2024, Section 17.4",
-                     fontsize=10, fontname="helv")
-    
-    y += 110
-    
-    # Recommendation
-    page.insert_text(fitz.Point(50, y), "RECOMMENDATION:", fontsize=11, fontname="helv")
-    page.insert_text(fitz.Point(50, y + 20), 
-                     f"The NPTEL course '{mapping['nptel_name']}' offered by {mapping['nptel_institute']}",
-                     fontsize=9, fontname="helv")
-    page.insert_text(fitz.Point(50, y + 35),
-                     f"is recommended as an equivalent MOOC for the KTU course {mapping['ktu_code']}.",
-                     fontsize=9, fontname="helv")
-
-
-def wrap_text(text, max_chars):
-    """Simple text wrapper"""
-    if not text:
-        return [""]
-    words = text.split()
-    lines = []
-    current = ""
-    for word in words:
-        if len(current) + len(word) + 1 <= max_chars:
-            current += (" " + word if current else word)
-        else:
-            if current:
-                lines.append(current)
-            current = word
-    if current:
-        lines.append(current)
-    return lines if lines else [""]
-
-
-def generate_report(mapping, output_folder):
-    """Generate complete PDF report for a mapping"""
-    doc = fitz.open()
-    
-    # 1. Summary Front Page
-    create_summary_front_page(doc, mapping)
-    
-    # 2. KTU Syllabus Section Header
-    create_section_header(doc, "KTU COURSE SYLLABUS", f"{mapping['ktu_code']} - {mapping['ktu_name']}")
-    
-    # 3. Insert KTU Syllabus Pages
-    if mapping["ktu_source"]:
-        ktu_path = get_file_path(mapping["ktu_source"])
-        if os.path.exists(ktu_path):
-            try:
-                ktu_doc = fitz.open(ktu_path)
-                pages = mapping.get("ktu_pages", [])
-                if pages:
-                    for page_num in pages:
-                        if page_num < len(ktu_doc):
-                            doc.insert_pdf(ktu_doc, from_page=page_num, to_page=page_num)
-                ktu_doc.close()
-            except Exception as e:
-                page = doc.new_page()
-                page.insert_text(fitz.Point(100, 400), f"Error loading KTU syllabus: {e}", fontsize=12, fontname="helv")
-        else:
-            page = doc.new_page()
-            page.insert_text(fitz.Point(100, 400), f"KTU Syllabus file not found: {mapping['ktu_source']}", fontsize=12, fontname="helv")
-    else:
-        page = doc.new_page()
-        page.insert_text(fitz.Point(100, 380), "KTU Syllabus source not specified.", fontsize=12, fontname="helv")
-        page.insert_text(fitz.Point(100, 410), "This is a general/HMC elective course.", fontsize=11, fontname="helv")
-        page.insert_text(fitz.Point(100, 440), f"Course: {mapping['ktu_name']}", fontsize=11, fontname="helv")
-    
-    # 4. NPTEL Course Section Header
-    create_section_header(doc, "NPTEL COURSE SYLLABUS", mapping['nptel_name'])
-    
-    # 5. Insert NPTEL Course Pages
-    if mapping.get("nptel_pdf"):
-        nptel_path = get_file_path(mapping["nptel_pdf"])
-        if os.path.exists(nptel_path):
-            try:
-                nptel_doc = fitz.open(nptel_path)
-                doc.insert_pdf(nptel_doc)
-                nptel_doc.close()
-            except Exception as e:
-                page = doc.new_page()
-                page.insert_text(fitz.Point(100, 400), f"Error loading NPTEL PDF: {e}", fontsize=12, fontname="helv")
-        else:
-            page = doc.new_page()
-            page.insert_text(fitz.Point(100, 400), f"NPTEL PDF not found: {mapping['nptel_pdf']}", fontsize=12, fontname="helv")
-    else:
-        page = doc.new_page()
-        page.insert_text(fitz.Point(100, 380), "NPTEL course details to be obtained from:", fontsize=12, fontname="helv")
-        page.insert_text(fitz.Point(100, 410), mapping['nptel_url'], fontsize=10, fontname="helv", color=(0, 0, 0.8))
-        if mapping.get('note'):
-            page.insert_text(fitz.Point(100, 450), f"Note: {mapping['note']}", fontsize=10, fontname="helv", color=(0.5, 0.5, 0.5))
-    
-    # 6. Comparison Report
-    create_section_header(doc, "SYLLABUS COMPARISON", "Content Overlap Verification Report")
-    create_comparison_page(doc, mapping)
-    
-    # Save PDF
-    safe_code = mapping['ktu_code'].replace(' ', '_').replace('/', '_')
-    output_path = os.path.join(output_folder, f"MOOC_{safe_code}_Report.pdf")
-    doc.save(output_path)
-    doc.close()
-    
-    return output_path
-
-
-def main():
-    """Main function to generate all reports"""
+import sys
+
+# Names re-exported lazily for scripts that still import them from here
+_MAPPING_NAMES = ("OUTPUT_FOLDER", "SEMESTER", "BASE_DIR", "MAPPINGS", "get_file_path")
+_BUILDER_NAMES = ("create_summary_front_page", "create_section_header",
+                  "create_comparison_page", "wrap_text", "generate_report")
+
+
+def __getattr__(name):
+    if name in _MAPPING_NAMES:
+        import mooc_mappings
+        return getattr(mooc_mappings, name)
+    if name in _BUILDER_NAMES:
+        import report_builder
+        return getattr(report_builder, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def cmd_generate(args):
+    """Generate reports for the selected mappings"""
+    from checkpoint import CheckpointJournal
+    from mooc_cache import OutputDiscarded, input_digest
+    from mooc_mappings import OUTPUT_FOLDER, find_mappings, get_file_path, report_filename
+    from report_builder import write_report
+    from report_model import format_path
+
+    mappings = find_mappings(args.codes)
+    formats = ("pdf",) + tuple(fmt for fmt in ("html", "json") if getattr(args, fmt))
+
+    queue = None
+    if args.queue:
+        from sharding import WorkQueue
+        queue = WorkQueue(get_file_path(args.queue), args.worker_id)
+    if args.shard:
+        from sharding import select_shard
+        mappings = select_shard(mappings, *args.shard, steal=queue is not None)
+
+    if args.linear and args.pipeline:
+        print("✗ --linear cannot be combined with --pipeline")
+        return 2
+    if args.pipeline and len(formats) > 1:
+        print("✗ --html and --json cannot be combined with --pipeline")
+        return 2
+    if args.linear:
+        from fast_view import linearizer
+        if linearizer() is None:
+            print("✗ --linear needs pikepdf (pip install pikepdf) or the qpdf tool")
+            return 1
+
+    if args.preflight or args.strict:
+        from preflight import print_preflight_report, run_preflight
+        report = run_preflight(mappings, workers=args.workers)
+        print_preflight_report(report, len(mappings))
+        if report and args.strict:
+            print("Aborting: fix the inputs above or run without --strict")
+            return 1
+
+    from compliance import evaluate, failures
+    non_compliant = failures(evaluate(mappings))
+    for code, failed in non_compliant.items():
+        print(f"✗ {code} is not Section 17 compliant: "
+              + "; ".join(f"{r['rule']} {r['text']}" for r in failed))
+    if non_compliant and args.strict:
+        print("Aborting: fix the mappings above or run without --strict")
+        return 1
+
     # Create output folder
-    output_path = get_file_path(OUTPUT_FOLDER)
+    output_path = get_file_path(args.output or OUTPUT_FOLDER)
     if not os.path.exists(output_path):
         os.makedirs(output_path)
-    
+
+    bundle = None
+    if args.bundle:
+        from bundle import BundleError, open_bundle
+        try:
+            bundle = open_bundle(get_file_path(args.bundle))
+        except BundleError as e:
+            print(f"✗ {e}")
+            return 1
+
+    def add_to_bundle(*paths):
+        for path in paths:
+            if bundle and os.path.exists(path):
+                bundle.add(path, os.path.join(os.path.basename(output_path), os.path.relpath(path, output_path)))
+
+    def holds_lease(mapping):
+        """Asked before a finished output replaces the old one: another worker
+        may have taken the mapping over (and written its own output) meanwhile"""
+        return queue.owns(mapping['ktu_code'])
+
+    def lease_lost(mapping):
+        # Only our own temporary files were dropped (atomic_output); the
+        # output in place belongs to the worker that took over
+        queue.release(mapping['ktu_code'])
+        print(f"    ✗ Lease lost, left to the worker that took over: {mapping['ktu_code']}")
+
+    def report_paths(mapping):
+        return [format_path(report_filename(mapping), output_path, fmt) for fmt in formats]
+
     print("=" * 60)
     print("KTU MOOC APPROVAL REPORT GENERATOR")
     print("=" * 60)
     print(f"\nOutput Folder: {output_path}")
-    print(f"Total Mappings: {len(MAPPINGS)}")
+    print(f"Total Mappings: {len(mappings)}")
     print("-" * 60)
-    
+
+    # Fingerprint re-issued NPTEL PDFs here, on the main thread: input_digest
+    # (also called from the pipeline's reader thread) only reads the baselines
+    from text_fingerprint import refresh_fingerprints
+    for filename, status in refresh_fingerprints(mappings).items():
+        if status not in ("unchanged", "new"):
+            print(f"    NPTEL PDF {filename}: {status}")
+
+    journal = CheckpointJournal(output_path)
+    generated = []
     success_count = 0
+    skipped_count = 0
     error_count = 0
-    
-    for idx, mapping in enumerate(MAPPINGS, 1):
+
+    if args.pipeline:
+        from pipeline import run_pipeline
+
+        counts = {"done": 0, "skipped": 0, "errors": 0}
+        digests = {}
+
+        def select(mapping):
+            digest = digests[mapping['ktu_code']] = input_digest(mapping)
+            if args.resume and journal.is_done(mapping['ktu_code'], digest):
+                print(f"    Up to date: {mapping['ktu_code']} - {mapping['ktu_name']}")
+                add_to_bundle(os.path.join(output_path, report_filename(mapping)))
+                counts["skipped"] += 1
+                return False
+            return not queue or queue.claim(mapping['ktu_code'])
+
+        def done(mapping, report_path, error):
+            if isinstance(error, OutputDiscarded):
+                lease_lost(mapping)
+            elif error is None:
+                journal.record(mapping['ktu_code'], digests[mapping['ktu_code']], report_path)
+                if queue:
+                    queue.complete(mapping['ktu_code'])
+                add_to_bundle(report_path)
+                print(f"    ✓ Created: {os.path.basename(report_path)}")
+                generated.append(mapping)
+                counts["done"] += 1
+            else:
+                if queue:
+                    queue.release(mapping['ktu_code'])
+                print(f"    ✗ ERROR {mapping['ktu_code']}: {error}")
+                counts["errors"] += 1
+
+        metrics = run_pipeline(mappings, output_path, depth=args.depth, select=select, done=done,
+                               publish=holds_lease if queue else None)
+        print_pipeline_metrics(metrics)
+        success_count, skipped_count, error_count = counts["done"], counts["skipped"], counts["errors"]
+        mappings = []
+
+    for idx, mapping in enumerate(mappings, 1):
         try:
-            print(f"\n[{idx}/{len(MAPPINGS)}] Generating: {mapping['ktu_code']} - {mapping['ktu_name']}")
-            report_path = generate_report(mapping, output_path)
-            print(f"    ✓ Created: {os.path.basename(report_path)}")
+            digest = input_digest(mapping) + ("-linear" if args.linear else "") + "".join(f"-{f}" for f in formats[1:])
+            if args.resume and journal.is_done(mapping['ktu_code'], digest):
+                print(f"\n[{idx}/{len(mappings)}] Up to date: {mapping['ktu_code']} - {mapping['ktu_name']}")
+                add_to_bundle(*report_paths(mapping))
+                skipped_count += 1
+                continue
+            if queue and not queue.claim(mapping['ktu_code']):
+                print(f"\n[{idx}/{len(mappings)}] Taken by another worker: {mapping['ktu_code']}")
+                continue
+            print(f"\n[{idx}/{len(mappings)}] Generating: {mapping['ktu_code']} - {mapping['ktu_name']}")
+            try:
+                paths = write_report(mapping, output_path, formats, linear=args.linear,
+                                     publish=(lambda: holds_lease(mapping)) if queue else None)
+            except OutputDiscarded:
+                lease_lost(mapping)
+                continue
+            journal.record(mapping['ktu_code'], digest, paths["pdf"])
+            add_to_bundle(*paths.values())
+            if queue:
+                queue.complete(mapping['ktu_code'])
+            print(f"    ✓ Created: {', '.join(os.path.relpath(p, output_path) for p in paths.values())}")
+            generated.append(mapping)
             success_count += 1
         except Exception as e:
+            if queue:
+                queue.release(mapping['ktu_code'])
             print(f"    ✗ ERROR: {e}")
             error_count += 1
-    
+
+    if queue:
+        queue.close()
+
+    if generated:
+        from search_index import update_index
+        try:
+            update_index(generated)
+        except Exception as e:
+            print(f"\n    ✗ Search index not updated: {e}")
+
+    if args.verify and generated:
+        from report_verifier import print_verification, verify_reports
+        print("-" * 60)
+        print("POST-BUILD VERIFICATION")
+        results = verify_reports(generated, output_path)
+        print_verification(results)
+        error_count += sum(row["status"] != "pass" for row in results)
+
+    if bundle:
+        import time
+        start = time.perf_counter()
+        try:
+            manifest = bundle.close()
+            print(f"\n    ✓ Bundle: {args.bundle} ({len(manifest['files'])} reports, "
+                  f"{os.path.getsize(bundle.path) / 1e6:.1f} MB), finished "
+                  f"{time.perf_counter() - start:.2f} s after the last report")
+        except BundleError as e:
+            print(f"\n    ✗ Bundle not written: {e}")
+            error_count += 1
+
     print("\n" + "=" * 60)
-    print(f"COMPLETED: {success_count} reports generated, {error_count} errors")
+    print(f"COMPLETED: {success_count} reports generated, {skipped_count} resumed, {error_count} errors")
     print(f"Output Location: {output_path}")
     print("=" * 60)
+    return 1 if error_count else 0
+
+
+def cmd_verify(args):
+    """Check generated reports: PDF structure, page counts, placeholder and blank pages"""
+    import json
+    from mooc_mappings import OUTPUT_FOLDER, find_mappings
+    from report_verifier import print_verification, verify_reports
+
+    results = verify_reports(find_mappings(args.codes), args.output or OUTPUT_FOLDER, workers=args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_verification(results)
+    return 1 if any(row["status"] != "pass" for row in results) else 0
+
+
+def cmd_analytics(args):
+    """Filters, group-bys and summary statistics over the mappings of this and earlier semesters"""
+    import json
+    import time
+    from mapping_table import MappingTable, TableError, synthetic_history
+    from mooc_mappings import MAPPINGS, SEMESTER, get_file_path
+
+    try:
+        if args.table:
+            table = MappingTable.load(get_file_path(args.table))
+        else:
+            from semester_diff import load_semester_store
+            stores = [load_semester_store(spec) for spec in args.history] + [(SEMESTER, MAPPINGS)]
+            table = MappingTable.from_stores(stores)
+        if args.bench:
+            table = synthetic_history(table, args.bench)
+        start = time.perf_counter()
+        selected = table.filter(args.where)
+        stats = args.stat.split(",") if args.stat else ["overlap", "duration_weeks"]
+        result = selected.group_by(args.by.split(","), stats) if args.by else selected.describe(stats)
+        elapsed = time.perf_counter() - start
+        if args.export:
+            selected.save(get_file_path(args.export))
+    except TableError as e:
+        print(f"✗ {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps(selected.rows() if args.show else result, indent=2))
+        return 0
+    if args.show:
+        for row in selected.rows():
+            print(f"{row['semester']:<14}{row['ktu_code']:<15}{row['category']:<15}{row['institute'][:24]:<25}"
+                  f"{row['duration_weeks']:>4.0f} wk{row['overlap']:>7.1f}%")
+    if args.by:
+        keys = args.by.split(",")
+        print("".join(f"{k:<24}" for k in keys) + f"{'count':>7}" + "".join(f"{s + ' mean':>22}" for s in stats))
+        for row in result:
+            means = "".join("{:>22}".format("-" if row[f"{s}_mean"] is None else
+                                            f"{row[f'{s}_mean']:.1f} ({row[f'{s}_min']:g}-{row[f'{s}_max']:g})")
+                            for s in stats)
+            print("".join(f"{str(row[k])[:23]:<24}" for k in keys) + f"{row['count']:>7}" + means)
+    else:
+        for name, summary in result.items():
+            if summary["count"]:
+                print(f"{name:<16} n={summary['count']:<6} mean {summary['mean']:.2f}  "
+                      f"min {summary['min']:g}  max {summary['max']:g}")
+            else:
+                print(f"{name:<16} n=0")
+    print(f"{len(selected)} of {len(table)} rows; query {elapsed * 1000:.2f} ms")
+    if args.export:
+        print(f"✓ Exported {len(selected)} rows to {args.export}")
+    return 0
+
+
+def cmd_fingerprint(args):
+    """Compare NPTEL course PDFs with their stored text fingerprints"""
+    import json
+    import time
+    from mooc_mappings import find_mappings, get_file_path
+    from text_fingerprint import check_source, save_baseline, subject_key
+
+    rows = []
+    for mapping in find_mappings(args.codes):
+        filename = mapping.get("nptel_pdf")
+        if not filename or not os.path.exists(get_file_path(filename)):
+            continue
+        start = time.perf_counter()
+        baseline, current, comparison = check_source(filename, mapping.get("nptel_subject_id"))
+        elapsed = time.perf_counter() - start
+        key = subject_key(filename, mapping.get("nptel_subject_id"))
+        status = comparison["status"] if comparison else "new"
+        if status == "new" or (args.update and status != "unchanged"):
+            save_baseline(key, current)
+        rows.append({"ktu_code": mapping["ktu_code"], "subject": key, "file": filename, "status": status,
+                     "similarity": comparison["similarity"] if comparison else None,
+                     "changed_pages": comparison["changed_pages"] if comparison else [],
+                     "ms": round(elapsed * 1000, 2)})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    for row in rows:
+        mark = "✗" if row["status"] == "material" else "✓"
+        pages = ", ".join(f"p{page} {score:.2f}" for page, score in row["changed_pages"])
+        print(f"{mark} {row['ktu_code']:<15}{row['subject']:<12}{row['status']:<11}"
+              f"{pages or '-':<30}{row['ms']:>7.2f} ms")
+    material = sum(row["status"] == "material" for row in rows)
+    print(f"{len(rows)} NPTEL PDFs, {material} changed materially"
+          + (" (baselines updated)" if args.update else " (their reports are rebuilt by the next generate)"
+             if material else ""))
+    return 0
+
+
+def cmd_bundle(args):
+    """Pack finished report folders into one archive for submission"""
+    import time
+    from bundle import BundleError, folder_files, open_bundle
+    from mooc_mappings import OUTPUT_FOLDER, get_file_path
+
+    folders = [get_file_path(f) for f in args.folders or [OUTPUT_FOLDER, "MOOC_Reports"]]
+    files = []
+    for folder in folders:
+        if not os.path.isdir(folder):
+            print(f"✗ {folder}: not a folder")
+            return 1
+        files += folder_files(folder)
+    start = time.perf_counter()
+    try:
+        bundle = open_bundle(get_file_path(args.bundle), workers=args.workers, level=args.level)
+        for path, arcname in files:
+            bundle.add(path, arcname)
+        manifest = bundle.close()
+    except BundleError as e:
+        print(f"✗ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(bundle.path)
+    print(f"✓ {args.bundle}: {len(manifest['files'])} files, {bundle.bytes_in / 1e6:.1f} MB -> "
+          f"{size / 1e6:.1f} MB in {elapsed:.2f} s ({bundle.bytes_in / 1e6 / elapsed:.0f} MB/s)")
+    return 0
+
+
+def print_pipeline_metrics(metrics):
+    """Per-stage utilization of a pipelined build"""
+    print(f"\n    {'stage':<8}{'items':>6}{'busy s':>9}{'wait s':>9}{'util':>7}{'MB':>8}")
+    for stage in metrics["stages"]:
+        print(f"    {stage['stage']:<8}{stage['items']:>6}{stage['busy']:>9.2f}{stage['waiting']:>9.2f}"
+              f"{stage['utilization']:>7.0%}{stage['bytes'] / 1e6:>8.1f}")
+    print(f"    wall time {metrics['wall']:.2f} s")
+
+
+def cmd_pipeline(args):
+    """Benchmark the sequential generate loop against the pipelined build"""
+    import tempfile
+    from mooc_mappings import find_mappings
+    from pipeline import benchmark
+
+    mappings = find_mappings(args.codes)
+    with tempfile.TemporaryDirectory(prefix="mooc_pipeline_") as folder:
+        results = benchmark(mappings, args.output or folder, depth=args.depth)
+    sequential, pipelined = results["sequential"]["wall"], results["pipeline"]["wall"]
+    print(f"sequential loop: {sequential:.2f} s ({len(mappings) / sequential:.1f} reports/s)")
+    print(f"pipeline:        {pipelined:.2f} s ({len(mappings) / pipelined:.1f} reports/s), "
+          f"{sequential / pipelined:.2f}x")
+    print_pipeline_metrics(results["pipeline"])
+    return 0
+
+
+def cmd_memory(args):
+    """Memory of worker processes holding the source PDFs open: by path, mmap or bytes copy"""
+    from mooc_mappings import MAPPINGS, get_file_path
+    from source_loader import OPEN_MODES, measure
+
+    files = args.files or sorted({m[key] for m in MAPPINGS for key in ("ktu_source", "nptel_pdf") if m.get(key)})
+    paths = [get_file_path(f) for f in files if os.path.exists(get_file_path(f))]
+    print(f"{len(paths)} files, {sum(os.path.getsize(p) for p in paths) / 1e6:.1f} MB, {args.workers} workers")
+    print(f"{'mode':<7}{'peak RSS':>10}{'private':>10}{'PSS':>9}{'total PSS':>11}   (MB; per worker except total)")
+    for mode in OPEN_MODES:
+        usage = measure(paths, mode, workers=args.workers)
+        mean = lambda key: sum(u.get(key, 0) for u in usage) / len(usage) / 1024
+        print(f"{mode:<7}{mean('peak_rss'):>10.1f}{mean('anon'):>10.1f}{mean('pss'):>9.1f}"
+              f"{mean('pss') * len(usage):>11.1f}")
+    return 0
+
+
+def cmd_fonts(args):
+    """Size impact of the embedded Unicode font on the generated reports"""
+    from mooc_mappings import OUTPUT_FOLDER, find_mappings, get_file_path, report_filename
+    from pdf_fonts import UNICODE_FONT_FILE, font_source, unicode_font_bytes
+    import fitz  # PyMuPDF
+
+    source = font_source()
+    print(f"Unicode font: {os.path.relpath(UNICODE_FONT_FILE)} ({os.path.getsize(UNICODE_FONT_FILE) / 1024:.0f} KB)")
+    if source != UNICODE_FONT_FILE:
+        print(f"  loaded from fontTools subset {os.path.relpath(source)} ({os.path.getsize(source) / 1024:.0f} KB)")
+    else:
+        print("  loaded in full (pip install fonttools for smaller subsets)")
+
+    folder = get_file_path(args.output or OUTPUT_FOLDER)
+    total = font_total = 0
+    for mapping in find_mappings(args.codes):
+        path = os.path.join(folder, report_filename(mapping))
+        if not os.path.exists(path):
+            print(f"✗ {mapping['ktu_code']}: report not found")
+            continue
+        with fitz.open(path) as doc:
+            unicode_bytes = unicode_font_bytes(doc)
+        total += os.path.getsize(path)
+        font_total += unicode_bytes
+        print(f"  {mapping['ktu_code']:<14}{os.path.getsize(path) / 1024:>9.0f} KB   Unicode font {unicode_bytes / 1024:>5.1f} KB")
+    if total:
+        print(f"Unicode font: {font_total / 1024:.0f} KB of {total / 1024:.0f} KB ({font_total / total:.1%})")
+    return 0
+
+
+def cmd_list(args):
+    """Print the configured mappings"""
+    from mooc_mappings import find_mappings
+
+    for mapping in find_mappings(args.codes):
+        print(f"{mapping['ktu_code']:<15} {mapping.get('category', 'N/A'):<9} "
+              f"{mapping['ktu_name'][:32]:<33} -> {mapping['nptel_name'][:45]}")
+    return 0
+
+
+def cmd_validate(args):
+    """Check mapping fields without opening any PDF"""
+    from mooc_mappings import find_mappings, validate_mappings
+
+    mappings = find_mappings(args.codes)
+    report = validate_mappings(mappings)
+    for code, problems in report.items():
+        for problem in problems:
+            print(f"{code}: {problem}")
+    print(f"{len(mappings) - len(report)}/{len(mappings)} mappings valid")
+    return 1 if report else 0
+
+
+def cmd_preflight(args):
+    """Check that every input PDF exists, opens and covers the referenced pages"""
+    from mooc_mappings import find_mappings
+    from preflight import print_preflight_report, run_preflight
+
+    mappings = find_mappings(args.codes)
+    report = run_preflight(mappings, workers=args.workers)
+    print_preflight_report(report, len(mappings))
+    return 1 if report else 0
+
+
+def cmd_compliance(args):
+    """Check the mappings against the Section 17 rules"""
+    import time
+    from compliance import evaluate, failures
+    from mooc_mappings import find_mappings, get_file_path
+
+    mappings = find_mappings(args.codes)
+    start = time.perf_counter()
+    results = evaluate(mappings)
+    elapsed = (time.perf_counter() - start) * 1000
+    for code, checks in results.items():
+        marks = "  ".join(f"{r['rule']} {'✓' if r['passed'] else '✗'}" for r in checks)
+        print(f"{code:<15} {marks}")
+        for r in checks:
+            if not r["passed"]:
+                print(f"      {r['label']}: {r['text']}")
+    non_compliant = failures(results)
+    print(f"{len(mappings) - len(non_compliant)}/{len(mappings)} mappings compliant ({elapsed:.1f} ms)")
+
+    if args.report:
+        from report_builder import create_noncompliance_report
+        path = create_noncompliance_report(non_compliant, mappings, get_file_path(args.report))
+        print(f"Non-compliance report: {path}")
+    return 1 if non_compliant else 0
+
+
+def cmd_merge(args):
+    """Assemble the manifest and principal proposal from shard output folders"""
+    from mooc_mappings import OUTPUT_FOLDER, get_file_path
+    from sharding import MANIFEST_NAME, merge_shards
+
+    shard_folders = [get_file_path(folder) for folder in args.shard_folders]
+    if args.output:
+        output_path = get_file_path(args.output)
+    elif len(shard_folders) == 1:
+        output_path = shard_folders[0]  # shared output folder, merge in place
+    else:
+        output_path = get_file_path(OUTPUT_FOLDER)
+    manifest, missing = merge_shards(shard_folders, output_path)
+    print(f"Merged {len(manifest['reports'])} reports into {output_path}")
+    print(f"  Manifest: {os.path.join(output_path, MANIFEST_NAME)}")
+    if missing:
+        print(f"  ✗ Missing: {', '.join(missing)}")
+    return 1 if missing else 0
+
+
+def cmd_syllabus(args):
+    """Parse the KTU syllabus modules from each mapping's ktu_pages"""
+    from ktu_syllabus import check_mapping, module_summary, parse_curriculum
+    from mooc_mappings import find_mappings, get_file_path
+
+    mappings = find_mappings(args.codes)
+    failed = 0
+    for mapping in mappings:
+        modules, problems = check_mapping(mapping)
+        hours = sum(m["hours"] or 0 for m in modules)
+        mark = "✗" if problems else "✓"
+        print(f"{mark} {mapping['ktu_code']:<15} {len(modules)} modules, {hours} contact hours")
+        for problem in problems:
+            print(f"      {problem}")
+        if args.verbose:
+            for module in modules:
+                print(f"      {module_summary(module)}  [{module['hours']} h]")
+        failed += bool(problems)
+
+    if args.curricula:
+        print("-" * 60)
+        sources = sorted({m["ktu_source"] for m in mappings if m.get("ktu_source")})
+        for source in sources:
+            if not os.path.exists(get_file_path(source)):
+                continue
+            courses = parse_curriculum(source)
+            clean = sum(1 for modules in courses.values() if modules
+                        and [m["number"] for m in modules] == list(range(1, len(modules) + 1))
+                        and all(m["hours"] is not None for m in modules))
+            print(f"{source}: {len(courses)} courses, {clean} with a complete module table")
+    return 1 if failed else 0
+
+
+def cmd_nptel(args):
+    """Extract course details from NPTEL course PDFs and check them against the mappings"""
+    import json
+    from mooc_mappings import BASE_DIR, MAPPINGS, get_file_path
+    from nptel_course import compare_with_mapping, extract_courses, find_course_pdfs
+
+    files = []
+    for path in args.paths or [BASE_DIR]:
+        path = get_file_path(path)
+        files.extend(find_course_pdfs(path) if os.path.isdir(path) else [path])
+    courses = extract_courses(files, workers=args.workers)
+
+    if args.json:
+        print(json.dumps([c.mapping_fields() for c in courses.values()], indent=2, ensure_ascii=False))
+        return 0
+
+    by_file = {}
+    for mapping in MAPPINGS:
+        if mapping.get("nptel_pdf"):
+            by_file.setdefault(mapping["nptel_pdf"], []).append(mapping)
+    mismatches = 0
+    for course in courses.values():
+        print(f"{course.subject_id}  {course.title[:48]:<49} {course.weeks:>2} weeks  "
+              f"{', '.join(course.instructors)[:40]}")
+        for mapping in by_file.get(course.file, []):
+            for problem in compare_with_mapping(course, mapping):
+                print(f"    ✗ {mapping['ktu_code']}: {problem}")
+                mismatches += 1
+    return 1 if mismatches else 0
+
+
+def cmd_catalog(args):
+    """Build the NPTEL catalog index, then look up IDs or cross-check the mappings"""
+    from course_catalog import CATALOG_DB, build_catalog, check_mapping, connect, lookup
+    from mooc_mappings import MAPPINGS, get_file_path
+
+    db_path = get_file_path(args.db) if args.db else CATALOG_DB
+    for filename, rows in build_catalog(db_path, workers=args.workers, force=args.rebuild).items():
+        print(f"{filename}: " + ("unchanged" if rows is None else f"indexed {rows} rows"))
+
+    conn = connect(db_path)
+    failed = 0
+    if args.keys:
+        for key in args.keys:
+            courses, offerings = lookup(conn, key)
+            print(f"{'✓' if courses or offerings else '✗'} {key}")
+            for c in courses:
+                print(f"      {c['subject_id']}  {c['subject_name']} ({c['institute']}, {c['content_type']})")
+            for o in offerings[:1]:
+                print(f"      {o['course_id']:<12} {o['course_name']} ({o['institute']}, {o['duration']}, "
+                      f"{o['start_date']} - {o['end_date']})")
+            if len(offerings) > 1:
+                print(f"      (listed on {len(offerings) - 1} more course list sheet(s))")
+            failed += not (courses or offerings)
+    else:
+        for mapping in MAPPINGS:
+            problems = check_mapping(conn, mapping)
+            print(f"{'✗' if problems else '✓'} {mapping['ktu_code']:<15} {mapping['nptel_id']}")
+            for problem in problems:
+                print(f"      {problem}")
+            failed += bool(problems)
+    conn.close()
+    return 1 if failed else 0
+
+
+def cmd_preview(args):
+    """Render page thumbnails and a contact sheet per generated report"""
+    from mooc_mappings import OUTPUT_FOLDER, find_mappings, get_file_path
+    from previews import build_previews
+
+    report_folder = get_file_path(args.output or OUTPUT_FOLDER)
+    results = build_previews(find_mappings(args.codes), report_folder, dpi=args.dpi,
+                             with_pdf=args.pdf, workers=args.workers)
+    failed = 0
+    for result in results:
+        if "error" in result:
+            print(f"✗ {result['code']:<15} {result['error']}")
+            failed += 1
+        else:
+            print(f"✓ {result['code']:<15} {result['pages']:>3} pages, {result['rendered']:>3} rendered  "
+                  f"{os.path.relpath(result['sheet'], report_folder)}")
+    return 1 if failed else 0
+
+
+def cmd_fastview(args):
+    """Benchmark bytes needed to show page 1: plain save vs. linearized"""
+    import tempfile
+    from fast_view import LinearizeUnavailable, benchmark
+    from mooc_mappings import find_mappings
+    from report_builder import build_report
+
+    print(f"{'Report':<15} {'plain size':>11} {'page 1 after':>13} {'linear size':>12} {'page 1 after':>13}")
+    total_plain = total_linear = 0
+    with tempfile.TemporaryDirectory() as folder:
+        for mapping in find_mappings(args.codes):
+            doc = build_report(mapping)
+            try:
+                result = benchmark(doc, folder, mapping['ktu_code'])
+            except LinearizeUnavailable as e:
+                print(f"✗ {e}")
+                return 1
+            finally:
+                doc.close()
+            total_plain += result["plain_first_page"]
+            total_linear += result["linear_first_page"]
+            mark = "✓" if result["hints_valid"] else "✗"
+            print(f"{mapping['ktu_code']:<15} {result['plain_size']:>11,} {result['plain_first_page']:>13,} "
+                  f"{result['linear_size']:>12,} {result['linear_first_page']:>13,} {mark}")
+    print(f"Page 1 needs {total_linear:,} bytes linearized vs {total_plain:,} bytes plain "
+          f"({total_plain / max(total_linear, 1):.0f}x less to download)")
+    return 0
+
+
+def cmd_store(args):
+    """Archive folders into the content-addressed store, show its size or collect garbage"""
+    import re
+    from mooc_mappings import MAPPINGS, SEMESTER, get_file_path
+    from object_store import ObjectStore, live_source_digests
+
+    store = ObjectStore()
+    if args.action == "archive":
+        folders = args.folders or ["Final Output"]
+        for folder in folders:
+            path = get_file_path(folder)
+            name = args.name if args.name and len(folders) == 1 else \
+                re.sub(r"[^\w-]+", "_", f"{args.name or SEMESTER} {os.path.basename(path)}")
+            files, added = store.archive(path, name, link=args.link)
+            print(f"✓ {folder}: {files} PDFs archived as '{name}', {added} new objects")
+    elif args.action == "gc":
+        removed, freed = store.gc(live_sources=live_source_digests(MAPPINGS), dry_run=args.dry_run)
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"{verb} {removed} unreferenced objects ({freed / 1e6:.1f} MB)")
+    count, size = store.usage()
+    manifests = store.manifests()
+    copies = sum(len(files) for files in manifests.values())
+    print(f"Store: {count} objects, {size / 1e6:.1f} MB; {len(manifests)} archives with {copies} files")
+    return 0
+
+
+def cmd_diff(args):
+    """Compare two mapping stores and/or two output folders"""
+    import json
+    from mooc_mappings import MAPPINGS, get_file_path
+    from semester_diff import diff_mappings, diff_outputs, load_mapping_store, print_diff
+
+    mapping_diff = output_diff = None
+    if args.old_mappings:
+        old = load_mapping_store(args.old_mappings)
+        new = load_mapping_store(args.new_mappings) if args.new_mappings else MAPPINGS
+        mapping_diff = diff_mappings(old, new)
+    if args.outputs:
+        output_diff = diff_outputs(*(get_file_path(f) for f in args.outputs), workers=args.workers)
+    if mapping_diff is None and output_diff is None:
+        print("Nothing to compare: give a mapping store and/or --outputs OLD NEW")
+        return 2
+
+    if args.json:
+        print(json.dumps({"mappings": mapping_diff, "reports": output_diff}, indent=2, ensure_ascii=False))
+    else:
+        print_diff(mapping_diff, output_diff)
+    changed = any(mapping_diff.values()) if mapping_diff else False
+    changed = changed or bool(output_diff and (output_diff["added"] or output_diff["removed"]
+                                               or output_diff["changed"]))
+    return 1 if changed else 0
+
+
+def cmd_credit(args):
+    """Mail-merge a student roster into per-student credit-transfer PDFs"""
+    import time
+    from credit_transfer import TRANSFER_FOLDER, RosterError, merge_roster, read_roster
+    from mooc_mappings import MAPPINGS, OUTPUT_FOLDER, get_file_path
+
+    try:
+        groups, problems = read_roster(get_file_path(args.roster), MAPPINGS)
+    except (OSError, RosterError) as e:
+        print(f"✗ {e}")
+        return 2
+    for line, problem in problems:
+        print(f"✗ line {line}: {problem}")
+
+    output_path = get_file_path(args.output or OUTPUT_FOLDER)
+    start = time.perf_counter()
+    result = merge_roster(groups, MAPPINGS, output_path, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    for register_no, error in result["errors"]:
+        print(f"✗ {register_no}: {error}")
+    rate = result["written"] / elapsed * 60 if elapsed else 0
+    print(f"✓ {result['written']} credit-transfer sheets for {result['courses']} courses in {elapsed:.1f} s "
+          f"({rate:.0f}/min) -> {os.path.join(output_path, TRANSFER_FOLDER)}")
+    return 1 if problems or result["errors"] else 0
+
+
+def cmd_search(args):
+    """Full-text search over mappings, comparison rows and report pages"""
+    import time
+    from search_index import connect, search, update_index
+
+    conn = connect()
+    if args.update or args.rebuild:
+        updated = update_index(conn=conn, force=args.rebuild)
+        print(f"✓ Indexed {len(updated)} changed mappings")
+    if not args.query:
+        return 0
+    start = time.perf_counter()
+    hits = search(" ".join(args.query), conn, limit=args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    conn.close()
+    for hit in hits:
+        if hit["source"]:
+            where = f"{hit['source']} p. {hit['page']}, report p. {hit['report_page']}"
+        else:
+            where = f"{hit['kind']}, report p. {hit['report_page']}"
+        print(f"{hit['code']:<12} {where}")
+        print(f"    {' '.join(hit['snippet'].split())}")
+    print(f"{len(hits)} hits in {elapsed:.1f} ms")
+    return 0 if hits else 1
+
+
+def cmd_serve(args):
+    """Serve reports over HTTP, rendering them on first request"""
+    from report_server import create_server
+
+    server = create_server(args.host, args.port, workers=args.workers, cache_bytes=args.cache_mb << 20)
+    host, port = server.server_address[:2]
+    print(f"Serving reports on http://{host}:{port}/  (/report/<KTU_CODE>, /proposal, /binder)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+    return 0
+
+
+def _shard_arg(spec):
+    from sharding import parse_shard
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        description="Generate KTU MOOC approval reports (KTU Regulations 2024, Section 17)")
+    commands = parser.add_subparsers(dest="command")
+
+    p = commands.add_parser("generate", help="render reports (default command)")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE", help="only these mappings")
+    p.add_argument("-o", "--output", help="output folder (default: Final Output)")
+    p.add_argument("--resume", action="store_true",
+                   help="skip reports already completed from unchanged inputs")
+    p.add_argument("--shard", type=_shard_arg, metavar="i/N",
+                   help="only render shard i of N (stable hash of ktu_code)")
+    p.add_argument("--queue", metavar="DIR",
+                   help="claim mappings through lease files in DIR (shared filesystem)")
+    p.add_argument("--worker-id", help="worker name used in lease files (default: host-pid)")
+    p.add_argument("--linear", action="store_true",
+                   help="write linearized (fast web view) PDFs; needs pikepdf or qpdf")
+    p.add_argument("--html", action="store_true",
+                   help="also write an HTML page per report to html/ (from the same report model)")
+    p.add_argument("--json", action="store_true",
+                   help="also write the report model as JSON to json/ for the registrar's system")
+    p.add_argument("--preflight", action="store_true", help="check all inputs before rendering")
+    p.add_argument("--strict", action="store_true",
+                   help="abort if the pre-flight or Section 17 compliance check fails")
+    p.add_argument("--pipeline", action="store_true",
+                   help="overlap reading sources and writing reports with rendering")
+    p.add_argument("--depth", type=int, default=4, help="pipeline queue depth (default: %(default)s)")
+    p.add_argument("--verify", action="store_true",
+                   help="check the generated reports (page counts, placeholder pages, PDF structure)")
+    p.add_argument("--bundle", metavar="FILE.zip",
+                   help="also pack the reports into a .zip or .tar.zst with a SHA-256 manifest as they are written")
+    p.add_argument("-j", "--workers", type=int, default=8, help="pre-flight threads (default: %(default)s)")
+    p.set_defaults(func=cmd_generate)
+
+    p = commands.add_parser("verify", help="check generated reports: page counts, placeholder pages, PDF structure")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-o", "--output", help="report folder (default: Final Output)")
+    p.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--json", action="store_true", help="print the results as JSON")
+    p.set_defaults(func=cmd_verify)
+
+    p = commands.add_parser("analytics", help="filters, group-bys and statistics over mappings across semesters")
+    p.add_argument("-w", "--where", action="append", default=[], metavar="COND",
+                   help="filter such as category=PE4, overlap>=80, institute~Kharagpur (repeatable)")
+    p.add_argument("--by", metavar="COLUMNS", help="group by these comma-separated columns")
+    p.add_argument("--stat", metavar="COLUMNS", help="numeric columns to summarize (default: overlap,duration_weeks)")
+    p.add_argument("--history", action="append", default=[], metavar="STORE",
+                   help="add an earlier semester: mooc_mappings.py copy, .json or git:<rev> (repeatable)")
+    p.add_argument("--table", metavar="FILE", help="query a saved table instead of the mapping stores")
+    p.add_argument("--export", metavar="FILE", help="save the selected rows (.parquet, .arrow, .npz or .json)")
+    p.add_argument("--show", action="store_true", help="list the selected rows")
+    p.add_argument("--json", action="store_true", help="print the result as JSON")
+    p.add_argument("--bench", type=int, metavar="ROWS", help="repeat the table as extra semesters up to ROWS rows")
+    p.set_defaults(func=cmd_analytics)
+
+    p = commands.add_parser("fingerprint", help="detect material text changes in re-issued NPTEL PDFs")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("--update", action="store_true", help="store the current files as the new baselines")
+    p.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    p.set_defaults(func=cmd_fingerprint)
+
+    p = commands.add_parser("bundle", help="pack report folders into a .zip or .tar.zst with a SHA-256 manifest")
+    p.add_argument("bundle", metavar="FILE", help="archive to write (.zip or .tar.zst)")
+    p.add_argument("folders", nargs="*", metavar="FOLDER",
+                   help="folders to pack (default: Final Output and MOOC_Reports)")
+    p.add_argument("-j", "--workers", type=int, help="compression threads (default: CPU count)")
+    p.add_argument("--level", type=int, help="compression level (default: 6 for zip, 3 for zstd; 0 stores)")
+    p.set_defaults(func=cmd_bundle)
+
+    p = commands.add_parser("list", help="list course mappings")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("validate", help="check mapping fields")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.set_defaults(func=cmd_validate)
+
+    p = commands.add_parser("preflight", help="check input PDFs before generating")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-j", "--workers", type=int, default=8, help="threads (default: %(default)s)")
+    p.set_defaults(func=cmd_preflight)
+
+    p = commands.add_parser("compliance", help="check mappings against the Section 17 rules")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-o", "--report", metavar="PDF", help="also write a non-compliance report PDF")
+    p.set_defaults(func=cmd_compliance)
+
+    p = commands.add_parser("syllabus", help="parse KTU syllabus modules from the curricula")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-v", "--verbose", action="store_true", help="print the parsed modules")
+    p.add_argument("--curricula", action="store_true",
+                   help="also parse every course of the referenced curricula")
+    p.set_defaults(func=cmd_syllabus)
+
+    p = commands.add_parser("nptel", help="extract course details from NPTEL course PDFs")
+    p.add_argument("paths", nargs="*", metavar="PDF_OR_FOLDER",
+                   help="course PDFs or folders of them (default: the repository folder)")
+    p.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--json", action="store_true", help="print mapping-ready nptel_* fields as JSON")
+    p.set_defaults(func=cmd_nptel)
+
+    p = commands.add_parser("catalog", help="index the NPTEL catalog PDFs and look up courses")
+    p.add_argument("keys", nargs="*", metavar="ID",
+                   help="course IDs (noc26_ee31) or subject IDs to look up (default: check all mappings)")
+    p.add_argument("--rebuild", action="store_true", help="re-extract even if the PDFs are unchanged")
+    p.add_argument("--db", help="SQLite file (default: .mooc_cache/catalog.sqlite)")
+    p.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_catalog)
+
+    p = commands.add_parser("pipeline", help="benchmark the pipelined build against the sequential loop")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-o", "--output", help="scratch folder for both builds (default: a temporary folder)")
+    p.add_argument("--depth", type=int, default=4, help="queue depth (default: %(default)s)")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = commands.add_parser("memory", help="worker memory with sources opened by path, mmap or bytes")
+    p.add_argument("files", nargs="*", metavar="PDF", help="source files (default: all mapping sources)")
+    p.add_argument("-j", "--workers", type=int, default=8, help="worker processes (default: %(default)s)")
+    p.set_defaults(func=cmd_memory)
+
+    p = commands.add_parser("fonts", help="size of the embedded Unicode font in the generated reports")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-o", "--output", help="report folder (default: Final Output)")
+    p.set_defaults(func=cmd_fonts)
+
+    p = commands.add_parser("preview", help="page thumbnails and contact sheets of generated reports")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.add_argument("-o", "--output", help="report folder (default: Final Output); sheets go to its previews/")
+    p.add_argument("--dpi", type=int, default=36, help="thumbnail resolution (default: %(default)s)")
+    p.add_argument("--pdf", action="store_true", help="also write each contact sheet as a PDF")
+    p.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_preview)
+
+    p = commands.add_parser("fastview", help="benchmark page-1 download size, plain vs. linearized PDF")
+    p.add_argument("codes", nargs="*", metavar="KTU_CODE")
+    p.set_defaults(func=cmd_fastview)
+
+    p = commands.add_parser("store", help="content-addressed store of source sections and archived reports")
+    p.add_argument("action", choices=["stats", "archive", "gc"])
+    p.add_argument("folders", nargs="*", metavar="FOLDER", help="folders to archive (default: Final Output)")
+    p.add_argument("--name", help="archive name (default: semester and folder name)")
+    p.add_argument("--link", action="store_true", help="replace archived files by hard links into the store")
+    p.add_argument("--dry-run", action="store_true", help="gc: only report what would be removed")
+    p.set_defaults(func=cmd_store)
+
+    p = commands.add_parser("diff", help="what changed since the last submission: mappings and report pages")
+    p.add_argument("old_mappings", nargs="?", metavar="OLD",
+                   help="old mapping store: mooc_mappings.py copy, .json list or git:<rev>")
+    p.add_argument("new_mappings", nargs="?", metavar="NEW", help="new mapping store (default: current MAPPINGS)")
+    p.add_argument("--outputs", nargs=2, metavar=("OLD_DIR", "NEW_DIR"), help="compare two report folders")
+    p.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--json", action="store_true", help="print the diff as JSON")
+    p.set_defaults(func=cmd_diff)
+
+    p = commands.add_parser("credit", help="per-student credit-transfer PDFs from a roster CSV")
+    p.add_argument("roster", help="CSV with register_no, name, ktu_code or nptel_id [, branch, score, certificate_id]")
+    p.add_argument("-o", "--output", help="output folder (default: Final Output); PDFs go to its credit_transfer/")
+    p.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_credit)
+
+    p = commands.add_parser("search", help="full-text search over mappings and report pages")
+    p.add_argument("query", nargs="*", help="words or an FTS5 query (\"object oriented\" NEAR(...), prefix*)")
+    p.add_argument("-n", "--limit", type=int, default=20, help="maximum hits (default: %(default)s)")
+    p.add_argument("--update", action="store_true", help="re-index mappings whose inputs changed first")
+    p.add_argument("--rebuild", action="store_true", help="re-index all mappings first")
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("serve", help="serve reports over HTTP, rendered on demand")
+    p.add_argument("--host", default="127.0.0.1", help="bind address (default: %(default)s)")
+    p.add_argument("--port", type=int, default=8765, help="port (default: %(default)s)")
+    p.add_argument("-j", "--workers", type=int, help="render processes (default: CPU count)")
+    p.add_argument("--cache-mb", type=int, default=256, help="rendered PDF cache size (default: %(default)s MB)")
+    p.set_defaults(func=cmd_serve)
+
+    p = commands.add_parser("merge", help="assemble manifest and proposal from shard outputs")
+    p.add_argument("shard_folders", nargs="+", metavar="SHARD_FOLDER")
+    p.add_argument("-o", "--output", help="merged output folder (default: the shard folder if only one "
+                        "is given, else Final Output)")
+    p.set_defaults(func=cmd_merge)
+
+    return parser
+
+
+def main(argv=None):
+    """Main function: parse arguments and run the selected command"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    from mooc_mappings import UnknownMappingError
+    if args.command is None:
+        args = parser.parse_args(["generate"])
+    try:
+        return args.func(args)
+    except UnknownMappingError as e:
+        parser.error(str(e))
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
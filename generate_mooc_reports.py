@@ -13,9 +13,15 @@ Based on KTU B.Tech Regulations 2024, Section 17 (MOOC)
 """
 
 import fitz  # PyMuPDF
+import hashlib
+import json
 import os
+import shutil
 from datetime import datetime
 
+from mooc_cache import atomic_output
+from pdf_fonts import helv_can_show, subset, text_font
+
 # Configuration
 OUTPUT_FOLDER = "MOOC_Reports"
 SEMESTER = "Jan-Apr 2026"
@@ -470,6 +476,124 @@ def generate_report(mapping, output_folder):
     return output_path
 
 
+PROPOSAL_NAME = "MOOC_Principal_Proposal.pdf"
+# Rows already in a proposal are recorded in its catalog under this key
+PROPOSAL_STATE_KEY = "MOOCProposalState"
+# Rewrite the proposal in full once incremental updates add this fraction of its size
+COMPACT_OVERHEAD = 0.5
+# Page number (0-based) of the statistics page, and the rows shown per breakdown
+STATISTICS_PAGE = 1
+STATISTICS_ROWS = 12
+
+
+def _rows_digest(mappings):
+    """Digest of the rows a proposal lists, in order"""
+    sha = hashlib.sha256()
+    for m in mappings:
+        sha.update(json.dumps(m, sort_keys=True, default=str).encode())
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def _proposal_cells(m):
+    """(x, text) of the mapping fields in a summary table row"""
+    return ((55, m["ktu_code"]), (120, m["ktu_name"][:28]), (280, m["nptel_name"][:35]),
+            (505, m["nptel_duration"]))
+
+
+def _draw_proposal_rows(doc, page, y, mappings, start):
+    """Draw summary table rows from number start + 1 on; returns the (page, y) to continue at"""
+    for idx, m in enumerate(mappings, start):
+        fill = (0.97, 0.97, 0.97) if idx % 2 == 0 else (1, 1, 1)
+        page.draw_rect(fitz.Rect(30, y, 565, y + 28), fill=fill, color=(0.8,0.8,0.8), width=0.5)
+        
+        page.insert_text(fitz.Point(35, y + 18), str(idx + 1), fontsize=8, fontname="helv")
+        for x, text in _proposal_cells(m):
+            page.insert_text(fitz.Point(x, y + 18), text, fontsize=8, fontname=text_font(page, text))
+        y += 28
+        
+        if y > 750:
+            page = doc.new_page()
+            y = 50
+    return page, y
+
+
+def _draw_statistics_table(page, y, title, label, rows):
+    """One breakdown table of the statistics page; returns the y to continue at"""
+    page.insert_text(fitz.Point(40, y), title, fontsize=11, fontname="helv")
+    y += 8
+    page.draw_rect(fitz.Rect(40, y, 555, y + 18), fill=(0.2, 0.4, 0.6))
+    for x, heading in ((45, label), (330, "Courses"), (400, "Mean overlap"), (485, "Overlap range")):
+        page.insert_text(fitz.Point(x, y + 12), heading, fontsize=8, fontname="helv", color=(1, 1, 1))
+    y += 18
+    for n, row in enumerate(rows[:STATISTICS_ROWS]):
+        page.draw_rect(fitz.Rect(40, y, 555, y + 16), fill=(0.97, 0.97, 0.97) if n % 2 == 0 else (1, 1, 1),
+                       color=(0.8, 0.8, 0.8), width=0.5)
+        low, high = row["overlap_min"], row["overlap_max"]
+        cells = ((45, row["key"][:52]), (330, str(row["count"])),
+                 (400, "-" if row["overlap_mean"] is None else f"{row['overlap_mean']:.1f}%"),
+                 (485, "-" if low is None else f"{low:.0f}%" if low == high else f"{low:.0f}-{high:.0f}%"))
+        for x, text in cells:
+            page.insert_text(fitz.Point(x, y + 11), text, fontsize=8, fontname=text_font(page, text))
+        y += 16
+    if len(rows) > STATISTICS_ROWS:
+        page.insert_text(fitz.Point(45, y + 11), f"... and {len(rows) - STATISTICS_ROWS} more",
+                         fontsize=8, fontname="helv", color=(0.5, 0.5, 0.5))
+        y += 16
+    return y + 24
+
+
+def create_statistics_page(doc, mappings, index=-1):
+    """Breakdown of the proposed mappings by category, institute and duration"""
+    from mapping_table import MappingTable
+
+    table = MappingTable.from_stores([(SEMESTER, mappings)], catalog=False)
+    page = doc.new_page(index, width=595, height=842)
+    page.insert_text(fitz.Point(180, 50), "MAPPING STATISTICS", fontsize=14, fontname="helv")
+    overlap = table.describe(["overlap"])["overlap"]
+    compliant = sum(bool(c) for c in table.column("compliant"))
+    summary = f"{len(table)} courses, {compliant} meeting all Section 17 rules"
+    if overlap["count"]:
+        summary += (f"; content overlap {overlap['mean']:.1f}% on average "
+                    f"({overlap['min']:.0f}-{overlap['max']:.0f}%)")
+    page.insert_text(fitz.Point(40, 80), summary, fontsize=9, fontname="helv", color=(0.3, 0.3, 0.3))
+
+    y = 110
+    for title, key, label in (("By category", "category", "Category"),
+                              ("By offering institute", "institute", "Institute"),
+                              ("By duration", "duration_weeks", "Weeks")):
+        rows = table.group_by([key], ["overlap"])
+        for row in rows:
+            value = row.pop(key)
+            row["key"] = value or "N/A"
+        y = _draw_statistics_table(page, y, title, label, rows)
+    return page
+
+
+def _proposal_state(doc):
+    """Rows and table position recorded in a proposal, or None for older files"""
+    kind, value = doc.xref_get_key(doc.pdf_catalog(), PROPOSAL_STATE_KEY)
+    if kind != "string":
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def _set_proposal_state(doc, state):
+    doc.xref_set_key(doc.pdf_catalog(), PROPOSAL_STATE_KEY, fitz.get_pdf_str(json.dumps(state)))
+
+
+def _incremental_bytes(path):
+    """(bytes of the last full write, bytes appended by incremental updates since)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    end = data.find(b"%%EOF")
+    base = len(data) if end < 0 else end + 5
+    return base, len(data) - base
+
+
 def create_principal_proposal(mappings, output_folder):
     """Create summary proposal for Principal"""
     doc = fitz.open()
@@ -489,6 +613,9 @@ def create_principal_proposal(mappings, output_folder):
     
     page.insert_text(fitz.Point(220, 700), f"Date: {datetime.now().strftime('%B %d, %Y')}", fontsize=10, fontname="helv")
     
+    # Statistics (redrawn when the file is compacted or recreated, not on every append)
+    create_statistics_page(doc, mappings)
+    
     # Summary Table
     page = doc.new_page(width=595, height=842)
     page.insert_text(fitz.Point(150, 40), "PROPOSED MOOC MAPPINGS", fontsize=14, fontname="helv")
@@ -503,28 +630,92 @@ def create_principal_proposal(mappings, output_folder):
     page.insert_text(fitz.Point(500, y + 15), "Duration", fontsize=8, fontname="helv", color=(1,1,1))
     y += 22
     
-    for idx, m in enumerate(mappings):
-        fill = (0.97, 0.97, 0.97) if idx % 2 == 0 else (1, 1, 1)
-        page.draw_rect(fitz.Rect(30, y, 565, y + 28), fill=fill, color=(0.8,0.8,0.8), width=0.5)
-        
-        page.insert_text(fitz.Point(35, y + 18), str(idx + 1), fontsize=8, fontname="helv")
-        page.insert_text(fitz.Point(55, y + 18), m["ktu_code"], fontsize=8, fontname="helv")
-        page.insert_text(fitz.Point(120, y + 18), m["ktu_name"][:28], fontsize=8, fontname="helv")
-        page.insert_text(fitz.Point(280, y + 18), m["nptel_name"][:35], fontsize=8, fontname="helv")
-        page.insert_text(fitz.Point(505, y + 18), m["nptel_duration"], fontsize=8, fontname="helv")
-        y += 28
-        
-        if y > 750:
-            page = doc.new_page()
-            y = 50
+    page, y = _draw_proposal_rows(doc, page, y, mappings, 0)
     
-    # Save
-    path = os.path.join(output_folder, "MOOC_Principal_Proposal.pdf")
-    doc.save(path)
+    # Save (the state lets update_principal_proposal append to this file later)
+    path = os.path.join(output_folder, PROPOSAL_NAME)
+    _set_proposal_state(doc, {"rows": len(mappings), "digest": _rows_digest(mappings), "y": y,
+                              "statistics_page": STATISTICS_PAGE, "statistics_rows": len(mappings)})
+    subset(doc)
+    with atomic_output(path) as tmp_path:
+        doc.save(tmp_path, garbage=3, deflate=True)
     doc.close()
     print(f"  Created: {path}")
 
 
+def update_principal_proposal(mappings, output_folder, compact_overhead=COMPACT_OVERHEAD):
+    """Bring the proposal up to date with mappings, appending rows where possible
+    
+    If the existing proposal already lists a prefix of mappings unchanged,
+    only the new rows are drawn and saved as an incremental (append-only)
+    update. Once the updates add more than compact_overhead times the size
+    of the last full write, the file is rewritten compactly with a fresh
+    statistics page; until then the statistics page keeps the counts of
+    the last full write (its course count says how many rows). A proposal
+    with changed, removed or reordered rows, or with new rows that need the
+    Unicode font, is recreated. Returns
+    "unchanged", "appended", "compacted" or "created".
+    """
+    path = os.path.join(output_folder, PROPOSAL_NAME)
+    doc = fitz.open(path) if os.path.exists(path) else None
+    state = _proposal_state(doc) if doc else None
+    if doc:
+        doc.close()
+    if (state is None or state.get("statistics_page") != STATISTICS_PAGE
+            or _rows_digest(mappings[:state["rows"]]) != state["digest"] or len(mappings) < state["rows"]):
+        create_principal_proposal(mappings, output_folder)
+        return "created"
+    
+    new = mappings[state["rows"]:]
+    if not new:
+        print(f"  Up to date: {path}")
+        return "unchanged"
+    if not all(helv_can_show(text) for m in new for _, text in _proposal_cells(m)):
+        # The embedded Unicode font is subset to the glyphs already drawn
+        create_principal_proposal(mappings, output_folder)
+        return "created"
+    
+    # Append in place, writing only the new rows. A proposal hard-linked
+    # into the content store (store archive --link) is copied first: store
+    # objects must never change
+    linked = os.stat(path).st_nlink > 1
+    tmp_path = f"{path}.{os.getpid()}.tmp" if linked else path
+    compact_path = f"{path}.{os.getpid()}.compact.tmp"
+    try:
+        if linked:
+            shutil.copyfile(path, tmp_path)
+        doc = fitz.open(tmp_path)
+        try:
+            _, y = _draw_proposal_rows(doc, doc[-1], state["y"], new, state["rows"])
+            state.update(rows=len(mappings), digest=_rows_digest(mappings), y=y)
+            _set_proposal_state(doc, state)
+            doc.save(tmp_path, incremental=True, deflate=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+            
+            result = "appended"
+            base, appended = _incremental_bytes(tmp_path)
+            if appended > compact_overhead * base:
+                # The statistics page is only brought up to date by a full write
+                doc.delete_page(STATISTICS_PAGE)
+                create_statistics_page(doc, mappings, STATISTICS_PAGE)
+                state["statistics_rows"] = len(mappings)
+                _set_proposal_state(doc, state)
+                subset(doc)
+                doc.save(compact_path, garbage=3, deflate=True)
+                result = "compacted"
+        finally:
+            doc.close()
+        if result == "compacted":
+            os.replace(compact_path, path)
+        elif linked:
+            os.replace(tmp_path, path)
+    finally:
+        for leftover in (tmp_path, compact_path):
+            if leftover != path and os.path.exists(leftover):
+                os.remove(leftover)
+    print(f"  Updated: {path} ({len(new)} rows {result})")
+    return result
+
+
 def main():
     if not os.path.exists(OUTPUT_FOLDER):
         os.makedirs(OUTPUT_FOLDER)
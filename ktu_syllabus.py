@@ -0,0 +1,255 @@
+"""
+KTU Syllabus Module Parser
+==========================
+Pulls the module-wise syllabus table out of KTU curriculum pages:
+
+    | Module No. | Syllabus Description | Contact Hours |
+
+Columns are located from the table header words, rows from the horizontal
+table rules (falling back to the module numbers when a table has no rules),
+and a module that continues on the next page is joined up. Works on the
+cached page layout from text_cache, so a curriculum is read from disk once
+per file version; parsed curricula are cached as well.
+
+Module record:
+    {"number": 1, "hours": 9, "description": "...", "topics": ["...", ...]}
+"""
+
+import json
+import os
+import re
+
+from mooc_cache import atomic_output, cache_path, file_digest
+from mooc_mappings import get_file_path
+from text_cache import document_layout, page_lines
+
+PARSER_VERSION = 2
+
+# A text line starting with one of these ends the syllabus table
+_TABLE_END = ("Course Assessment", "Text Books", "Textbooks", "Reference Books",
+              "Course Outcomes", "Suggested Learning", "Suggestion on Project")
+_TOPIC_SPLIT = re.compile(r"\s*[;,–—]\s*|\s+-\s+|:\s+")
+
+
+def _line_text(words):
+    """Join words (x0, y0, x1, y1, text, ...) in reading order"""
+    lines = {}
+    for w in words:
+        lines.setdefault((w[5], w[6]), []).append(w)
+    ordered = sorted(lines.values(), key=lambda ws: (min(w[1] for w in ws), min(w[0] for w in ws)))
+    return " ".join(" ".join(w[4] for w in sorted(ws)) for ws in ordered)
+
+
+def _number(words):
+    """First integer among the words of a cell, or None"""
+    for w in sorted(words, key=lambda w: (w[1], w[0])):
+        match = re.match(r"\d+", w[4])
+        if match:
+            return int(match.group())
+    return None
+
+
+def split_topics(description):
+    """Split a module description into topic phrases"""
+    topics = []
+    for part in _TOPIC_SPLIT.split(description):
+        part = part.strip(" .-–")
+        if len(part) > 2:
+            topics.append(part)
+    return topics
+
+
+def find_course_code(page_layout):
+    """Course code from the "Course Code" cell of a page, or None"""
+    words = page_layout["words"]
+    for i, w in enumerate(words[:-1]):
+        if w[4] == "Course" and words[i + 1][4] == "Code":
+            code_line = [v for v in words[i + 2:i + 12]
+                         if abs(v[1] - w[1]) < 20 and v[0] > words[i + 1][2]
+                         and re.fullmatch(r"[A-Z]{2,}[A-Z0-9]*\d{3}[A-Z]?", v[4])]
+            if code_line:
+                return code_line[0][4]
+    return None
+
+
+def _find_header(page_layout):
+    """Locate the "Module No. | Syllabus Description | Contact Hours" header
+
+    Returns (module_right, hours_left, header_bottom) or None.
+    """
+    words = page_layout["words"]
+    for i, w in enumerate(words[:-1]):
+        if w[4] != "Syllabus" or words[i + 1][4] != "Description":
+            continue
+        band = [v for v in words if abs(v[1] - w[1]) < 20]
+        module = [v for v in band if v[4] == "Module" and v[2] <= w[0]]
+        contact = [v for v in band if v[4] in ("Contact", "Hours") and v[0] >= words[i + 1][2]]
+        if module and contact:
+            bottom = max(v[3] for v in band if v[4] in ("Module", "No.", "Contact", "Hours", "Syllabus"))
+            return module[0][2], min(v[0] for v in contact), bottom
+    return None
+
+
+class _TableParser:
+    """Incremental parser of one syllabus table spread over consecutive pages"""
+
+    def __init__(self):
+        self.columns = None
+        self.modules = []
+        self.done = False
+
+    def feed(self, page_layout):
+        """Consume one page; returns True once the end of the table was seen"""
+        if self.done:
+            return True
+        top = 0
+        header = _find_header(page_layout)
+        if header:
+            module_right, hours_left, top = header
+            self.columns = (module_right, hours_left)
+        elif self.columns is None:
+            return False
+
+        bottom = page_layout["height"]
+        for y0, _, text in page_lines(page_layout):
+            if y0 > top and text.startswith(_TABLE_END):
+                bottom = y0
+                self.done = True
+                break
+
+        words = [w for w in page_layout["words"] if top < (w[1] + w[3]) / 2 < bottom]
+        if words:
+            for band in self._row_bands(page_layout, words, top, bottom):
+                self._add_row([w for w in words if band[0] <= (w[1] + w[3]) / 2 < band[1]])
+        return self.done
+
+    def _row_bands(self, page_layout, words, top, bottom):
+        module_right, hours_left = self.columns
+        middle = (module_right + hours_left) / 2
+        edges = []
+        for y, x0, x1 in page_layout["hrules"]:
+            if top - 2 <= y <= bottom + 2 and x0 < middle < x1:
+                if not edges or y - edges[-1] > 2:
+                    edges.append(y)
+        if len(edges) < 2:
+            # No table rules: a row runs from midway after the previous module number
+            numbers = sorted((w[1] + w[3]) / 2 for w in words if w[2] <= module_right and w[4].isdigit())
+            edges = [(a + b) / 2 for a, b in zip(numbers, numbers[1:])]
+        edges = [top] + [y for y in edges if top < y < bottom] + [bottom]
+        return list(zip(edges, edges[1:]))
+
+    def _add_row(self, words):
+        if not words:
+            return
+        module_right, hours_left = self.columns
+        module_words = [w for w in words if w[2] <= module_right + 2]
+        hours_words = [w for w in words if w[0] >= hours_left - 2]
+        description = _line_text([w for w in words if w not in module_words and w not in hours_words])
+        number = _number(module_words)
+        hours = _number(hours_words)
+
+        if number is None and self.modules:
+            # Row continued from the previous page
+            module = self.modules[-1]
+            module["description"] = f"{module['description']} {description}".strip()
+            module["topics"] = split_topics(module["description"])
+            if module["hours"] is None:
+                module["hours"] = hours
+        elif number is not None:
+            self.modules.append({
+                "number": number,
+                "hours": hours,
+                "description": description,
+                "topics": split_topics(description),
+            })
+
+
+def parse_pages(filename, page_numbers):
+    """Parse the syllabus table found on the given (0-indexed) pages of a curriculum"""
+    layout = document_layout(filename)
+    parser = _TableParser()
+    for page_num in page_numbers:
+        if page_num < len(layout) and parser.feed(layout[page_num]):
+            break
+    return parser.modules
+
+
+def _parse_curriculum(layout):
+    courses = {}
+    parser = None
+    for page_layout in layout:
+        code = find_course_code(page_layout)
+        if code:
+            parser = _TableParser()
+            courses[code] = parser
+        if parser is not None:
+            parser.feed(page_layout)
+    return {code: parser.modules for code, parser in courses.items()}
+
+
+def parse_curriculum(filename):
+    """Modules of every course in a curriculum PDF: {course_code: [modules]}
+
+    Cached per file version, so repeated calls cost only a JSON load.
+    """
+    digest = file_digest(get_file_path(filename))
+    cached = cache_path("syllabus", f"{digest}.json")
+    if os.path.exists(cached):
+        with open(cached, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == PARSER_VERSION:
+            return data["courses"]
+
+    courses = _parse_curriculum(document_layout(filename))
+    with atomic_output(cached) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": PARSER_VERSION, "file": filename, "courses": courses}, f)
+    return courses
+
+
+def mapping_modules(mapping):
+    """Modules parsed from a mapping's ktu_pages (empty if it has no KTU source)"""
+    if not mapping.get("ktu_source") or not mapping.get("ktu_pages"):
+        return []
+    return parse_pages(mapping["ktu_source"], mapping["ktu_pages"])
+
+
+def module_summary(module, max_topics=3):
+    """Comparison-table style summary, e.g. "Module 1: Camera Calibration, Stereopsis\""""
+    return f"Module {module['number']}: {', '.join(module['topics'][:max_topics])}"
+
+
+def check_mapping(mapping):
+    """Parse a mapping's KTU pages and cross-check them against the whole curriculum
+
+    Returns (modules, problems).
+    """
+    source = mapping.get("ktu_source")
+    if not source:
+        return [], []
+    if not os.path.exists(get_file_path(source)):
+        return [], [f"file not found: {source}"]
+
+    layout = document_layout(source)
+    pages = [p for p in mapping.get("ktu_pages") or [] if p < len(layout)]
+    if not any(layout[p]["words"] for p in pages):
+        return [], ["no text layer on the KTU pages (scanned syllabus)"]
+
+    problems = []
+    modules = parse_pages(source, pages)
+    if not modules:
+        problems.append("no syllabus table found on ktu_pages")
+    numbers = [m["number"] for m in modules]
+    if numbers and numbers != list(range(1, len(numbers) + 1)):
+        problems.append(f"module numbers {numbers} are not consecutive")
+    for module in modules:
+        if module["hours"] is None:
+            problems.append(f"module {module['number']} has no contact hours")
+
+    code = find_course_code(layout[pages[0]]) if pages else None
+    if code and code != mapping['ktu_code']:
+        problems.append(f"ktu_pages start at course {code}, not {mapping['ktu_code']}")
+    curriculum = parse_curriculum(source)
+    if mapping['ktu_code'] in curriculum and curriculum[mapping['ktu_code']] != modules:
+        problems.append("modules differ from the curriculum-wide parse")
+    return modules, problems
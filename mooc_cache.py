@@ -0,0 +1,97 @@
+"""
+Content Hashing Helpers
+=======================
+SHA-256 digests of input files and mappings, used to decide whether a report
+(or any other derived artefact) is still up to date, atomic file output and
+the on-disk cache folder for data derived from input files.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from mooc_mappings import SEMESTER, get_file_path
+
+CACHE_DIR = get_file_path(".mooc_cache")
+
+_CHUNK_SIZE = 1 << 20
+_digest_memo = {}
+
+
+def file_digest(path):
+    """SHA-256 of a file, memoized per process on (path, size, mtime)"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    digest = _digest_memo.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = _digest_memo[key] = sha.hexdigest()
+    return digest
+
+
+def mapping_digest(mapping):
+    """SHA-256 of a mapping's fields (key order independent)"""
+    data = json.dumps(mapping, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def input_digest(mapping):
+    """Digest of everything a report is built from: mapping, semester and source PDFs
+
+    An NPTEL PDF counts by its text fingerprint key (text_fingerprint), so a
+    re-issue without material text changes leaves the digest unchanged once
+    refresh_fingerprints() has seen it; until then it counts by its bytes.
+    Read-only and without PyMuPDF, so any thread may call it.
+    """
+    sha = hashlib.sha256()
+    sha.update(mapping_digest(mapping).encode())
+    sha.update(SEMESTER.encode())
+    for key in ("ktu_source", "nptel_pdf"):
+        filename = mapping.get(key)
+        if filename:
+            path = get_file_path(filename)
+            if not os.path.exists(path):
+                sha.update(b"missing")
+            elif key == "nptel_pdf":
+                from text_fingerprint import material_key
+                fingerprint = material_key(filename, mapping.get("nptel_subject_id"))
+                sha.update((fingerprint or f"bytes:{file_digest(path)}").encode())
+            else:
+                sha.update(file_digest(path).encode())
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+class OutputDiscarded(Exception):
+    """Raised by atomic_output when publish() refused the finished output"""
+
+
+def cache_path(kind, name):
+    """Path of a cache entry, e.g. cache_path("layout", digest + ".json")"""
+    folder = os.path.join(CACHE_DIR, kind)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+
+@contextmanager
+def atomic_output(path, publish=None):
+    """Yield a temporary path next to `path`; it replaces `path` only if the block succeeds
+
+    The temporary name is unique per process and thread. With publish, the
+    temporary file replaces `path` only if publish() is still true then;
+    otherwise it is dropped (`path` stays untouched) and OutputDiscarded raised.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_path
+        if publish is not None and not publish():
+            raise OutputDiscarded(f"not published: {path}")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,560 @@
+"""
+KTU-NPTEL Course Mappings
+=========================
+Configuration and course mapping data shared by the report generator and its
+lightweight commands (listing, validation).
+
+This module must stay free of PyMuPDF imports so that commands which never
+touch a PDF start quickly.
+"""
+
+import os
+
+# Configuration
+OUTPUT_FOLDER = "Final Output"
+SEMESTER = "Jan-Apr 2026"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ============================================================================
+# COURSE MAPPINGS - All 15 Courses
+# Details extracted from NPTEL Courses.pdf and individual course PDFs
+# ============================================================================
+
+MAPPINGS = [
+    # PE4 - Computer Vision
+    {
+        "category": "PE4",
+        "ktu_code": "PECST745",
+        "ktu_name": "Computer Vision",
+        "ktu_source": "Computer Science and Engineering.pdf",
+        "ktu_pages": [329, 330, 331, 332],  # 0-indexed
+        "nptel_pdf": "108103174.pdf",
+        "nptel_name": "Computer Vision and Image Processing - Fundamentals and Applications",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_ee31/preview",
+        "nptel_id": "noc26_ee31",
+        "nptel_subject_id": "108103174",
+        "nptel_instructor": "Prof. M. K. Bhuyan",
+        "nptel_department": "Department of Electrical Engineering",
+        "nptel_institute": "IIT Guwahati",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Basic co-ordinate geometry, matrix algebra, linear algebra and random process",
+        "nptel_intended_audience": "UG, PG and Ph.D students",
+        "nptel_industry_support": "Software industries that develop computer vision apps",
+        "comparison": [
+            ("Module 1: Camera Calibration, Geometric Features, Stereopsis", "Weeks 1-3: Image Formation, Camera Models, Stereo Vision", "90%"),
+            ("Module 2: Linear Filters, Edge Detection, Image Gradients", "Weeks 4-5: Spatial Filtering, Edge Detection, Enhancement", "85%"),
+            ("Module 3: ML for Vision, CNN, Transfer Learning", "Weeks 6-8: Neural Networks, Deep Learning for Vision", "80%"),
+            ("Module 4: Segmentation, Object Detection, YOLO", "Weeks 9-12: Image Segmentation, Object Detection, Applications", "85%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # PE4 - Blockchain and Cryptocurrencies
+    {
+        "category": "PE4",
+        "ktu_code": "PECST747",
+        "ktu_name": "Blockchain and Cryptocurrencies",
+        "ktu_source": "Computer Science and Engineering.pdf",
+        "ktu_pages": [318, 319, 320, 321],
+        "nptel_pdf": "106105235.pdf",
+        "nptel_name": "Blockchain and its Applications",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs34/preview",
+        "nptel_id": "noc26_cs34",
+        "nptel_subject_id": "106105235",
+        "nptel_instructor": "Prof. Sandip Chakraborty, Prof. Shamik Sural",
+        "nptel_department": "Department of Computer Science and Engineering",
+        "nptel_institute": "IIT Kharagpur",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Computer Networks; Operating Systems; Cryptography and Network Security",
+        "nptel_intended_audience": "Undergraduate Students, Postgraduate Students, Industry Associates",
+        "nptel_industry_support": "IBM, HPE, Intel, Blockchain startups",
+        "comparison": [
+            ("Module 1: Cryptographic Hash, Digital Signatures", "Weeks 1-2: Cryptographic Foundations, Hash Functions", "90%"),
+            ("Module 2: Bitcoin Network, Mining, Consensus", "Weeks 3-5: Bitcoin Protocol, Mining, Proof of Work", "85%"),
+            ("Module 3: Ethereum, Smart Contracts, DApps", "Weeks 6-8: Ethereum, Smart Contracts, Solidity", "80%"),
+            ("Module 4: Hyperledger, Enterprise Blockchain", "Weeks 9-12: Hyperledger Fabric, Permissioned Chains, Applications", "75%"),
+        ],
+        "overlap_percentage": "82%"
+    },
+    
+    # PE5 - Algorithms for Data Science
+    {
+        "category": "PE5",
+        "ktu_code": "PECST785",
+        "ktu_name": "Algorithms For Data Science",
+        "ktu_source": "Computer Science and Engineering.pdf",
+        "ktu_pages": [372, 373, 374, 375, 376],
+        "nptel_pdf": "106106179.pdf",
+        "nptel_name": "Data Science for Engineers",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs65/preview",
+        "nptel_id": "noc26_cs65",
+        "nptel_subject_id": "106106179",
+        "nptel_instructor": "Prof. Ragunathan Rengasamy, Prof. Shankar Narasimhan",
+        "nptel_department": "Department of Chemical Engineering",
+        "nptel_institute": "IIT Madras",
+        "nptel_duration": "8 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "10 hrs of pre-course material will be provided",
+        "nptel_intended_audience": "Any interested learner",
+        "nptel_industry_support": "HONEYWELL, ABB, FORD, GYAN DATA PVT. LTD",
+        "comparison": [
+            ("Module 1: Linear Algebra, Matrix Operations", "Weeks 1-2: Linear Algebra, Matrix Computations, PCA", "85%"),
+            ("Module 2: Probability, Statistics", "Weeks 3-4: Probability, Statistics, Hypothesis Testing", "90%"),
+            ("Module 3: Regression, Classification Algorithms", "Weeks 5-6: Regression Analysis, Classification Models", "80%"),
+            ("Module 4: Clustering, Dimensionality Reduction", "Weeks 7-8: Clustering Algorithms, Feature Engineering", "75%"),
+        ],
+        "overlap_percentage": "82%"
+    },
+    
+    # PE5 - High Performance Computing
+    {
+        "category": "PE5",
+        "ktu_code": "PECST757",
+        "ktu_name": "High Performance Computing",
+        "ktu_source": "Computer Science and Engineering.pdf",
+        "ktu_pages": [357, 358, 359, 360],
+        "nptel_pdf": "111101611.pdf",
+        "nptel_name": "High Performance Scientific Computing",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_ma16/preview",
+        "nptel_id": "noc26_ma16",
+        "nptel_subject_id": "111101611",
+        "nptel_instructor": "Multi-Faculty (Prof. Shiva Gopalakrishnan and others)",
+        "nptel_department": "Department of Mechanical Engineering",
+        "nptel_institute": "IIT Bombay",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Basic course on programming and applied mathematics",
+        "nptel_intended_audience": "Researchers, graduate students, postdocs working in computational science",
+        "nptel_industry_support": "Aerospace, automotive, defence, chemical, electrical, materials, biomedical and nuclear industries",
+        "comparison": [
+            ("Module 1: Parallel Computing Architectures", "Weeks 1-3: HPC Architecture, Parallel Computing Basics", "85%"),
+            ("Module 2: OpenMP, Shared Memory Programming", "Weeks 4-6: OpenMP, Shared Memory Parallelism", "90%"),
+            ("Module 3: MPI, Distributed Memory Programming", "Weeks 7-9: MPI Programming, Distributed Systems", "85%"),
+            ("Module 4: GPU Computing, CUDA", "Weeks 10-12: GPU Programming, Performance Optimization", "80%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # OE2 - Optimization Techniques (ECE)
+    {
+        "category": "OE2",
+        "ktu_code": "OEECT723",
+        "ktu_name": "Optimization Techniques",
+        "ktu_source": "Ece.pdf",
+        "ktu_pages": [321, 322, 323, 324],
+        "nptel_pdf": "112101298.pdf",
+        "nptel_name": "Optimization from Fundamentals",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_me09/preview",
+        "nptel_id": "noc26_me09",
+        "nptel_subject_id": "112101298",
+        "nptel_instructor": "Prof. Ankur A. Kulkarni",
+        "nptel_department": "Department of Systems and Control Engineering",
+        "nptel_institute": "IIT Bombay",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "None specified",
+        "nptel_intended_audience": "Mathematics, any engineering and science discipline",
+        "nptel_industry_support": "Quantitative Finance and related industries",
+        "comparison": [
+            ("Module 1: Linear Programming, Simplex Method", "Weeks 1-3: Linear Programming, Duality, Simplex", "90%"),
+            ("Module 2: Unconstrained Optimization", "Weeks 4-6: Unconstrained Optimization, Gradient Methods", "85%"),
+            ("Module 3: Constrained Optimization, KKT", "Weeks 7-9: Constrained Optimization, KKT Conditions", "85%"),
+            ("Module 4: Metaheuristics, GA", "Weeks 10-12: Convex Optimization, Advanced Algorithms", "70%"),
+        ],
+        "overlap_percentage": "82%"
+    },
+    
+    # OE2 - Robotics (Mechanical)
+    {
+        "category": "OE2",
+        "ktu_code": "OEMET722",
+        "ktu_name": "Robotics",
+        "ktu_source": "Mechnaical.pdf",
+        "ktu_pages": [365, 366, 367, 368],
+        "nptel_pdf": "112107289.pdf",
+        "nptel_name": "Robotics and Control: Theory and Practice",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_me72/preview",
+        "nptel_id": "noc26_me72",
+        "nptel_subject_id": "112107289",
+        "nptel_instructor": "Prof. N. Sukavanam, Prof. M. Felix Orlando",
+        "nptel_department": "Department of Mathematics & Department of Electrical Engineering",
+        "nptel_institute": "IIT Roorkee",
+        "nptel_duration": "8 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Basic Mathematics",
+        "nptel_intended_audience": "Electrical Engineering, Computer Science Engineering, Mechanical Engineering, Electronics and Communication Engineering, Mathematics students",
+        "nptel_industry_support": "Industrial Robotics, Healthcare Robotics, Field Robotics",
+        "comparison": [
+            ("Module 1: Robot Kinematics, DH Parameters", "Weeks 1-2: Forward Kinematics, DH Convention", "90%"),
+            ("Module 2: Inverse Kinematics, Workspace", "Weeks 3-4: Inverse Kinematics, Jacobian Analysis", "85%"),
+            ("Module 3: Trajectory Planning, Motion", "Weeks 5-6: Trajectory Generation, Motion Planning", "80%"),
+            ("Module 4: Robot Dynamics, Control", "Weeks 7-8: Robot Dynamics, Control Theory, Practice", "85%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # PE6 - Natural Language Processing
+    {
+        "category": "PE6",
+        "ktu_code": "PECST862",
+        "ktu_name": "Natural Language Processing",
+        "ktu_source": "Computer Science and Engineering.pdf",
+        "ktu_pages": [399, 400, 401, 402],
+        "nptel_pdf": "106105158.pdf",
+        "nptel_name": "Natural Language Processing",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs45/preview",
+        "nptel_id": "noc26_cs45",
+        "nptel_subject_id": "106105158",
+        "nptel_instructor": "Prof. Pawan Goyal",
+        "nptel_department": "Department of Computer Science and Engineering",
+        "nptel_institute": "IIT Kharagpur",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Basic knowledge of probabilities for lectures and python for programming assignment",
+        "nptel_intended_audience": "CSE, IT students",
+        "nptel_industry_support": "Microsoft Research, Google, Adobe, Xerox, Flipkart, Amazon",
+        "comparison": [
+            ("Module 1: Text Processing, Tokenization, Morphology", "Weeks 1-2: Text Processing, Spelling Correction, Tokenization", "90%"),
+            ("Module 2: Language Modeling, POS Tagging", "Weeks 3-5: Language Models, POS Tagging, NER", "85%"),
+            ("Module 3: Parsing, Syntax Analysis", "Weeks 6-8: Constituency Parsing, Dependency Parsing", "85%"),
+            ("Module 4: Semantic Analysis, Word Embeddings", "Weeks 9-12: Word Embeddings, Sentiment Analysis, Applications", "80%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # OE3 - Internet of Things (ECE)
+    {
+        "category": "OE3",
+        "ktu_code": "OEECT831",
+        "ktu_name": "Internet of Things",
+        "ktu_source": "Ece.pdf",
+        "ktu_pages": [360, 361, 362, 363],
+        "nptel_pdf": "106105166.pdf",
+        "nptel_name": "Introduction to Internet of Things",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs37/preview",
+        "nptel_id": "noc26_cs37",
+        "nptel_subject_id": "106105166",
+        "nptel_instructor": "Prof. Sudip Misra",
+        "nptel_department": "Department of Computer Science and Engineering",
+        "nptel_institute": "IIT Kharagpur",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Basic programming knowledge",
+        "nptel_intended_audience": "CSE, IT, ECE, EE, Instrumentation Engineering, Industrial Engineering",
+        "nptel_industry_support": "IoT solutions providers across multiple sectors",
+        "comparison": [
+            ("Module 1: IoT Architecture, Sensors, Actuators", "Weeks 1-3: IoT Architecture, Sensing, Actuation", "90%"),
+            ("Module 2: IoT Protocols - MQTT, CoAP, HTTP", "Weeks 4-6: IoT Protocols, MQTT, CoAP, Communication", "85%"),
+            ("Module 3: IoT Platforms, Cloud Integration", "Weeks 7-9: IoT Cloud Platforms, Data Analytics", "80%"),
+            ("Module 4: IoT Security, Smart Applications", "Weeks 10-12: IoT Security, Smart City Applications", "85%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # OE3 - PLC & Automation (EEE)
+    {
+        "category": "OE3",
+        "ktu_code": "OEEET832",
+        "ktu_name": "PLC and Automation",
+        "ktu_source": "Elecel.pdf",
+        "ktu_pages": [329, 330, 331, 332],
+        "nptel_pdf": "108105088.pdf",
+        "nptel_name": "Industrial Automation and Control",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_ee47/preview",
+        "nptel_id": "noc26_ee47",
+        "nptel_subject_id": "108105088",
+        "nptel_instructor": "Prof. Alok Kanti Deb",
+        "nptel_department": "Department of Electrical Engineering",
+        "nptel_institute": "IIT Kharagpur",
+        "nptel_duration": "12 Weeks (52 lectures)",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Electrical Networks, Control Systems",
+        "nptel_intended_audience": "Any interested student",
+        "nptel_industry_support": "All Process Control (Oil and Gas, Chemical), Manufacturing (Machine tools, Textile)",
+        "comparison": [
+            ("Module 1: PLC Architecture, Programming Basics", "Weeks 1-3: PLC Fundamentals, Ladder Logic", "85%"),
+            ("Module 2: Sensors, Actuators, Industrial I/O", "Weeks 4-6: Industrial Sensors, Actuators, Interfacing", "80%"),
+            ("Module 3: SCADA, DCS Systems", "Weeks 7-9: SCADA Systems, DCS Architecture", "80%"),
+            ("Module 4: Industrial Networks, Protocols", "Weeks 10-12: Industrial Communication, Fieldbus", "75%"),
+        ],
+        "overlap_percentage": "80%"
+    },
+    
+    # HMC Elective 1 - Project Management
+    {
+        "category": "HMC Elective 1",
+        "ktu_code": "HMCET502",
+        "ktu_name": "Project Management: Planning, Execution, Evaluation and Control",
+        "ktu_source": None,  # HMC courses - general management
+        "ktu_pages": None,
+        "nptel_pdf": "110107430.pdf",
+        "nptel_name": "Project Management",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_mg77/preview",
+        "nptel_id": "noc26_mg77",
+        "nptel_subject_id": "110107430",
+        "nptel_instructor": "Prof. Ramesh Anbanandam",
+        "nptel_department": "Department of Management Studies",
+        "nptel_institute": "IIT Roorkee",
+        "nptel_duration": "8 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "None specified",
+        "nptel_intended_audience": "Undergraduate Engineering Courses-All discipline, Management Courses-All discipline",
+        "nptel_industry_support": "All software companies, Manufacturing Companies, Construction companies",
+        "comparison": [
+            ("Topic: Project Planning, WBS, Scheduling", "Weeks 1-2: Project Planning, WBS, Scheduling Techniques", "90%"),
+            ("Topic: Resource Management, Budgeting", "Weeks 3-4: Resource Allocation, Cost Management", "85%"),
+            ("Topic: Risk Management, Quality Control", "Weeks 5-6: Risk Analysis, Quality Management", "85%"),
+            ("Topic: Monitoring, Control, Evaluation", "Weeks 7-8: Monitoring, Earned Value, Project Closure", "80%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # Honours - Object Oriented Design using UML
+    {
+        "category": "Honours",
+        "ktu_code": "HNCST509",
+        "ktu_name": "Object Oriented Design using UML",
+        "ktu_source": "Honours - Computer Science  and  Engineering.pdf",
+        "ktu_pages": [9, 10, 11, 12],
+        "nptel_pdf": "106105224.pdf",
+        "nptel_name": "Object Oriented System Development using UML, Java and Patterns",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs46/preview",
+        "nptel_id": "noc26_cs46",
+        "nptel_subject_id": "106105224",
+        "nptel_instructor": "Prof. Rajib Mall",
+        "nptel_department": "Department of Computer Science and Engineering",
+        "nptel_institute": "IIT Kharagpur",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Programming Using Java, Software Engineering",
+        "nptel_intended_audience": "CSE, IT",
+        "nptel_industry_support": "Software development companies",
+        "comparison": [
+            ("Module 1: OO Concepts, UML Basics, Use Cases", "Weeks 1-3: OO Concepts, UML Diagrams, Use Case Modeling", "90%"),
+            ("Module 2: Class Diagrams, Sequence Diagrams", "Weeks 4-6: Class Diagrams, Interaction Diagrams, State", "85%"),
+            ("Module 3: System Design, Architecture", "Weeks 7-9: System Design, Architecture Patterns", "80%"),
+            ("Module 4: Object Design, Design Patterns", "Weeks 10-12: Design Patterns, Implementation, Testing", "85%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # Honours - Advanced Algorithms
+    {
+        "category": "Honours",
+        "ktu_code": "HNCST609",
+        "ktu_name": "Advanced Algorithms",
+        "ktu_source": "Honours - Computer Science  and  Engineering.pdf",
+        "ktu_pages": [16, 17, 18, 19],
+        "nptel_pdf": "106106131.pdf",
+        "nptel_name": "Design and Analysis of Algorithms",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs67/preview",
+        "nptel_id": "noc26_cs67",
+        "nptel_subject_id": "106106131",
+        "nptel_instructor": "Prof. Madhavan Mukund",
+        "nptel_department": "Department of Computer Science and Engineering",
+        "nptel_institute": "Chennai Mathematical Institute",
+        "nptel_duration": "8 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "Exposure to introductory courses on programming and data structures",
+        "nptel_intended_audience": "Students in BE/BTech Computer Science, 2nd/3rd year",
+        "nptel_industry_support": "Any company working in the area of software services and products",
+        "comparison": [
+            ("Module 1: Algorithm Analysis, Recurrences", "Weeks 1-2: Asymptotic Analysis, Recurrence Relations", "90%"),
+            ("Module 2: Divide & Conquer, Dynamic Programming", "Weeks 3-4: Divide and Conquer, Dynamic Programming", "90%"),
+            ("Module 3: Greedy Algorithms, Graph Algorithms", "Weeks 5-6: Greedy Algorithms, Shortest Paths, MST", "85%"),
+            ("Module 4: Approximation, NP-Hardness", "Weeks 7-8: NP-Completeness, Approximation Algorithms", "80%"),
+        ],
+        "overlap_percentage": "86%"
+    },
+    
+    # Honours - Advanced Cryptography
+    {
+        "category": "Honours",
+        "ktu_code": "HNCST709",
+        "ktu_name": "Advanced Cryptography",
+        "ktu_source": "Honours - Computer Science  and  Engineering.pdf",
+        "ktu_pages": [23, 24, 25, 26],
+        "nptel_pdf": "106105162.pdf",
+        "nptel_name": "Cryptography and Network Security",
+        "nptel_url": "https://onlinecourses.nptel.ac.in/noc26_cs57/preview",
+        "nptel_id": "noc26_cs57",
+        "nptel_subject_id": "106105162",
+        "nptel_instructor": "Prof. Sourav Mukhopadhyay",
+        "nptel_department": "Department of Computer Science and Engineering",
+        "nptel_institute": "IIT Kharagpur",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "None specified",
+        "nptel_intended_audience": "CSE, IT students",
+        "nptel_industry_support": "Stratign FZE Dubai(UAE), SAG, DRDO, ISRO, WESEE, NTRO",
+        "comparison": [
+            ("Module 1: Classical Ciphers, Modern Ciphers", "Weeks 1-3: Block Ciphers, Stream Ciphers, DES, AES", "85%"),
+            ("Module 2: Public Key Cryptography", "Weeks 4-6: Public Key Crypto, RSA, ElGamal, ECC", "90%"),
+            ("Module 3: Hash Functions, Digital Signatures", "Weeks 7-9: Hash Functions, SHA, Digital Signatures", "85%"),
+            ("Module 4: Network Security, Protocols", "Weeks 10-12: Network Security, SSL/TLS, IPSec", "80%"),
+        ],
+        "overlap_percentage": "85%"
+    },
+    
+    # Fuzzy Systems - From separate syllabus PDF
+    {
+        "category": "Elective",
+        "ktu_code": "FUZZY_SYSTEMS",
+        "ktu_name": "Fuzzy Systems",
+        "ktu_source": "FUZZY SYSTEMS SYLLABUS.pdf",
+        "ktu_pages": [0, 1, 2, 3, 4],  # All pages
+        "nptel_pdf": None,  # No specific NPTEL PDF - use general info
+        "nptel_name": "Fuzzy Logic and Neural Networks",
+        "nptel_url": "https://nptel.ac.in",
+        "nptel_id": "noc26_cs_fuzzy",
+        "nptel_subject_id": "N/A",
+        "nptel_instructor": "To be determined from NPTEL",
+        "nptel_department": "N/A",
+        "nptel_institute": "IIT",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "N/A",
+        "nptel_intended_audience": "N/A",
+        "nptel_industry_support": "N/A",
+        "comparison": [
+            ("Module 1: Fuzzy Sets, Membership Functions", "Weeks 1-3: Fuzzy Set Theory, Membership Functions", "85%"),
+            ("Module 2: Fuzzy Relations, Operations", "Weeks 4-6: Fuzzy Relations, Fuzzy Operations", "80%"),
+            ("Module 3: Fuzzy Logic, Inference Systems", "Weeks 7-9: Fuzzy Inference, Rule-Based Systems", "85%"),
+            ("Module 4: Fuzzy Control Systems", "Weeks 10-12: Fuzzy Controllers, Applications", "80%"),
+        ],
+        "overlap_percentage": "82%",
+        "note": "Course syllabus extracted from provided PDF"
+    },
+    
+    # Approximation Algorithms - From separate syllabus PDF
+    {
+        "category": "Elective",
+        "ktu_code": "APPROX_ALGO",
+        "ktu_name": "Approximation Algorithms",
+        "ktu_source": "APPROXIMATION ALGORITHM SYLLABUS.pdf",
+        "ktu_pages": [0, 1, 2, 3, 4],  # All pages
+        "nptel_pdf": None,  # No specific NPTEL PDF
+        "nptel_name": "Approximation Algorithms",
+        "nptel_url": "https://nptel.ac.in",
+        "nptel_id": "noc26_cs_approx",
+        "nptel_subject_id": "N/A",
+        "nptel_instructor": "To be determined from NPTEL",
+        "nptel_department": "N/A",
+        "nptel_institute": "IIT",
+        "nptel_duration": "12 Weeks",
+        "nptel_content_type": "Video",
+        "exam_mode": "Proctored",
+        "nptel_prerequisites": "N/A",
+        "nptel_intended_audience": "N/A",
+        "nptel_industry_support": "N/A",
+        "comparison": [
+            ("Module 1: Approximation Concepts, Complexity", "Weeks 1-3: Introduction, Complexity Classes, Basics", "85%"),
+            ("Module 2: Greedy Approximation Algorithms", "Weeks 4-6: Greedy Techniques, Set Cover, Vertex Cover", "85%"),
+            ("Module 3: LP-based Approximations", "Weeks 7-9: Linear Programming Relaxations, Rounding", "80%"),
+            ("Module 4: Advanced Techniques", "Weeks 10-12: Randomized Algorithms, PTAS, FPTAS", "80%"),
+        ],
+        "overlap_percentage": "82%",
+        "note": "Course syllabus extracted from provided PDF"
+    },
+]
+
+
+def get_file_path(filename):
+    """Get absolute file path"""
+    return os.path.join(BASE_DIR, filename)
+
+
+def report_filename(mapping):
+    """Get the output file name of the report for a mapping"""
+    safe_code = mapping['ktu_code'].replace(' ', '_').replace('/', '_')
+    return f"MOOC_{safe_code}_Report.pdf"
+
+
+def pages_in_range(pages, page_count):
+    """The 0-indexed pages that a source of page_count pages has (others are skipped)
+
+    Used wherever a report's source pages are cut, counted or indexed, so
+    all of them agree. Raises ValueError if none of the pages exists.
+    """
+    kept = [p for p in pages if 0 <= p < page_count]
+    if pages and not kept:
+        raise ValueError(f"none of pages {', '.join(str(p + 1) for p in pages)} exists "
+                         f"(the file has {page_count})")
+    return kept
+
+
+class UnknownMappingError(LookupError):
+    """Raised when a requested KTU code has no mapping"""
+
+
+def find_mappings(codes=None):
+    """Select mappings by KTU code, keeping MAPPINGS order (all when codes is empty)"""
+    if not codes:
+        return list(MAPPINGS)
+    wanted = {code.upper() for code in codes}
+    unknown = wanted - {m['ktu_code'].upper() for m in MAPPINGS}
+    if unknown:
+        raise UnknownMappingError(f"Unknown KTU code(s): {', '.join(sorted(unknown))}")
+    return [m for m in MAPPINGS if m['ktu_code'].upper() in wanted]
+
+
+# Fields every mapping must define (used by the report pages and summary table)
+REQUIRED_FIELDS = [
+    "ktu_code", "ktu_name", "ktu_source", "ktu_pages", "nptel_pdf",
+    "nptel_name", "nptel_url", "nptel_id", "nptel_instructor",
+    "nptel_institute", "nptel_duration", "comparison",
+]
+
+
+def validate_mapping(mapping):
+    """Check a mapping's fields without opening any PDF; returns a list of problems"""
+    problems = []
+    for field in REQUIRED_FIELDS:
+        if field not in mapping:
+            problems.append(f"missing field '{field}'")
+    
+    if mapping.get("ktu_source") and not mapping.get("ktu_pages"):
+        problems.append("ktu_source given without ktu_pages")
+    for page_num in mapping.get("ktu_pages") or []:
+        if not isinstance(page_num, int) or page_num < 0:
+            problems.append(f"invalid ktu_pages entry: {page_num!r}")
+    
+    for idx, comp in enumerate(mapping.get("comparison", []), 1):
+        if len(comp) < 2:
+            problems.append(f"comparison row {idx} needs KTU and NPTEL topics")
+        elif len(comp) > 2 and not str(comp[2]).rstrip('%').isdigit() and "✓" not in str(comp[2]):
+            problems.append(f"comparison row {idx} has invalid match value {comp[2]!r}")
+    
+    return problems
+
+
+def validate_mappings(mappings=None):
+    """Validate all mappings; returns {ktu_code: [problems]} for the failing ones"""
+    mappings = MAPPINGS if mappings is None else mappings
+    report = {}
+    seen = set()
+    for mapping in mappings:
+        code = mapping.get("ktu_code", "?")
+        problems = validate_mapping(mapping)
+        if code in seen:
+            problems.append("duplicate ktu_code")
+        seen.add(code)
+        if problems:
+            report[code] = problems
+    return report
@@ -0,0 +1,198 @@
+"""
+NPTEL Course PDF Extractor
+==========================
+Parses the course brochure PDFs published by NPTEL (e.g. 108103174.pdf):
+
+    TITLE
+    PROF. NAME
+    Department of ...
+    IIT ...
+    PRE-REQUISITES : ...
+    INTENDED AUDIENCE : ...
+    INDUSTRIES APPLICABLE TO / INDUSTRY SUPPORT : ...
+    COURSE OUTLINE : ...
+    ABOUT INSTRUCTOR : ...
+    COURSE PLAN : Week 1: ... / Module I ...
+
+into an NptelCourse record, cached per file digest in .mooc_cache/nptel.
+Whole folders of course PDFs are extracted in parallel worker processes.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from mooc_cache import atomic_output, cache_path, file_digest
+from mooc_mappings import get_file_path
+from text_cache import document_layout, page_text
+
+EXTRACTOR_VERSION = 1
+
+# NPTEL subject IDs are nine digits, and so are the course PDF names
+NPTEL_PDF_PATTERN = re.compile(r"^\d{9}\.pdf$")
+
+_FIELD_LABELS = {
+    "PRE-REQUISITES": "prerequisites",
+    "INTENDED AUDIENCE": "intended_audience",
+    "INDUSTRIES APPLICABLE TO": "industry_support",
+    "INDUSTRY SUPPORT": "industry_support",
+    "COURSE OUTLINE": "outline",
+    "ABOUT INSTRUCTOR": "about_instructor",
+    "COURSE PLAN": "plan",
+    "COURSE LAYOUT": "plan",
+}
+_FIELD_LINE = re.compile(r"^(%s)\s*(?::\s*(.*))?$" % "|".join(map(re.escape, _FIELD_LABELS)))
+_PLAN_ENTRY = re.compile(r"^(Week\s*\d+(?:\s*[-&]\s*\d+)?|Module\s+[IVX\d]+)\s*:?\s*(.*)$", re.IGNORECASE)
+
+
+@dataclass
+class NptelCourse:
+    """Course details extracted from one NPTEL course PDF"""
+    subject_id: str
+    file: str
+    title: str = ""
+    instructors: list = field(default_factory=list)
+    departments: list = field(default_factory=list)
+    institutes: list = field(default_factory=list)
+    prerequisites: str = ""
+    intended_audience: str = ""
+    industry_support: str = ""
+    outline: str = ""
+    plan: list = field(default_factory=list)  # [[label, topics], ...], e.g. ["Week 1", "..."]
+
+    @property
+    def weeks(self):
+        """Number of weeks in the course plan (0 if the plan is not week-wise)"""
+        numbers = [int(n) for label, _ in self.plan for n in re.findall(r"\d+", label)
+                   if label.lower().startswith("week")]
+        return max(numbers, default=0)
+
+    def mapping_fields(self):
+        """The nptel_* fields of a mapping, ready to paste into MAPPINGS"""
+        return {
+            "nptel_pdf": self.file,
+            "nptel_name": self.title.title(),
+            "nptel_subject_id": self.subject_id,
+            "nptel_instructor": ", ".join(self.instructors),
+            "nptel_department": ", ".join(dict.fromkeys(self.departments)) or "N/A",
+            "nptel_institute": ", ".join(dict.fromkeys(self.institutes)) or "N/A",
+            "nptel_duration": f"{self.weeks} Weeks" if self.weeks else "N/A",
+            "nptel_prerequisites": self.prerequisites or "N/A",
+            "nptel_intended_audience": self.intended_audience or "N/A",
+            "nptel_industry_support": self.industry_support or "N/A",
+        }
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text.replace("•", " ")).strip(" .")
+
+
+def parse_course_text(lines, subject_id, filename):
+    """Build an NptelCourse from the text lines of a course PDF"""
+    course = NptelCourse(subject_id=subject_id, file=filename)
+    title_lines = []
+    values = {}
+    current = None
+    plan_entry = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = _FIELD_LINE.match(line)
+        if match:
+            current = _FIELD_LABELS[match.group(1)]
+            values.setdefault(current, [])
+            if match.group(2):
+                values[current].append(match.group(2))
+            continue
+
+        if current is None:
+            # Header block: title, then instructors with their departments and institutes
+            if line.upper() == "MULTIFACULTY":
+                course.instructors.append("Multifaculty")
+            elif line.upper().startswith(("PROF", "DR.", "DR ")):
+                name = re.sub(r"^(PROF|DR)\s*\.?\s*", "", line, flags=re.I)
+                course.instructors.append(_clean(f"Prof. {name.title()}"))
+            elif line.startswith("Department") or line.startswith("Centre"):
+                course.departments.append(_clean(line.rstrip(",")))
+            elif course.instructors:
+                course.institutes.append(_clean(line))
+            else:
+                title_lines.append(line)
+        elif current == "plan":
+            match = _PLAN_ENTRY.match(line)
+            # Modules listed inside a week-wise plan are topics of that week
+            if match and plan_entry is not None and plan_entry[0].startswith("Week") \
+                    and match.group(1).lower().startswith("module"):
+                match = None
+            if match:
+                plan_entry = [re.sub(r"\s+", " ", match.group(1)).title(), match.group(2)]
+                course.plan.append(plan_entry)
+            elif plan_entry is not None:
+                plan_entry[1] = f"{plan_entry[1]} {line}"
+        else:
+            values[current].append(line.lstrip(": "))
+
+    course.title = _clean(" ".join(title_lines))
+    for name in ("prerequisites", "intended_audience", "industry_support", "outline"):
+        setattr(course, name, _clean(" ".join(values.get(name, []))))
+    for entry in course.plan:
+        entry[1] = _clean(entry[1])
+    return course
+
+
+def extract_course(filename):
+    """Extract the course record of an NPTEL PDF, from the cache when the file is unchanged"""
+    path = get_file_path(filename)
+    digest = file_digest(path)
+    cached = cache_path("nptel", f"{digest}.json")
+    if os.path.exists(cached):
+        with open(cached, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.pop("version", None) == EXTRACTOR_VERSION:
+            return NptelCourse(**data)
+
+    lines = []
+    for page_layout in document_layout(filename):
+        lines.extend(page_text(page_layout).splitlines())
+    name = os.path.basename(path)
+    course = parse_course_text(lines, os.path.splitext(name)[0], name)
+
+    with atomic_output(cached) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(asdict(course), version=EXTRACTOR_VERSION), f)
+    return course
+
+
+def find_course_pdfs(folder):
+    """NPTEL course PDFs (named by subject ID) in a folder"""
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if NPTEL_PDF_PATTERN.match(name))
+
+
+def extract_courses(filenames, workers=None):
+    """Extract many course PDFs in parallel processes; returns {filename: NptelCourse}"""
+    filenames = list(filenames)
+    if len(filenames) < 2:
+        return {name: extract_course(name) for name in filenames}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(filenames, pool.map(extract_course, filenames)))
+
+
+def compare_with_mapping(course, mapping):
+    """Differences between the extracted course and a hand-typed mapping"""
+    problems = []
+    if course.weeks and mapping.get("nptel_duration"):
+        typed_weeks = re.findall(r"\d+", mapping["nptel_duration"])
+        if typed_weeks and int(typed_weeks[0]) != course.weeks:
+            problems.append(f"duration: mapping says {mapping['nptel_duration']}, "
+                            f"course plan has {course.weeks} weeks")
+    if course.title and not mapping["nptel_name"].lower().startswith(course.title.lower()[:20]):
+        problems.append(f"name: mapping says '{mapping['nptel_name']}', PDF says '{course.title}'")
+    if mapping.get("nptel_subject_id") not in (None, "N/A", course.subject_id):
+        problems.append(f"subject id: mapping says {mapping['nptel_subject_id']}, "
+                        f"file is {course.subject_id}")
+    return problems
@@ -0,0 +1,216 @@
+"""
+Content-Addressed PDF Store
+===========================
+Keeps every input PDF, prepared report section and archived report exactly
+once, named by its SHA-256, in .mooc_store/:
+
+    objects/ab/abcdef...        file contents (read-only)
+    refs/sections/<key>         prepared section key -> object digest
+    manifests/<name>.json       archived folder: {relative path: digest}
+
+Prepared sections are the parts of a report copied from the source PDFs:
+the ktu_pages of a curriculum, cut out and garbage-collected, and an NPTEL
+course PDF. They are keyed by source digest and page list, so a curriculum
+shared by several mappings, layouts and semesters is cut once, and the
+report builder inserts the small section instead of opening the whole
+curriculum.
+
+archive() records an output or input folder under a name (e.g. the semester)
+and can replace the files with hard links into the store, so disk use grows
+with unique content rather than with the number of copies. gc() removes
+objects that no manifest or section ref points to any more.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+from mooc_cache import atomic_output, file_digest
+from mooc_mappings import get_file_path, pages_in_range
+
+STORE_DIR = get_file_path(".mooc_store")
+SECTION_VERSION = 1
+
+
+class ObjectStore:
+    """Content-addressed file store with named refs and manifests"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        for sub in ("objects", "refs/sections", "manifests"):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def has(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put_file(self, path):
+        """Add a copy of a file; returns its digest"""
+        digest = file_digest(path)
+        target = self.object_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with atomic_output(target) as tmp_path:
+                shutil.copyfile(path, tmp_path)
+            os.chmod(target, 0o444)
+        return digest
+
+    def put_bytes(self, data):
+        """Add file contents; returns their digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.object_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with atomic_output(target) as tmp_path:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+            os.chmod(target, 0o444)
+        return digest
+
+    def _ref_path(self, kind, key):
+        return os.path.join(self.root, "refs", kind, hashlib.sha256(key.encode()).hexdigest())
+
+    def get_ref(self, kind, key):
+        """Object digest stored under a ref, or None (also if the object was collected)"""
+        try:
+            with open(self._ref_path(kind, key), encoding="utf-8") as f:
+                digest = json.load(f)["object"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return digest if self.has(digest) else None
+
+    def set_ref(self, kind, key, digest, **info):
+        os.makedirs(os.path.join(self.root, "refs", kind), exist_ok=True)
+        with atomic_output(self._ref_path(kind, key)) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(info, key=key, object=digest), f)
+
+    def _section_key(self, source_path, pages):
+        return f"v{SECTION_VERSION}:{file_digest(source_path)}:{pages if pages is not None else 'all'}"
+
+    def cached_section(self, source_path, pages=None):
+        """Path of an already prepared section, or None (never opens a PDF)"""
+        digest = self.get_ref("sections", self._section_key(source_path, pages))
+        return None if digest is None else self.object_path(digest)
+
+    def section(self, source_path, pages=None):
+        """Path of a prepared section of a source PDF: the given 0-indexed pages, or the whole file"""
+        source_digest = file_digest(source_path)
+        key = self._section_key(source_path, pages)
+        digest = self.get_ref("sections", key)
+        if digest is None:
+            if pages is None:
+                digest = self.put_file(source_path)
+            else:
+                digest = self.put_bytes(_cut_pages(source_path, pages))
+            self.set_ref("sections", key, digest, source=os.path.basename(source_path),
+                         source_digest=source_digest)
+        return self.object_path(digest)
+
+    def archive(self, folder, name, link=False):
+        """Add every PDF under folder to the store and record them as manifest `name`
+
+        With link=True the files are replaced by hard links to the stored
+        objects. Returns (files, new objects).
+        """
+        manifest = {}
+        added = 0
+        for dirpath, dirnames, filenames in os.walk(folder):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(".pdf"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                existed = self.has(file_digest(path))
+                digest = self.put_file(path)
+                added += not existed
+                manifest[os.path.relpath(path, folder)] = digest
+                if link and not os.path.samefile(path, self.object_path(digest)):
+                    with atomic_output(path) as tmp_path:
+                        os.link(self.object_path(digest), tmp_path)
+        with atomic_output(os.path.join(self.root, "manifests", f"{name}.json")) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"folder": os.path.abspath(folder), "files": manifest}, f, indent=1)
+        return len(manifest), added
+
+    def manifests(self):
+        """{name: {relative path: digest}} of all archived folders"""
+        result = {}
+        folder = os.path.join(self.root, "manifests")
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith(".json"):
+                with open(os.path.join(folder, filename), encoding="utf-8") as f:
+                    result[filename[:-5]] = json.load(f)["files"]
+        return result
+
+    def gc(self, live_sources=None, dry_run=False):
+        """Remove unreferenced objects; returns (objects removed, bytes freed)
+
+        Roots are all manifests and section refs. With live_sources (a set of
+        source digests), section refs cut from other source versions are
+        dropped first.
+        """
+        live = set()
+        for files in self.manifests().values():
+            live.update(files.values())
+        refs_dir = os.path.join(self.root, "refs", "sections")
+        for filename in os.listdir(refs_dir):
+            path = os.path.join(refs_dir, filename)
+            with open(path, encoding="utf-8") as f:
+                ref = json.load(f)
+            if live_sources is not None and ref.get("source_digest") not in live_sources:
+                if not dry_run:
+                    os.remove(path)
+                continue
+            live.add(ref["object"])
+
+        removed = freed = 0
+        objects_dir = os.path.join(self.root, "objects")
+        for prefix in os.listdir(objects_dir):
+            for digest in os.listdir(os.path.join(objects_dir, prefix)):
+                if digest in live:
+                    continue
+                path = os.path.join(objects_dir, prefix, digest)
+                freed += os.path.getsize(path)
+                removed += 1
+                if not dry_run:
+                    os.remove(path)
+        return removed, freed
+
+    def usage(self):
+        """(object count, total bytes) of the store"""
+        count = size = 0
+        objects_dir = os.path.join(self.root, "objects")
+        for prefix in os.listdir(objects_dir):
+            for digest in os.listdir(os.path.join(objects_dir, prefix)):
+                count += 1
+                size += os.path.getsize(os.path.join(objects_dir, prefix, digest))
+        return count, size
+
+
+def _cut_pages(source_path, pages):
+    """PDF bytes holding only the given pages of a source (out-of-range pages skipped)"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(source_path) as source:
+        section = fitz.open()
+        for page_num in pages_in_range(pages, len(source)):
+            section.insert_pdf(source, from_page=page_num, to_page=page_num)
+        try:
+            return section.tobytes(garbage=4, deflate=True)
+        finally:
+            section.close()
+
+
+def live_source_digests(mappings):
+    """Digests of the source PDFs the mappings currently reference"""
+    digests = set()
+    for mapping in mappings:
+        for key in ("ktu_source", "nptel_pdf"):
+            filename = mapping.get(key)
+            if filename and os.path.exists(get_file_path(filename)):
+                digests.add(file_digest(get_file_path(filename)))
+    return digests
@@ -0,0 +1,170 @@
+"""
+Unicode Font for Generated Pages
+================================
+The base-14 "helv" font only covers Latin-1: "✓", "✗", dashes and curly
+quotes come out as "·". Text that helv cannot show is drawn with the bundled
+DejaVu Sans (fonts/DejaVuSans.ttf, see fonts/LICENSE_DEJAVU) instead; all
+other text stays in helv.
+
+The font is loaded once per process and the same buffer is handed to every
+page, so PyMuPDF embeds it once per document (one shared xref). subset()
+reduces the embedded font to the glyphs actually used before a document is
+saved (MuPDF's subsetter, a few ms). Reports spliced from several cached
+fragments get one shared font program again from share_unicode_font().
+
+MuPDF keeps DejaVu's large layout tables, so its subsets stay around 60 KB
+(12 KB compressed). When fontTools is installed (pip install fonttools) the
+font is first cut down to UNICODE_RANGES without those tables, once, into
+.mooc_cache/fonts; a page's subset is then about 20 KB (5 KB compressed).
+"""
+
+import logging
+import os
+
+from mooc_cache import atomic_output, cache_path, file_digest
+from mooc_mappings import get_file_path
+
+UNICODE_FONT = "dejavu"
+UNICODE_FONT_FILE = get_file_path(os.path.join("fonts", "DejaVuSans.ttf"))
+
+# Characters kept in the prepared font: Latin-1, Greek, punctuation, arrows,
+# math operators and dingbats (✓ ✗)
+UNICODE_RANGES = ((0x20, 0x7E), (0xA0, 0xFF), (0x370, 0x3FF), (0x2010, 0x206F),
+                  (0x2190, 0x22FF), (0x2700, 0x27BF))
+PREPARED_VERSION = 1
+
+_font_buffer = None
+
+
+def prepared_font_file():
+    """Path of the font cut down to UNICODE_RANGES, or None without fontTools"""
+    try:
+        from fontTools import subset as ft_subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+    path = cache_path("fonts", f"{file_digest(UNICODE_FONT_FILE)}_{PREPARED_VERSION}.ttf")
+    if not os.path.exists(path):
+        options = ft_subset.Options()
+        options.layout_features = []
+        options.hinting = False
+        options.name_IDs = ["*"]
+        options.notdef_outline = True
+        subsetter = ft_subset.Subsetter(options)
+        subsetter.populate(unicodes=[c for low, high in UNICODE_RANGES for c in range(low, high + 1)])
+        logging.getLogger("fontTools.subset").setLevel(logging.ERROR)  # "FFTM NOT subset"
+        font = TTFont(UNICODE_FONT_FILE)
+        subsetter.subset(font)
+        with atomic_output(path) as tmp_path:
+            font.save(tmp_path)
+    return path
+
+
+def font_source():
+    """The file the Unicode font is loaded from"""
+    return prepared_font_file() or UNICODE_FONT_FILE
+
+
+def font_buffer():
+    """Contents of the Unicode font, loaded once per process"""
+    global _font_buffer
+    if _font_buffer is None:
+        with open(font_source(), "rb") as f:
+            _font_buffer = f.read()
+    return _font_buffer
+
+
+def helv_can_show(text):
+    """True if every character of text is in helv's Latin-1 range"""
+    try:
+        text.encode("latin-1")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def text_font(page, text, base="helv", unicode_font=UNICODE_FONT):
+    """Font name to draw text with on page: base, or the Unicode font (registered on first use)
+
+    Text added to a page whose Unicode font is already subset needs another
+    resource name (unicode_font), or it would be drawn with the subset.
+    """
+    if helv_can_show(text):
+        return base
+    page.insert_font(fontname=unicode_font, fontbuffer=font_buffer())
+    return unicode_font
+
+
+def uses_unicode_font(doc):
+    return any(font[4].startswith(UNICODE_FONT) for page in doc for font in page.get_fonts())
+
+
+def subset(doc):
+    """Reduce embedded fonts to the glyphs used (call before saving)"""
+    if uses_unicode_font(doc):
+        doc.subset_fonts()
+
+
+def _font_descriptor(doc, xref):
+    """xref of the FontDescriptor of a font object, or None (base-14 fonts)"""
+    kind, value = doc.xref_get_key(xref, "DescendantFonts")
+    if kind == "xref":
+        value = doc.xref_object(int(value.split()[0]))
+        kind = "array"
+    if kind == "array":
+        xref = int(value.strip("[] ").split()[0])
+    kind, value = doc.xref_get_key(xref, "FontDescriptor")
+    return int(value.split()[0]) if kind == "xref" else None
+
+
+def _font_file_xref(doc, xref):
+    """xref of the embedded font program of a font object, or None (base-14 fonts)"""
+    descriptor = _font_descriptor(doc, xref)
+    if descriptor is None:
+        return None
+    for key in ("FontFile2", "FontFile3", "FontFile"):
+        kind, value = doc.xref_get_key(descriptor, key)
+        if kind == "xref":
+            return int(value.split()[0])
+    return None
+
+
+def share_unicode_font(doc):
+    """Make all Unicode fonts in doc share one embedded font program, subset once
+
+    Pages spliced from several generated fragments (report_builder) each
+    bring their own subset of the font. Subsets keep the glyph ids, so every
+    font object can point at one copy of the full font, which is then subset
+    to the union of the glyphs used. Returns True if doc was changed.
+    """
+    descriptors = {}
+    for page in doc:
+        for font in page.get_fonts(full=True):
+            if font[4].startswith(UNICODE_FONT):
+                descriptor = _font_descriptor(doc, font[0])
+                if descriptor is not None:
+                    descriptors[descriptor] = _font_file_xref(doc, font[0])
+    files = sorted(set(descriptors.values()) - {None})
+    if len(files) < 2:
+        return False
+    shared, buffer = files[0], font_buffer()
+    doc.update_stream(shared, buffer)
+    doc.xref_set_key(shared, "Length1", str(len(buffer)))
+    for descriptor in descriptors:
+        doc.xref_set_key(descriptor, "FontFile2", f"{shared} 0 R")
+    for unused in files[1:]:
+        doc.update_stream(unused, b"")
+    doc.subset_fonts()
+    return True
+
+
+def unicode_font_bytes(doc):
+    """Bytes the embedded Unicode font programs (ours, not those of inserted sources) take in doc"""
+    seen = set()
+    for page in doc:
+        for font in page.get_fonts(full=True):
+            if font[4].startswith(UNICODE_FONT):
+                file_xref = _font_file_xref(doc, font[0])
+                if file_xref is not None:
+                    seen.add(file_xref)
+    return sum(len(doc.xref_stream_raw(xref)) for xref in seen)
@@ -0,0 +1,192 @@
+"""
+Pipelined Report Build
+======================
+Overlaps the disk (or network share) I/O of a build with rendering:
+
+    reader thread   -> queue ->  render (main thread)  -> queue ->  writer thread
+    pages in the next            build_report() and               writes finished
+    mappings' source             doc.tobytes()                    PDFs atomically
+    sections (mmap)
+
+The queues are bounded (depth), so at most a few mappings' sources and
+finished PDFs are held in memory; sources are memory-mapped, so they sit in
+the shared page cache rather than in private buffers. PyMuPDF is not thread-safe, so all PDF
+work stays on the main thread; the reader and writer threads only move
+bytes, which releases the GIL while they wait on the disk.
+
+Sections that are not in the object store yet are cut by the render stage
+as usual. Each stage records busy and waiting time; utilization is busy time
+over the wall time of the run.
+"""
+
+import os
+import queue
+import threading
+import time
+
+from mooc_cache import atomic_output
+from mooc_mappings import get_file_path, report_filename
+from source_loader import map_file
+
+DEFAULT_DEPTH = 4
+_DONE = object()
+
+
+class StageMetrics:
+    """Busy/wait time and item count of one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+        self.bytes = 0
+
+    def as_dict(self, wall):
+        return {"stage": self.name, "items": self.items, "busy": self.busy, "waiting": self.waiting,
+                "bytes": self.bytes, "utilization": self.busy / wall if wall else 0.0}
+
+
+def _timed_put(q, item, metrics):
+    start = time.perf_counter()
+    q.put(item)
+    metrics.waiting += time.perf_counter() - start
+
+
+def _timed_get(q, metrics):
+    start = time.perf_counter()
+    item = q.get()
+    metrics.waiting += time.perf_counter() - start
+    return item
+
+
+def source_sections(mapping, store):
+    """Prepared section files a report inserts that are already in the store"""
+    paths = []
+    ktu_source, pages = mapping.get("ktu_source"), mapping.get("ktu_pages")
+    if ktu_source and pages and os.path.exists(get_file_path(ktu_source)):
+        paths.append(store.cached_section(get_file_path(ktu_source), pages))
+    nptel_pdf = mapping.get("nptel_pdf")
+    if nptel_pdf and os.path.exists(get_file_path(nptel_pdf)):
+        paths.append(store.cached_section(get_file_path(nptel_pdf)))
+    return [p for p in paths if p]
+
+
+def _reader(mappings, out_q, metrics, select):
+    from object_store import ObjectStore
+
+    store = ObjectStore()
+    for mapping in mappings:
+        start = time.perf_counter()
+        buffers, error = {}, None
+        try:
+            if select is not None and not select(mapping):
+                metrics.busy += time.perf_counter() - start
+                continue
+            for path in source_sections(mapping, store):
+                buffers[path] = map_file(path, prefetch=True)
+        except Exception as e:
+            error = e
+        metrics.busy += time.perf_counter() - start
+        metrics.items += 1
+        metrics.bytes += sum(len(data) for data in buffers.values())
+        _timed_put(out_q, (mapping, buffers, error), metrics)
+    out_q.put(_DONE)
+
+
+def _writer(in_q, output_folder, metrics, done, publish):
+    while True:
+        item = _timed_get(in_q, metrics)
+        if item is _DONE:
+            return
+        start = time.perf_counter()
+        mapping, data, error = item
+        path = None
+        if error is None:
+            try:
+                path = os.path.join(output_folder, report_filename(mapping))
+                with atomic_output(path, publish and (lambda: publish(mapping))) as tmp_path:
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                metrics.bytes += len(data)
+            except Exception as e:
+                error = e
+        if done is not None:
+            done(mapping, path, error)
+        metrics.busy += time.perf_counter() - start
+        metrics.items += 1
+
+
+def run_pipeline(mappings, output_folder, depth=DEFAULT_DEPTH, select=None, done=None, publish=None):
+    """Build reports for mappings with overlapped read, render and write stages
+
+    select(mapping) -> bool runs in the reader thread and may skip a mapping
+    (resume checks, queue claims); publish(mapping) -> bool is asked before a
+    finished report replaces the old one (an OutputDiscarded error if not);
+    done(mapping, path, error) runs in the writer thread once a report is
+    written or has failed. Returns
+    {"wall": seconds, "stages": [stage metrics]}.
+    """
+    import report_builder
+
+    read_q, write_q = queue.Queue(maxsize=depth), queue.Queue(maxsize=depth)
+    reader, render, writer = StageMetrics("read"), StageMetrics("render"), StageMetrics("write")
+    wall_start = time.perf_counter()
+    reader_thread = threading.Thread(target=_reader, args=(mappings, read_q, reader, select), daemon=True)
+    writer_thread = threading.Thread(target=_writer, args=(write_q, output_folder, writer, done, publish),
+                                     daemon=True)
+    reader_thread.start()
+    writer_thread.start()
+    try:
+        while True:
+            item = _timed_get(read_q, render)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            mapping, buffers, error = item
+            data = None
+            if error is None:
+                try:
+                    for path, contents in buffers.items():
+                        report_builder.prefetch_source(path, contents)
+                    doc = report_builder.build_report(mapping)
+                    data = doc.tobytes()
+                    doc.close()
+                except Exception as e:
+                    error = e
+            render.busy += time.perf_counter() - start
+            render.items += 1
+            _timed_put(write_q, (mapping, data, error), render)
+    finally:
+        write_q.put(_DONE)
+        writer_thread.join()
+    wall = time.perf_counter() - wall_start
+    return {"wall": wall, "stages": [m.as_dict(wall) for m in (reader, render, writer)]}
+
+
+def run_sequential(mappings, output_folder):
+    """The plain generate loop, timed the same way as run_pipeline"""
+    from report_builder import generate_report
+
+    start = time.perf_counter()
+    for mapping in mappings:
+        generate_report(mapping, output_folder)
+    return time.perf_counter() - start
+
+
+def benchmark(mappings, folder, depth=DEFAULT_DEPTH):
+    """End-to-end time of the sequential loop and the pipeline, each with cold source documents"""
+    import report_builder
+
+    results = {}
+    for name in ("sequential", "pipeline"):
+        target = os.path.join(folder, name)
+        os.makedirs(target, exist_ok=True)
+        for _, doc in report_builder._source_docs.values():
+            doc.close()
+        report_builder._source_docs.clear()
+        if name == "sequential":
+            results[name] = {"wall": run_sequential(mappings, target)}
+        else:
+            results[name] = run_pipeline(mappings, target, depth=depth)
+    return results
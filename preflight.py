@@ -0,0 +1,99 @@
+"""
+Pre-flight Validation of Mapping Inputs
+=======================================
+Checks every KTU curriculum and NPTEL course PDF referenced by the mappings
+before any report is rendered:
+
+- the file exists
+- it opens cleanly as a PDF with at least one page
+- it is not encrypted / password protected
+- every referenced ktu_pages entry is within the page count
+
+Each distinct file is opened once, in a thread pool, no matter how many
+mappings share it (the large curricula are used by several mappings).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from mooc_mappings import get_file_path
+
+DEFAULT_WORKERS = 8
+
+
+def inspect_pdf(filename):
+    """Open a source PDF and return (page_count, problem); page_count is None on failure"""
+    import fitz  # PyMuPDF
+
+    path = get_file_path(filename)
+    if not os.path.exists(path):
+        return None, f"file not found: {filename}"
+    try:
+        doc = fitz.open(path)
+    except Exception as e:
+        return None, f"cannot open {filename}: {e}"
+    try:
+        if doc.needs_pass or doc.is_encrypted:
+            return None, f"encrypted PDF: {filename}"
+        if not doc.is_pdf:
+            return None, f"not a PDF document: {filename}"
+        if doc.page_count == 0:
+            return None, f"PDF has no pages: {filename}"
+        return doc.page_count, None
+    finally:
+        doc.close()
+
+
+def source_files(mappings):
+    """Get the distinct input files referenced by the mappings"""
+    files = []
+    for mapping in mappings:
+        for key in ("ktu_source", "nptel_pdf"):
+            filename = mapping.get(key)
+            if filename and filename not in files:
+                files.append(filename)
+    return files
+
+
+def run_preflight(mappings, workers=DEFAULT_WORKERS):
+    """Check all inputs of the mappings; returns {ktu_code: [problems]} for the failing ones"""
+    files = source_files(mappings)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(files, pool.map(inspect_pdf, files)))
+
+    report = {}
+    for mapping in mappings:
+        problems = []
+
+        ktu_source = mapping.get("ktu_source")
+        if ktu_source:
+            page_count, problem = results[ktu_source]
+            if problem:
+                problems.append(f"KTU source: {problem}")
+            else:
+                out_of_range = [p for p in mapping.get("ktu_pages") or [] if p >= page_count]
+                if out_of_range:
+                    problems.append(f"KTU pages {out_of_range} out of range "
+                                    f"({ktu_source} has {page_count} pages)")
+
+        nptel_pdf = mapping.get("nptel_pdf")
+        if nptel_pdf:
+            page_count, problem = results[nptel_pdf]
+            if problem:
+                problems.append(f"NPTEL PDF: {problem}")
+
+        if problems:
+            report[mapping['ktu_code']] = problems
+
+    return report
+
+
+def print_preflight_report(report, total):
+    """Print the pre-flight result as a single error report"""
+    print("-" * 60)
+    print("PRE-FLIGHT CHECK")
+    for code, problems in report.items():
+        for problem in problems:
+            print(f"    ✗ {code}: {problem}")
+    print(f"{total - len(report)}/{total} mappings have valid inputs")
+    print("-" * 60)
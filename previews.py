@@ -0,0 +1,189 @@
+"""
+Report Page Previews
+====================
+Renders low-DPI PNG thumbnails of every page of the generated reports and
+puts them on one contact sheet per report, so reviewers can check that the
+right ktu_pages were pulled without opening each full PDF.
+
+Thumbnails are cached in .mooc_cache/thumbs, keyed by a digest of the page
+content (content stream, images, fonts, size) and the DPI. A regenerated
+report whose KTU and NPTEL pages did not change re-renders only the front
+page. Reports are rendered in parallel worker processes.
+
+Output (per report, in <output>/previews/):
+    MOOC_<code>_Report.html   self-contained contact sheet (inline PNGs)
+    MOOC_<code>_Report.pdf    the same sheet as a PDF (optional)
+"""
+
+import base64
+import hashlib
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from mooc_cache import atomic_output, cache_path
+from mooc_mappings import pages_in_range, report_filename
+from preflight import inspect_pdf
+from report_model import build_model, paginate
+
+DEFAULT_DPI = 36
+PREVIEW_FOLDER = "previews"
+
+_HEX_TEXT = re.compile(rb"\[<([0-9a-fA-F]+)>\]TJ")
+_VOLATILE_TEXT = (b"Generated: ",)
+
+
+def _strip_volatile(contents):
+    """Drop text strings that change on every run ("Generated: <date>") from a content stream"""
+    def replace(match):
+        try:
+            text = bytes.fromhex(match.group(1).decode())
+        except ValueError:
+            return match.group(0)
+        return b"" if text.startswith(_VOLATILE_TEXT) else match.group(0)
+    return _HEX_TEXT.sub(replace, contents)
+
+
+def page_digest(doc, page, ignore_volatile=False):
+    """Digest of what a page looks like: content stream, referenced images and fonts, size"""
+    sha = hashlib.sha256()
+    sha.update(repr(tuple(page.rect)).encode())
+    contents = page.read_contents()
+    sha.update(_strip_volatile(contents) if ignore_volatile else contents)
+    for img in page.get_images(full=True):
+        sha.update(doc.xref_stream_raw(img[0]) or b"")
+    for font in page.get_fonts(full=True):
+        sha.update(repr(font[1:5]).encode())
+    return sha.hexdigest()
+
+
+def render_thumbnails(pdf_path, dpi=DEFAULT_DPI):
+    """Thumbnails of every page of a PDF: [(png_path, rendered)], reusing cached ones"""
+    import fitz  # PyMuPDF
+
+    thumbs = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            png_path = cache_path("thumbs", f"{page_digest(doc, page)}_{dpi}.png")
+            rendered = not os.path.exists(png_path)
+            if rendered:
+                pix = page.get_pixmap(dpi=dpi, alpha=False)
+                with atomic_output(png_path) as tmp_path:
+                    pix.save(tmp_path, output="png")
+            thumbs.append((png_path, rendered))
+    return thumbs
+
+
+def _source_labels(section, page_counts):
+    """Captions of the pages of a paginated source section"""
+    role = section["role"].upper()
+    if section["status"] != "ok":
+        return [f"{role} source {section['status']}"]
+    total, _ = page_counts[section["file"]]
+    if section["pages"] is None:
+        return [f"{role} p. {n + 1}" for n in range(total)]
+    # The pages the PDF holds: out-of-range ktu_pages are skipped
+    return [f"{role} p. {p + 1}" for p in pages_in_range([p - 1 for p in section["pages"]], total)]
+
+
+def _section_labels(mapping, page_count):
+    """Caption of each report page, from the report model's pagination (as report_verifier)"""
+    model = build_model(mapping)
+    page_counts = {section["file"]: inspect_pdf(section["file"]) for section in model["sections"]
+                   if section["kind"] == "source" and section["status"] == "ok"}
+    sections = paginate(model, page_counts)["sections"]
+    labels = []
+    for n, section in enumerate(sections):
+        if not section["report_pages"]:
+            continue
+        if section["kind"] == "summary":
+            labels.append("Summary")
+        elif section["kind"] == "header":
+            following = sections[n + 1] if n + 1 < len(sections) else {}
+            labels.append(f"{following['role'].upper()} section" if following.get("kind") == "source"
+                          else "Comparison section")
+        elif section["kind"] == "source":
+            labels += _source_labels(section, page_counts)
+        else:
+            labels.append("Comparison")
+    return labels[:page_count] + [""] * (page_count - len(labels))
+
+
+def write_contact_sheet_html(mapping, thumbs, html_path):
+    """Self-contained HTML contact sheet with the thumbnails inlined"""
+    labels = _section_labels(mapping, len(thumbs))
+    cells = []
+    for n, ((png_path, _), label) in enumerate(zip(thumbs, labels), 1):
+        with open(png_path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        cells.append(f'<figure><img src="data:image/png;base64,{data}" alt="page {n}">'
+                     f"<figcaption>{n}. {html.escape(label)}</figcaption></figure>")
+    source = mapping.get("ktu_source") or "no KTU source"
+    pages = ", ".join(str(p + 1) for p in mapping.get("ktu_pages") or [])
+    title = html.escape(f"{mapping['ktu_code']} - {mapping['ktu_name']}")
+    document = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+figure {{ display: inline-block; margin: 6px; text-align: center; font-size: 11px; }}
+img {{ border: 1px solid #999; display: block; }}
+</style></head>
+<body><h2>{title}</h2>
+<p>KTU: {html.escape(source)}, pages {html.escape(pages or '-')} &middot;
+NPTEL: {html.escape(mapping.get('nptel_pdf') or mapping['nptel_url'])} &middot; {len(thumbs)} pages</p>
+{chr(10).join(cells)}
+</body></html>
+"""
+    with atomic_output(html_path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(document)
+
+
+def write_contact_sheet_pdf(mapping, thumbs, pdf_path, columns=6):
+    """Contact sheet as an A4 landscape PDF grid"""
+    import fitz  # PyMuPDF
+
+    labels = _section_labels(mapping, len(thumbs))
+    doc = fitz.open()
+    cell_w, cell_h = 130, 175
+    page = None
+    for n, ((png_path, _), label) in enumerate(zip(thumbs, labels)):
+        slot = n % (columns * 3)
+        if slot == 0:
+            page = doc.new_page(width=842, height=595)
+            page.insert_text(fitz.Point(30, 30), f"{mapping['ktu_code']} - {mapping['ktu_name']}",
+                             fontsize=12, fontname="helv")
+        x = 30 + (slot % columns) * cell_w
+        y = 45 + (slot // columns) * cell_h
+        page.insert_image(fitz.Rect(x, y, x + cell_w - 10, y + cell_h - 20), filename=png_path)
+        page.insert_text(fitz.Point(x, y + cell_h - 8), f"{n + 1}. {label}", fontsize=7, fontname="helv")
+    with atomic_output(pdf_path) as tmp_path:
+        doc.save(tmp_path, garbage=1, deflate=True)
+    doc.close()
+
+
+def preview_report(task):
+    """Worker: thumbnails and contact sheet(s) for one report; returns a result dict"""
+    mapping, report_folder, preview_folder, dpi, with_pdf = task
+    report_path = os.path.join(report_folder, report_filename(mapping))
+    if not os.path.exists(report_path):
+        return {"code": mapping['ktu_code'], "error": f"report not found: {report_path}"}
+    thumbs = render_thumbnails(report_path, dpi)
+    base = os.path.join(preview_folder, os.path.splitext(report_filename(mapping))[0])
+    write_contact_sheet_html(mapping, thumbs, base + ".html")
+    if with_pdf:
+        write_contact_sheet_pdf(mapping, thumbs, base + ".pdf")
+    return {"code": mapping['ktu_code'], "sheet": base + ".html", "pages": len(thumbs),
+            "rendered": sum(rendered for _, rendered in thumbs)}
+
+
+def build_previews(mappings, report_folder, dpi=DEFAULT_DPI, with_pdf=False, workers=None):
+    """Contact sheets for the reports in report_folder (written to its previews/ folder)"""
+    preview_folder = os.path.join(report_folder, PREVIEW_FOLDER)
+    os.makedirs(preview_folder, exist_ok=True)
+    tasks = [(m, report_folder, preview_folder, dpi, with_pdf) for m in mappings]
+    if len(tasks) < 2:
+        return [preview_report(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(preview_report, tasks))
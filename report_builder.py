@@ -0,0 +1,471 @@
+"""
+KTU MOOC Report Builder
+=======================
+PyMuPDF drawing routines for the individual MOOC approval reports: the PDF
+backend of report_model.
+
+Imported lazily by generate_final_reports.py, only once a PDF actually needs
+to be rendered.
+"""
+
+import fitz  # PyMuPDF
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from mooc_cache import CACHE_DIR, atomic_output, cache_path
+from mooc_mappings import SEMESTER, get_file_path
+from pdf_fonts import share_unicode_font, subset, text_font
+from report_model import (REPORT_FORMATS, build_model, comparison_section, format_path, paginate, section_content,
+                          source_failed, summary_section, write_model)
+
+FRAGMENT_VERSION = 3
+# Fragments unused for FRAGMENT_MAX_AGE seconds are deleted, then the least
+# recently used ones until the folder is under FRAGMENT_MAX_BYTES; checked at
+# most every FRAGMENT_PRUNE_INTERVAL seconds, when a new fragment is written
+FRAGMENT_MAX_AGE = 14 * 86400
+FRAGMENT_MAX_BYTES = 32 << 20
+FRAGMENT_PRUNE_INTERVAL = 3600
+# Source documents open_source keeps open (least recently used closed first)
+SOURCE_DOCS_MAX = 64
+
+
+def draw_summary_page(doc, section):
+    """Draw the summary front page of a report model (report_model.summary_section)"""
+    page = doc.new_page(width=595, height=842)  # A4
+    
+    # Header
+    rect = fitz.Rect(50, 30, 545, 80)
+    page.draw_rect(rect, fill=(0.1, 0.2, 0.4))
+    page.insert_text(fitz.Point(120, 60), section["title"], 
+                     fontsize=22, fontname="helv", color=(1, 1, 1))
+    
+    # Sub-header
+    page.insert_text(fitz.Point(140, 100), section["subtitle"],
+                     fontsize=10, fontname="helv", color=(0.4, 0.4, 0.4))
+    
+    page.draw_line(fitz.Point(50, 115), fitz.Point(545, 115), width=1)
+    
+    y = 135
+    ktu_table, nptel_table = section["tables"]
+    
+    # KTU Course Details Table
+    page.insert_text(fitz.Point(50, y), ktu_table["title"], fontsize=12, fontname="helv")
+    y += 18
+    
+    for label, value in ktu_table["rows"]:
+        page.draw_rect(fitz.Rect(60, y, 200, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
+        page.draw_rect(fitz.Rect(200, y, 535, y + 20), color=(0.8, 0.8, 0.8))
+        page.insert_text(fitz.Point(65, y + 14), label, fontsize=9, fontname="helv", color=(0.3, 0.3, 0.3))
+        page.insert_text(fitz.Point(205, y + 14), value[:55], fontsize=9, fontname=text_font(page, value))
+        y += 20
+    
+    y += 20
+    
+    # NPTEL Course Details Table (from NPTEL Courses.pdf)
+    page.insert_text(fitz.Point(50, y), nptel_table["title"], fontsize=12, fontname="helv")
+    y += 18
+    
+    for label, val_str in nptel_table["rows"]:
+        page.draw_rect(fitz.Rect(60, y, 200, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
+        page.draw_rect(fitz.Rect(200, y, 535, y + 20), color=(0.8, 0.8, 0.8))
+        page.insert_text(fitz.Point(65, y + 14), label, fontsize=8, fontname="helv", color=(0.3, 0.3, 0.3))
+        # Handle long text
+        if len(val_str) > 60:
+            page.insert_text(fitz.Point(205, y + 14), val_str[:60] + "...", fontsize=7, fontname=text_font(page, val_str))
+        else:
+            page.insert_text(fitz.Point(205, y + 14), val_str, fontsize=8, fontname=text_font(page, val_str))
+        y += 20
+        
+        # Check if we need a new page
+        if y > 750:
+            page = doc.new_page(width=595, height=842)
+            y = 50
+    
+    y += 15
+    
+    # Compliance Information
+    page.insert_text(fitz.Point(50, y), "COMPLIANCE WITH KTU REGULATIONS", fontsize=11, fontname="helv")
+    y += 18
+    
+    for result in section["compliance"]:
+        mark = "✓" if result["passed"] else "✗"
+        fill = (0.95, 1.0, 0.95) if result["passed"] else (1.0, 0.93, 0.93)
+        color = (0, 0.5, 0) if result["passed"] else (0.75, 0, 0)
+        page.draw_rect(fitz.Rect(60, y, 250, y + 20), fill=(0.95, 0.95, 0.95), color=(0.8, 0.8, 0.8))
+        page.draw_rect(fitz.Rect(250, y, 535, y + 20), fill=fill, color=(0.8, 0.8, 0.8))
+        page.insert_text(fitz.Point(65, y + 14), f"{result['label']} ({result['rule']})",
+                         fontsize=8, fontname="helv", color=(0.3, 0.3, 0.3))
+        value = f"{result['text']} {mark}"
+        page.insert_text(fitz.Point(255, y + 14), value, fontsize=8, fontname=text_font(page, value), color=color)
+        y += 20
+    
+    # Footer
+    page.insert_text(fitz.Point(200, 810), f"Generated: {section['generated']}", 
+                     fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
+
+
+def create_summary_front_page(doc, mapping):
+    """Create professional summary front page with tabular course details from NPTEL Courses.pdf"""
+    draw_summary_page(doc, summary_section(mapping))
+
+
+def create_section_header(doc, title, subtitle=""):
+    """Create a section header page"""
+    page = doc.new_page(width=595, height=842)
+    
+    # Centered title
+    page.draw_rect(fitz.Rect(50, 380, 545, 450), fill=(0.1, 0.2, 0.4))
+    page.insert_text(fitz.Point(150, 420), title, fontsize=18, fontname="helv", color=(1, 1, 1))
+    
+    if subtitle:
+        page.insert_text(fitz.Point(100, 470), subtitle, fontsize=12, fontname=text_font(page, subtitle),
+                         color=(0.4, 0.4, 0.4))
+
+
+def draw_comparison_page(doc, section):
+    """Draw the syllabus comparison page of a report model (report_model.comparison_section)"""
+    page = doc.new_page(width=595, height=842)
+    
+    # Header
+    page.draw_rect(fitz.Rect(50, 30, 545, 65), fill=(0.1, 0.4, 0.2))
+    page.insert_text(fitz.Point(170, 52), section["title"], 
+                     fontsize=14, fontname="helv", color=(1, 1, 1))
+    
+    y = 85
+    
+    # Course Info Box
+    page.draw_rect(fitz.Rect(50, y, 545, y + 55), fill=(0.97, 0.97, 0.97), color=(0.8, 0.8, 0.8))
+    for line, line_y in zip(section["courses"], (y + 20, y + 40)):
+        page.insert_text(fitz.Point(60, line_y), line, fontsize=10, fontname=text_font(page, line))
+    
+    y += 70
+    
+    # Comparison Table Header
+    col_widths = [210, 210, 60]  # KTU, NPTEL, Match%
+    colors = [(0.2, 0.3, 0.5), (0.2, 0.4, 0.3), (0.4, 0.4, 0.4)]
+    
+    x = 50
+    for i, (header, color) in enumerate(zip(section["columns"], colors)):
+        page.draw_rect(fitz.Rect(x, y, x + col_widths[i], y + 25), fill=color)
+        page.insert_text(fitz.Point(x + 5, y + 17), header, fontsize=8, fontname="helv", color=(1, 1, 1))
+        x += col_widths[i]
+    
+    y += 25
+    
+    # Comparison Rows
+    row_height = 55
+    
+    for idx, row in enumerate(section["rows"]):
+        fill = (1, 1, 1) if idx % 2 == 0 else (0.97, 0.97, 0.97)
+        
+        x = 50
+        # KTU and NPTEL Columns
+        for topic, width in ((row["ktu"], col_widths[0]), (row["nptel"], col_widths[1])):
+            page.draw_rect(fitz.Rect(x, y, x + width, y + row_height), fill=fill, color=(0.85, 0.85, 0.85))
+            ly = y + 15
+            for line in wrap_text(topic, 38)[:3]:
+                page.insert_text(fitz.Point(x + 5, ly), line, fontsize=8, fontname=text_font(page, line))
+                ly += 12
+            x += width
+        
+        # Match Column
+        match_fill = (0.9, 1.0, 0.9) if row["highlight"] else fill
+        page.draw_rect(fitz.Rect(x, y, x + col_widths[2], y + row_height), fill=match_fill, color=(0.85, 0.85, 0.85))
+        page.insert_text(fitz.Point(x + 15, y + 30), row["match"], fontsize=10, fontname=text_font(page, row["match"]),
+                         color=(0, 0.5, 0))
+        
+        y += row_height
+    
+    y += 20
+    
+    # Summary Box
+    overlap = section["overlap"]
+    box_fill, box_color = ((0.95, 1.0, 0.95), (0, 0.5, 0)) if overlap["meets"] else ((1.0, 0.93, 0.93), (0.75, 0, 0))
+    page.draw_rect(fitz.Rect(50, y, 545, y + 90), fill=box_fill, color=box_color, width=2)
+    
+    page.insert_text(fitz.Point(60, y + 25), overlap["text"], fontsize=14, fontname="helv", color=box_color)
+    page.insert_text(fitz.Point(60, y + 41), overlap["source"], fontsize=8, fontname=text_font(page, overlap["source"]),
+                     color=(0.4, 0.4, 0.4))
+    
+    for line, line_y in zip(section["verdict"], (y + 60, y + 76)):
+        page.insert_text(fitz.Point(60, line_y), line, fontsize=10, fontname="helv")
+    
+    y += 110
+    
+    # Recommendation
+    page.insert_text(fitz.Point(50, y), "RECOMMENDATION:", fontsize=11, fontname="helv")
+    for line, line_y in zip(section["recommendation"], (y + 20, y + 35)):
+        page.insert_text(fitz.Point(50, line_y), line, fontsize=9, fontname=text_font(page, line))
+
+
+def create_comparison_page(doc, mapping):
+    """Create detailed syllabus comparison page"""
+    draw_comparison_page(doc, comparison_section(mapping))
+
+
+def create_noncompliance_report(results, mappings, output_path):
+    """Write a PDF listing every mapping that fails a Section 17 rule"""
+    names = {m['ktu_code']: m for m in mappings}
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.draw_rect(fitz.Rect(50, 30, 545, 65), fill=(0.5, 0.1, 0.1))
+    page.insert_text(fitz.Point(150, 52), "MOOC NON-COMPLIANCE REPORT", fontsize=14, fontname="helv", color=(1, 1, 1))
+    page.insert_text(fitz.Point(50, 85),
+                     f"KTU B.Tech Regulations 2024, Section 17 - {SEMESTER} - "
+                     f"{len(results)} of {len(mappings)} mappings non-compliant",
+                     fontsize=9, fontname="helv", color=(0.4, 0.4, 0.4))
+    y = 110
+    if not results:
+        text = "All mappings comply with Section 17. ✓"
+        page.insert_text(fitz.Point(60, y), text, fontsize=11, fontname=text_font(page, text),
+                         color=(0, 0.5, 0))
+    for code, failed in results.items():
+        if y + 25 + 16 * len(failed) > 800:
+            page = doc.new_page(width=595, height=842)
+            y = 50
+        mapping = names.get(code, {})
+        page.insert_text(fitz.Point(50, y), f"{code} - {mapping.get('ktu_name', '')}", fontsize=11, fontname="helv")
+        page.insert_text(fitz.Point(60, y + 15), f"NPTEL: {mapping.get('nptel_name', '')}"[:90],
+                         fontsize=8, fontname="helv", color=(0.4, 0.4, 0.4))
+        y += 30
+        for result in failed:
+            text = f"✗ {result['label']} ({result['rule']}): {result['text']}"
+            page.insert_text(fitz.Point(60, y), text, fontsize=9, fontname=text_font(page, text), color=(0.75, 0, 0))
+            y += 16
+        y += 10
+    page.insert_text(fitz.Point(200, 810), f"Generated: {datetime.now().strftime('%B %d, %Y')}",
+                     fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
+    subset(doc)
+    with atomic_output(output_path) as tmp_path:
+        doc.save(tmp_path, deflate_fonts=True)
+    doc.close()
+    return output_path
+
+
+def wrap_text(text, max_chars):
+    """Simple text wrapper"""
+    if not text:
+        return [""]
+    words = text.split()
+    lines = []
+    current = ""
+    for word in words:
+        if len(current) + len(word) + 1 <= max_chars:
+            current += (" " + word if current else word)
+        else:
+            if current:
+                lines.append(current)
+            current = word
+    if current:
+        lines.append(current)
+    return lines if lines else [""]
+
+
+_source_docs = OrderedDict()
+_prefetched = {}
+_store = None
+_fragments_pruned = 0
+
+
+def prepared_section(path, pages=None):
+    """Path of the prepared (content-addressed) section of a source PDF; see object_store"""
+    global _store
+    if _store is None:
+        from object_store import ObjectStore
+        _store = ObjectStore()
+    return _store.section(path, pages)
+
+
+def open_source(path):
+    """Open a source PDF, reusing the open document while the file is unchanged
+
+    Several mappings share a curriculum PDF, and a long-running process (the
+    report server) keeps its sources warm instead of re-parsing them for
+    every report. The returned document must not be closed by the caller;
+    it stays open until SOURCE_DOCS_MAX other sources have been opened.
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _source_docs.get(path)
+    data = _prefetched.pop(path, None)
+    if cached is None or cached[0] != key:
+        if cached is not None:
+            cached[1].close()
+        doc = fitz.open("pdf", data) if data is not None else fitz.open(path)
+        cached = _source_docs[path] = (key, doc)
+        while len(_source_docs) > SOURCE_DOCS_MAX:
+            _, (_, evicted) = _source_docs.popitem(last=False)
+            evicted.close()
+    _source_docs.move_to_end(path)
+    return cached[1]
+
+
+def prefetch_source(path, data):
+    """Hand open_source the contents of a source PDF already paged in (bytes or memoryview, see pipeline)"""
+    _prefetched[path] = data
+
+
+def generated_fragment(draw, args, key):
+    """Path of a cached PDF with the pages draw(doc, *args) renders
+
+    key must hold everything those pages show; the fragment is rendered again
+    only when it changes, so editing one mapping field re-renders only the
+    pages that print it. A fragment's mtime is its last use (see
+    prune_fragments).
+    """
+    global _fragments_pruned
+    data = json.dumps([FRAGMENT_VERSION, draw.__name__, key], sort_keys=True, default=str, ensure_ascii=False)
+    path = cache_path("fragments", hashlib.sha256(data.encode("utf-8")).hexdigest() + ".pdf")
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+    fragment = fitz.open()
+    draw(fragment, *args)
+    subset(fragment)
+    with atomic_output(path) as tmp_path:
+        fragment.save(tmp_path, deflate_fonts=True)
+    fragment.close()
+    if time.time() - _fragments_pruned > FRAGMENT_PRUNE_INTERVAL:
+        _fragments_pruned = time.time()
+        prune_fragments(keep=path)
+    return path
+
+
+def prune_fragments(max_age=FRAGMENT_MAX_AGE, max_bytes=FRAGMENT_MAX_BYTES, keep=None):
+    """Delete stale fragments (summary pages carry the date, so they go out of use daily)
+
+    Returns (fragments removed, bytes freed).
+    """
+    folder = os.path.join(CACHE_DIR, "fragments")
+    if not os.path.isdir(folder):
+        return 0, 0
+    entries = []
+    for entry in os.scandir(folder):
+        if entry.name.endswith(".pdf"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort(reverse=True)
+    cutoff = time.time() - max_age
+    removed = freed = total = 0
+    for mtime, size, path in entries:
+        if path != keep and (mtime < cutoff or total + size > max_bytes):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += size
+        else:
+            total += size
+    return removed, freed
+
+
+def insert_generated(doc, draw, *args, key):
+    """Append the pages of draw(doc, *args), from the fragment cache"""
+    # Fragments are small and used once per report: not kept open like sources
+    with fitz.open(generated_fragment(draw, args, key)) as fragment:
+        doc.insert_pdf(fragment)
+
+
+# Font size and color of the placeholder page line styles (report_model.source_section)
+_PLACEHOLDER_STYLES = {
+    "heading": (12, (0, 0, 0)),
+    "text": (11, (0, 0, 0)),
+    "link": (10, (0, 0, 0.8)),
+    "note": (10, (0.5, 0.5, 0.5)),
+}
+
+
+def draw_placeholder_page(doc, lines):
+    """Page standing in for a source that is unspecified, missing or unreadable"""
+    page = doc.new_page()
+    y = 400 if len(lines) == 1 else 380
+    for text, style in lines:
+        fontsize, color = _PLACEHOLDER_STYLES[style]
+        page.insert_text(fitz.Point(100, y), text, fontsize=fontsize, fontname="helv", color=color)
+        y += 30
+
+
+def insert_source(doc, section):
+    """Insert the referenced pages of a source section, or its placeholder page"""
+    if section["status"] == "ok":
+        try:
+            pages = None if section["pages"] is None else [p - 1 for p in section["pages"]]
+            if pages is None or pages:
+                doc.insert_pdf(open_source(prepared_section(get_file_path(section["file"]), pages)))
+        except Exception as e:
+            source_failed(section, e)
+    if section["lines"]:
+        draw_placeholder_page(doc, section["lines"])
+
+
+def render_pdf(model):
+    """Render a report model into a new (unsaved) document, filling in each section's report_pages"""
+    doc = fitz.open()
+    for section in model["sections"]:
+        first = doc.page_count
+        if section["kind"] == "summary":
+            insert_generated(doc, draw_summary_page, section, key=section_content(section))
+        elif section["kind"] == "header":
+            title = (section["title"], section["subtitle"])
+            insert_generated(doc, create_section_header, *title, key=title)
+        elif section["kind"] == "source":
+            insert_source(doc, section)
+        else:
+            insert_generated(doc, draw_comparison_page, section, key=section_content(section))
+        section["report_pages"] = [first + 1, doc.page_count] if doc.page_count > first else None
+    # One embedded Unicode font per report, however many fragments use it
+    share_unicode_font(doc)
+    return doc
+
+
+def build_report(mapping):
+    """Render the complete report for a mapping into a new (unsaved) document"""
+    return render_pdf(build_model(mapping))
+
+
+def write_report(mapping, output_folder, formats=("pdf",), linear=False, publish=None):
+    """Write a report in several formats from one model; returns {format: path}
+
+    The PDF is rendered first and paginates the model; without it the source
+    page counts are read (report_model.paginate). html and json go to the
+    html/ and json/ subfolders. publish() is asked before each file replaces
+    its predecessor (see mooc_cache.atomic_output).
+    """
+    unknown = [fmt for fmt in formats if fmt not in REPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"unknown report format(s): {', '.join(unknown)}")
+    model = build_model(mapping)
+    paths = {}
+    if "pdf" in formats:
+        doc = render_pdf(model)
+        # Save PDF (via a temporary file so a crash never leaves a truncated report)
+        output_path = format_path(model["report"], output_folder, "pdf")
+        with atomic_output(output_path, publish) as tmp_path:
+            if linear:
+                from fast_view import save_linearized
+                save_linearized(doc, tmp_path)
+            else:
+                doc.save(tmp_path)
+        doc.close()
+        paths["pdf"] = output_path
+    else:
+        paginate(model)
+    for fmt in formats:
+        if fmt != "pdf":
+            paths[fmt] = write_model(model, output_folder, fmt, publish)
+    return paths
+
+
+def generate_report(mapping, output_folder, linear=False):
+    """Generate complete PDF report for a mapping (linear: "fast web view" PDF)"""
+    return write_report(mapping, output_folder, linear=linear)["pdf"]
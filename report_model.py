@@ -0,0 +1,340 @@
+"""
+Report Model
+============
+Everything a MOOC approval report shows, as plain data built once per
+mapping: the summary tables and compliance results, the section headers,
+references to the inserted KTU and NPTEL source pages, and the comparison
+table with its verdict. Backends render from the model in one pass:
+
+    pdf   report_builder.render_pdf (PyMuPDF; fills in each section's
+          report_pages as it goes)
+    html  render_html: a self-contained page for the portal, linking each
+          source section to its pages in the PDF
+    json  render_json: the model itself, for the registrar's system
+
+Nothing here opens a PDF, so once the model exists an extra format only
+costs its serialization (well under a millisecond per report).
+
+Model layout (all values JSON types):
+
+    {"version", "semester", "ktu_code", "ktu_name", "nptel_id", "nptel_name",
+     "report" (PDF file name), "generated", "compliant", "sections": [...]}
+
+    summary     {"title", "subtitle", "tables": [{"title", "rows": [[label, value]]}],
+                 "compliance": [{"rule", "label", "text", "passed"}], "generated"}
+    header      {"title", "subtitle"}
+    source      {"role" ("ktu"/"nptel"), "file", "pages" (1-based, None = all),
+                 "status" ("ok"/"unspecified"/"missing"/"error"),
+                 "lines": [[text, style]] of the placeholder page, if any}
+    comparison  {"title", "courses", "columns", "rows": [{"ktu", "nptel", "match", "highlight"}],
+                 "overlap": {"text", "source", "stated", "computed", "minimum", "meets"},
+                 "verdict", "recommendation"}
+
+Every section has a "kind" and, once paginated, "report_pages": [first, last]
+(1-based) or None if it adds no pages.
+"""
+
+import html
+import json
+import os
+from datetime import datetime
+from urllib.parse import quote
+
+from compliance import MIN_OVERLAP, check_mapping, computed_overlap, row_percents
+from mooc_cache import atomic_output
+from mooc_mappings import SEMESTER, get_file_path, pages_in_range, report_filename
+
+MODEL_VERSION = 2
+REPORT_FORMATS = ("pdf", "html", "json")
+
+# Wording of the placeholder pages per source role (report_verifier looks for these)
+_SOURCE_TEXT = {
+    "ktu": {"key": "ktu_source", "missing": "KTU Syllabus file not found", "error": "Error loading KTU syllabus"},
+    "nptel": {"key": "nptel_pdf", "missing": "NPTEL PDF not found", "error": "Error loading NPTEL PDF"},
+}
+
+
+def summary_section(mapping, date=None):
+    """Front page: KTU and NPTEL course tables and the Section 17 compliance results"""
+    ktu_rows = [
+        ("Course Category", mapping.get('category', 'N/A')),
+        ("Course Code", mapping['ktu_code']),
+        ("Course Name", mapping['ktu_name']),
+    ]
+    nptel_rows = [
+        ("Course Name", mapping['nptel_name']),
+        ("NPTEL Subject ID", mapping.get('nptel_subject_id', 'N/A')),
+        ("Course ID", mapping['nptel_id']),
+        ("Course URL", mapping['nptel_url']),
+        ("Coordinator(s)", mapping['nptel_instructor']),
+        ("Department", mapping.get('nptel_department', 'N/A')),
+        ("Offering Institute", mapping['nptel_institute']),
+        ("Duration", mapping['nptel_duration']),
+        ("Content Type", mapping.get('nptel_content_type', 'Video')),
+        ("Prerequisites", mapping.get('nptel_prerequisites', 'N/A')),
+        ("Intended Audience", mapping.get('nptel_intended_audience', 'N/A')),
+        ("Industry Support", mapping.get('nptel_industry_support', 'N/A')),
+        ("Semester", SEMESTER),
+        ("Platform", "NPTEL/SWAYAM (AICTE Approved)"),
+    ]
+    return {
+        "kind": "summary",
+        "title": "MOOC APPROVAL REQUEST",
+        "subtitle": "As per KTU B.Tech Regulations 2024, Section 17 (MOOC)",
+        "tables": [
+            {"title": "KTU COURSE DETAILS", "rows": [[label, str(value)] for label, value in ktu_rows]},
+            {"title": "NPTEL COURSE DETAILS (from NPTEL Courses.pdf)",
+             "rows": [[label, str(value)] for label, value in nptel_rows]},
+        ],
+        "compliance": [{key: r[key] for key in ("rule", "label", "text", "passed")} for r in check_mapping(mapping)],
+        "generated": date or datetime.now().strftime('%B %d, %Y'),
+    }
+
+
+def header_section(title, subtitle=""):
+    return {"kind": "header", "title": title, "subtitle": subtitle}
+
+
+def source_section(mapping, role):
+    """Reference to the pages of the KTU curriculum or NPTEL course PDF the report inserts"""
+    text = _SOURCE_TEXT[role]
+    filename = mapping.get(text["key"])
+    pages = [p + 1 for p in mapping.get("ktu_pages") or []] if role == "ktu" else None
+    section = {"kind": "source", "role": role, "file": filename, "pages": pages, "status": "ok", "lines": []}
+    if not filename:
+        section["status"] = "unspecified"
+        if role == "ktu":
+            section["lines"] = [["KTU Syllabus source not specified.", "heading"],
+                                ["This is a general/HMC elective course.", "text"],
+                                [f"Course: {mapping['ktu_name']}", "text"]]
+        else:
+            section["lines"] = [["NPTEL course details to be obtained from:", "heading"],
+                                [mapping['nptel_url'], "link"]]
+            if mapping.get('note'):
+                section["lines"].append([f"Note: {mapping['note']}", "note"])
+    elif not os.path.exists(get_file_path(filename)):
+        section["status"] = "missing"
+        section["lines"] = [[f"{text['missing']}: {filename}", "heading"]]
+    return section
+
+
+def source_failed(section, error):
+    """Turn a source section into its error placeholder (the source could not be inserted)"""
+    section["status"] = "error"
+    section["lines"] = [[f"{_SOURCE_TEXT[section['role']]['error']}: {error}", "heading"]]
+
+
+def comparison_section(mapping):
+    """Comparison table, overall overlap against the Section 17.4 minimum and the recommendation"""
+    rows = []
+    for comp in mapping.get('comparison', []):
+        match = comp[2] if len(comp) > 2 else "✓"
+        highlight = "✓" in str(match) or int(match.replace('%', '')) >= 70
+        rows.append({"ktu": comp[0] if len(comp) > 0 else "", "nptel": comp[1] if len(comp) > 1 else "",
+                     "match": str(match), "highlight": highlight})
+    overlap = computed_overlap(mapping)
+    meets = overlap is not None and overlap >= MIN_OVERLAP
+    verdict = "meets" if meets else "does NOT meet"
+    # The verdict uses the computed overlap, so that is the value shown; the
+    # hand-entered overlap_percentage is only quoted next to its source
+    stated = mapping.get('overlap_percentage')
+    percents = row_percents(mapping)
+    if percents:
+        source = f"Computed: mean of the {len(percents)} comparison rows"
+        if stated:
+            source += f" (mapping states {stated})"
+    elif overlap is not None:
+        source = "Stated in the mapping (no comparison row gives a percentage)"
+    else:
+        source = "Unknown: neither the comparison rows nor the mapping give a percentage"
+    return {
+        "kind": "comparison",
+        "title": "SYLLABUS COMPARISON REPORT",
+        "courses": [f"KTU Course: {mapping['ktu_code']} - {mapping['ktu_name']}",
+                    f"NPTEL Course: {mapping['nptel_name']}"],
+        "columns": ["KTU SYLLABUS CONTENT", "NPTEL SYLLABUS CONTENT", "MATCH"],
+        "rows": rows,
+        "overlap": {"text": "OVERALL CONTENT OVERLAP: " + ("unknown" if overlap is None else f"{overlap:g}%"),
+                    "source": source, "stated": stated, "computed": overlap,
+                    "minimum": MIN_OVERLAP, "meets": meets},
+        "verdict": [f"VERIFICATION: The NPTEL course content {verdict} the minimum 70% overlap requirement",
+                    "as mandated by KTU B.Tech Regulations 2024, Section 17.4"],
+        "recommendation": [f"The NPTEL course '{mapping['nptel_name']}' offered by {mapping['nptel_institute']}",
+                           f"is recommended as an equivalent MOOC for the KTU course {mapping['ktu_code']}."],
+    }
+
+
+def build_model(mapping, date=None):
+    """The complete report for a mapping, in page order"""
+    summary = summary_section(mapping, date)
+    return {
+        "version": MODEL_VERSION,
+        "semester": SEMESTER,
+        "ktu_code": mapping['ktu_code'],
+        "ktu_name": mapping['ktu_name'],
+        "nptel_id": mapping['nptel_id'],
+        "nptel_name": mapping['nptel_name'],
+        "report": report_filename(mapping),
+        "generated": summary["generated"],
+        "compliant": all(r["passed"] for r in summary["compliance"]),
+        "sections": [
+            summary,
+            header_section("KTU COURSE SYLLABUS", f"{mapping['ktu_code']} - {mapping['ktu_name']}"),
+            source_section(mapping, "ktu"),
+            header_section("NPTEL COURSE SYLLABUS", mapping['nptel_name']),
+            source_section(mapping, "nptel"),
+            header_section("SYLLABUS COMPARISON", "Content Overlap Verification Report"),
+            comparison_section(mapping),
+        ],
+    }
+
+
+def section_content(section):
+    """A section without its pagination (what its pages show; the fragment cache key)"""
+    return {key: value for key, value in section.items() if key != "report_pages"}
+
+
+def paginate(model, page_counts=None):
+    """Fill in report_pages without rendering the PDF
+
+    page_counts maps a source file name to its page count; files not in it
+    are counted with preflight.inspect_pdf. A source that cannot be read
+    becomes its error placeholder, as in the PDF.
+    """
+    page_counts = dict(page_counts or {})
+    page = 1
+    for section in model["sections"]:
+        count = 1
+        if section["kind"] == "source" and section["status"] == "ok":
+            if section["file"] not in page_counts:
+                from preflight import inspect_pdf
+                page_counts[section["file"]] = inspect_pdf(section["file"])
+            total, problem = page_counts[section["file"]]
+            if total is None:
+                source_failed(section, problem)
+            elif section["pages"] is not None:
+                try:
+                    count = len(pages_in_range([p - 1 for p in section["pages"]], total))
+                except ValueError as e:
+                    source_failed(section, e)
+            else:
+                count = total
+        section["report_pages"] = [page, page + count - 1] if count else None
+        page += count
+    return model
+
+
+def render_json(model):
+    return json.dumps(model, indent=2, ensure_ascii=False)
+
+
+def _page_link(section, pdf_href):
+    pages = section.get("report_pages")
+    if not pages:
+        return ""
+    first, last = pages
+    label = f"page {first}" if first == last else f"pages {first}-{last}"
+    if pdf_href:
+        label = f'<a href="{html.escape(pdf_href)}#page={first}">{label}</a>'
+    return f" &middot; report {label}"
+
+
+def _html_summary(section):
+    parts = [f"<header><h1>{html.escape(section['title'])}</h1><p>{html.escape(section['subtitle'])}</p></header>"]
+    for table in section["tables"]:
+        rows = "".join(f"<tr><th>{html.escape(label)}</th><td>{html.escape(value)}</td></tr>"
+                       for label, value in table["rows"])
+        parts.append(f"<h2>{html.escape(table['title'])}</h2>\n<table class=\"details\">{rows}</table>")
+    rows = "".join(f'<tr class="{"pass" if r["passed"] else "fail"}"><th>{html.escape(r["label"])} '
+                   f'({html.escape(r["rule"])})</th><td>{html.escape(r["text"])} {"✓" if r["passed"] else "✗"}</td></tr>'
+                   for r in section["compliance"])
+    parts.append(f"<h2>COMPLIANCE WITH KTU REGULATIONS</h2>\n<table class=\"details\">{rows}</table>")
+    return "\n".join(parts)
+
+
+def _html_source(section, pdf_href):
+    if section["lines"]:
+        lines = "".join(f'<p class="{style}">{html.escape(text)}</p>' for text, style in section["lines"])
+        return f'<div class="placeholder">{lines}</div>'
+    if section["pages"] is None:
+        which = "all pages"
+    else:
+        which = f"page{'s' if len(section['pages']) != 1 else ''} {', '.join(map(str, section['pages']))}"
+    return f"<p>{which} of <code>{html.escape(section['file'])}</code>{_page_link(section, pdf_href)}</p>"
+
+
+def _html_comparison(section):
+    columns = "".join(f"<th>{html.escape(c)}</th>" for c in section["columns"])
+    rows = "".join(f'<tr><td>{html.escape(r["ktu"])}</td><td>{html.escape(r["nptel"])}</td>'
+                   f'<td class="{"match" if r["highlight"] else ""}">{html.escape(r["match"])}</td></tr>'
+                   for r in section["rows"])
+    overlap = section["overlap"]
+    courses = "".join(f"<p>{html.escape(line)}</p>" for line in section["courses"])
+    return (f"<h2>{html.escape(section['title'])}</h2>\n<div class=\"courses\">{courses}</div>\n"
+            f"<table class=\"comparison\"><thead><tr>{columns}</tr></thead><tbody>{rows}</tbody></table>\n"
+            f"<div class=\"overlap {'pass' if overlap['meets'] else 'fail'}\">"
+            f"<h3>{html.escape(overlap['text'])}</h3><p class=\"source\">{html.escape(overlap['source'])}</p>"
+            f"<p>{html.escape(' '.join(section['verdict']))}</p></div>\n"
+            f"<h3>RECOMMENDATION:</h3><p>{html.escape(' '.join(section['recommendation']))}</p>")
+
+
+def render_html(model, pdf_href=None):
+    """Self-contained HTML page of a report; pdf_href links the source sections to the PDF's pages"""
+    parts = []
+    for section in model["sections"]:
+        kind = section["kind"]
+        if kind == "summary":
+            parts.append(_html_summary(section))
+        elif kind == "header":
+            parts.append(f"<section><h2 class=\"section\">{html.escape(section['title'])}</h2>"
+                         f"<p class=\"sub\">{html.escape(section['subtitle'])}</p></section>")
+        elif kind == "source":
+            parts.append(_html_source(section, pdf_href))
+        else:
+            parts.append(_html_comparison(section))
+    title = html.escape(f"{model['ktu_code']} - {model['ktu_name']}")
+    pdf = f' &middot; <a href="{html.escape(pdf_href)}">PDF</a>' if pdf_href else ""
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>MOOC approval request: {title}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; max-width: 860px; margin: 20px auto; color: #222; }}
+header {{ background: #1a3366; color: #fff; padding: 10px 20px; }}
+header h1 {{ margin: 0; font-size: 24px; }} header p {{ margin: 4px 0 0; color: #ccd; font-size: 12px; }}
+h2 {{ font-size: 15px; margin: 20px 0 6px; }} h2.section {{ background: #1a3366; color: #fff; padding: 8px 12px; }}
+table {{ border-collapse: collapse; width: 100%; font-size: 12px; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 6px; text-align: left; vertical-align: top; }}
+table.details th {{ background: #f2f2f2; color: #4d4d4d; font-weight: normal; width: 30%; }}
+table.comparison thead th {{ background: #4d4d4d; color: #fff; }}
+tr.pass td, td.match, .overlap.pass {{ background: #f2fff2; color: #008000; }}
+tr.fail td, .overlap.fail {{ background: #ffeded; color: #bf0000; }}
+.overlap {{ border: 2px solid; padding: 4px 12px; margin: 16px 0; }} .overlap p {{ color: #222; }} .overlap p.source {{ color: #666; font-size: small; }}
+.sub, .note, footer {{ color: #808080; }} .link {{ color: #0000cc; }}
+.placeholder {{ border: 1px dashed #999; padding: 8px 12px; }}
+</style></head>
+<body>
+{chr(10).join(parts)}
+<footer><p>Generated: {html.escape(model['generated'])} &middot; {html.escape(model['semester'])}{pdf}</p></footer>
+</body></html>
+"""
+
+
+def format_path(report, output_folder, fmt):
+    """Where a format of a report goes: <output>/<report>.pdf, <output>/<fmt>/<report>.<fmt> otherwise"""
+    if fmt == "pdf":
+        return os.path.join(output_folder, report)
+    return os.path.join(output_folder, fmt, f"{os.path.splitext(report)[0]}.{fmt}")
+
+
+def write_model(model, output_folder, fmt, publish=None):
+    """Write the html or json form of a paginated model; returns its path (publish: see atomic_output)"""
+    path = format_path(model["report"], output_folder, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == "html":
+        # Linked as ../<report>.pdf, wherever the output folder is served from
+        text = render_html(model, pdf_href="../" + quote(model["report"]))
+    else:
+        text = render_json(model)
+    with atomic_output(path, publish) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return path
@@ -0,0 +1,304 @@
+"""
+On-Demand Report Server
+=======================
+Small local HTTP service that renders reports when they are asked for:
+
+    GET /                    JSON index of the available mappings
+    GET /report/<ktu_code>   individual report (report_builder.build_report)
+    GET /report/<ktu_code>.html, .json
+                             the same report as an HTML page or its JSON model
+    GET /proposal            principal proposal (all mappings)
+    GET /binder              proposal followed by every report, one PDF
+
+PDFs are rendered in a pool of long-lived worker processes (PyMuPDF is not
+thread-safe), each keeping its source PDFs open between requests. Rendered
+PDFs are kept in a size-bounded LRU cache keyed by the input digest of the
+mapping(s) and the date (every report prints its "Generated" date, so
+yesterday's entries are no longer served and age out of the LRU); the key
+is also the ETag: a request with a matching If-None-Match
+gets a 304 without anything being rendered. Concurrent requests for the same
+report share one render. Rendering a PDF also yields its report model, so
+the HTML and JSON forms of a rendered report are only serialized.
+
+Digests are computed in the handler threads and never open a PDF; NPTEL
+fingerprints (text_fingerprint) are refreshed once, in a worker, at start-up.
+An NPTEL PDF re-issued while the server runs counts by its bytes until then.
+
+    python generate_final_reports.py serve --port 8765
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from mooc_cache import input_digest
+from mooc_mappings import MAPPINGS, SEMESTER, UnknownMappingError, report_filename
+from report_model import render_html, render_json
+from text_fingerprint import refresh_fingerprints
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_BYTES = 256 << 20
+
+_CONTENT_TYPES = {".pdf": "application/pdf", ".html": "text/html; charset=utf-8", ".json": "application/json"}
+
+
+def _render_report(mapping):
+    """Worker: (PDF bytes, paginated report model) of one report"""
+    from report_builder import render_pdf
+    from report_model import build_model
+
+    model = build_model(mapping)
+    doc = render_pdf(model)
+    try:
+        return doc.tobytes(garbage=1, deflate=True), model
+    finally:
+        doc.close()
+
+
+def _report_model(mapping):
+    """Worker: paginated report model of one report, without rendering it"""
+    from report_model import build_model, paginate
+
+    return paginate(build_model(mapping))
+
+
+def _render_proposal(mappings):
+    """Worker: PDF bytes of the principal proposal"""
+    from generate_mooc_reports import create_principal_proposal
+
+    with tempfile.TemporaryDirectory() as folder:
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_principal_proposal(mappings, folder)
+        with open(os.path.join(folder, "MOOC_Principal_Proposal.pdf"), "rb") as f:
+            return f.read()
+
+
+def _render_binder(parts):
+    """Worker: concatenate PDFs (bytes) into one document"""
+    import fitz  # PyMuPDF
+
+    binder = fitz.open()
+    for data in parts:
+        with fitz.open("pdf", data) as part:
+            binder.insert_pdf(part)
+    try:
+        return binder.tobytes(garbage=1, deflate=True)
+    finally:
+        binder.close()
+
+
+class PdfCache:
+    """Thread-safe LRU cache of rendered PDFs, bounded by total size in bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """Cached bytes for key, calling render() (once, even if asked concurrently) on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self._pending[key] = {"done": threading.Event()}
+
+        if not owner:
+            pending["done"].wait()
+            if "error" in pending:
+                raise pending["error"]
+            return pending["data"]
+
+        try:
+            pending["data"] = data = render()
+            self.put(key, data)
+            return data
+        except Exception as e:
+            pending["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending["done"].set()
+
+    def put(self, key, data):
+        """Store bytes under key, evicting the least recently used entries"""
+        with self._lock:
+            if len(data) > self.max_bytes:
+                return
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def _set_digest(mappings):
+    sha = hashlib.sha256(SEMESTER.encode())
+    for mapping in mappings:
+        sha.update(input_digest(mapping).encode())
+    return sha.hexdigest()
+
+
+class ReportService:
+    """Renders and caches reports; shared by all request handler threads"""
+
+    def __init__(self, mappings=None, workers=None, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.mappings = MAPPINGS if mappings is None else mappings
+        self.cache = PdfCache(cache_bytes)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        # Digests are computed in handler threads and only read the fingerprint
+        # baselines; bring them up to date once, in a worker (PyMuPDF)
+        self.pool.submit(refresh_fingerprints, self.mappings).result()
+
+    def close(self):
+        self.pool.shutdown()
+
+    def report_key(self, mapping, ext=".pdf"):
+        return f"report-{date.today():%Y%m%d}-{input_digest(mapping)}" + ("" if ext == ".pdf" else ext)
+
+    def set_key(self, kind):
+        return f"{kind}-{date.today():%Y%m%d}-{_set_digest(self.mappings)}"
+
+    def report(self, mapping):
+        def render():
+            data, model = self.pool.submit(_render_report, mapping).result()
+            self.cache.put(self.report_key(mapping, ".json"), render_json(model).encode("utf-8"))
+            return data
+        return self.cache.get(self.report_key(mapping), render)
+
+    def report_json(self, mapping):
+        return self.cache.get(self.report_key(mapping, ".json"),
+                              lambda: render_json(self.pool.submit(_report_model, mapping).result()).encode("utf-8"))
+
+    def report_html(self, mapping):
+        def render():
+            model = json.loads(self.report_json(mapping))
+            return render_html(model, pdf_href=f"/report/{mapping['ktu_code']}").encode("utf-8")
+        return self.cache.get(self.report_key(mapping, ".html"), render)
+
+    def proposal(self):
+        return self.cache.get(self.set_key("proposal"),
+                              lambda: self.pool.submit(_render_proposal, self.mappings).result())
+
+    def binder(self):
+        def render():
+            # Missing reports render in parallel; cached ones are reused
+            threads = [threading.Thread(target=self.report, args=(m,)) for m in self.mappings]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            parts = [self.proposal()] + [self.report(m) for m in self.mappings]
+            return self.pool.submit(_render_binder, parts).result()
+        return self.cache.get(self.set_key("binder"), render)
+
+    def resolve(self, path):
+        """(cache key, filename, render function) for a request path, or None"""
+        parts = [unquote(p) for p in urlparse(path).path.split("/") if p]
+        if parts == ["proposal"]:
+            return self.set_key("proposal"), "MOOC_Principal_Proposal.pdf", self.proposal
+        if parts == ["binder"]:
+            return self.set_key("binder"), "MOOC_Binder.pdf", self.binder
+        if len(parts) == 2 and parts[0] == "report":
+            code, ext = os.path.splitext(parts[1])
+            if ext.lower() not in ("", ".pdf", ".html", ".json"):
+                return None
+            ext = ext.lower() or ".pdf"
+            matches = [m for m in self.mappings if m["ktu_code"].upper() == code.upper()]
+            if not matches:
+                raise UnknownMappingError(f"Unknown KTU code(s): {code}")
+            mapping = matches[0]
+            render = {".pdf": self.report, ".html": self.report_html, ".json": self.report_json}[ext]
+            filename = os.path.splitext(report_filename(mapping))[0] + ext
+            return self.report_key(mapping, ext), filename, lambda: render(mapping)
+        return None
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """GET handler; the ReportService is attached to the server as .service"""
+
+    server_version = "MOOCReportServer/1.0"
+
+    def do_GET(self):
+        service = self.server.service
+        if urlparse(self.path).path in ("", "/"):
+            return self._send_json({
+                "semester": SEMESTER,
+                "reports": [f"/report/{m['ktu_code']}" for m in service.mappings],
+                "report_formats": list(_CONTENT_TYPES),
+                "proposal": "/proposal",
+                "binder": "/binder",
+                "cache": service.cache.stats(),
+            })
+        try:
+            target = service.resolve(self.path)
+        except UnknownMappingError as e:
+            return self._send_error(404, str(e))
+        if target is None:
+            return self._send_error(404, f"no such resource: {self.path}")
+
+        key, filename, render = target
+        etag = f'"{key}"'
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        try:
+            data = render()
+        except Exception as e:
+            return self._send_error(500, f"rendering failed: {e}")
+        self.send_response(200)
+        self.send_header("Content-Type", _CONTENT_TYPES[os.path.splitext(filename)[1]])
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Disposition", f'inline; filename="{filename}"')
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, obj, status=200):
+        data = json.dumps(obj, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json({"error": message}, status)
+
+
+def create_server(host="127.0.0.1", port=DEFAULT_PORT, workers=None, cache_bytes=DEFAULT_CACHE_BYTES,
+                  mappings=None):
+    """HTTP server with a ReportService attached (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), ReportRequestHandler)
+    server.daemon_threads = True
+    server.service = ReportService(mappings, workers, cache_bytes)
+    return server
@@ -0,0 +1,150 @@
+"""
+Post-Build Verification of Generated Reports
+============================================
+Reopens every generated report and checks it against its mapping:
+
+- the file is a complete, readable PDF: ends in %%EOF, opens without
+  repairing its cross-reference table, is not encrypted and every page's
+  content can be read
+- the page count is the report model's (report_model.paginate): summary
+  + 3 section headers + comparison page + the ktu_pages the curriculum
+  has + the NPTEL PDF's page count, where a missing, unspecified or
+  unreadable source takes one placeholder page
+- no "not found" / "Error loading" placeholder pages, where the mapping
+  names a source (a course without a KTU source or NPTEL PDF is expected to
+  have one; that is noted, not failed)
+- no blank pages (nothing painted) in the KTU and NPTEL sections
+- the summary page names the KTU course code
+
+Source page counts are read once per distinct file (preflight.inspect_pdf);
+the reports are checked in a process pool, a few ms per report.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from mooc_mappings import get_file_path, report_filename
+from preflight import inspect_pdf, source_files
+from report_model import build_model, paginate
+
+# Text of the placeholder pages (report_model.source_section, drawn by report_builder):
+# (text, source key, True if the placeholder stands for an unspecified source)
+PLACEHOLDERS = (
+    ("KTU Syllabus file not found:", "ktu_source", False),
+    ("Error loading KTU syllabus:", "ktu_source", False),
+    ("KTU Syllabus source not specified.", "ktu_source", True),
+    ("NPTEL PDF not found:", "nptel_pdf", False),
+    ("Error loading NPTEL PDF:", "nptel_pdf", False),
+    ("NPTEL course details to be obtained from:", "nptel_pdf", True),
+)
+
+
+def expected_layout(mapping, page_counts):
+    """(first page, page count) of the KTU and NPTEL sections, 0-based, and the total page count
+
+    page_counts maps a source file name to preflight.inspect_pdf's
+    (page_count, problem). The layout is the report model's pagination, so
+    it skips out-of-range ktu_pages exactly as the PDF does.
+    """
+    model = paginate(build_model(mapping), page_counts)
+    layout = {"pages": 0}
+    for section in model["sections"]:
+        first, last = section["report_pages"] or (layout["pages"] + 1, layout["pages"])
+        if section["kind"] == "source":
+            layout[section["role"]] = (first - 1, last - first + 1)
+        layout["pages"] = last
+    return layout
+
+
+def _structure_problems(path):
+    """Problems visible in the file itself, before it is parsed"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return ["empty file"]
+    with open(path, "rb") as f:
+        f.seek(max(0, size - 1024))
+        if b"%%EOF" not in f.read():
+            return ["truncated: no %%EOF marker at the end"]
+    return []
+
+
+def verify_report(task):
+    """Check one report; returns a result row (see verify_reports)"""
+    import fitz  # PyMuPDF
+
+    mapping, path, layout = task
+    result = {"ktu_code": mapping["ktu_code"], "file": os.path.basename(path), "status": "fail",
+              "pages": None, "expected_pages": layout["pages"], "problems": [], "notes": []}
+    problems, notes = result["problems"], result["notes"]
+    if not os.path.exists(path):
+        problems.append("report not found")
+        return result
+    problems += _structure_problems(path)
+    try:
+        doc = fitz.open(path)
+    except Exception as e:
+        problems.append(f"cannot open: {e}")
+        return result
+    with doc:
+        if doc.is_repaired:
+            problems.append("damaged cross-reference table (repaired on open)")
+        if doc.needs_pass or doc.is_encrypted:
+            problems.append("encrypted")
+            return result
+        result["pages"] = doc.page_count
+        if mapping.get("ktu_source") and not mapping.get("ktu_pages"):
+            problems.append("KTU section is empty (no ktu_pages)")
+        if doc.page_count != layout["pages"]:
+            problems.append(f"{doc.page_count} pages, expected {layout['pages']}")
+
+        section_pages = {n for start, count in (layout["ktu"], layout["nptel"])
+                         for n in range(start, start + count)}
+        for n, page in enumerate(doc):
+            try:
+                text = page.get_text()
+                painted = n not in section_pages or page.get_bboxlog()
+            except Exception as e:
+                problems.append(f"page {n + 1}: unreadable content ({e})")
+                continue
+            if n == 0 and mapping["ktu_code"] not in text:
+                problems.append(f"page 1 is not the summary of {mapping['ktu_code']}")
+            if not painted:
+                problems.append(f"page {n + 1}: blank")
+            for placeholder, key, unspecified in PLACEHOLDERS:
+                if placeholder in text:
+                    if unspecified and not mapping.get(key):
+                        notes.append(f"page {n + 1}: no {key} (placeholder page)")
+                    else:
+                        problems.append(f"page {n + 1}: placeholder '{placeholder.rstrip(':.')}'")
+    if not problems:
+        result["status"] = "pass"
+    return result
+
+
+def verify_reports(mappings, folder, workers=None):
+    """Verify the reports of mappings in folder
+
+    Returns one row per mapping: {"ktu_code", "file", "status" ("pass"/"fail"),
+    "pages", "expected_pages", "problems": [...], "notes": [...]}.
+    """
+    files = source_files(mappings)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        page_counts = dict(zip(files, pool.map(inspect_pdf, files)))
+    tasks = [(m, os.path.join(get_file_path(folder), report_filename(m)), expected_layout(m, page_counts))
+             for m in mappings]
+    if len(tasks) < 2 or workers == 1:
+        return [verify_report(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(verify_report, tasks, chunksize=4))
+
+
+def print_verification(results):
+    """Print the pass/fail table"""
+    print(f"{'KTU code':<15}{'status':<8}{'pages':>6}{'expected':>10}   problems")
+    for row in results:
+        pages = "-" if row["pages"] is None else row["pages"]
+        mark = "✓" if row["status"] == "pass" else "✗"
+        print(f"{row['ktu_code']:<15}{mark} {row['status']:<6}{pages:>6}{row['expected_pages']:>10}   "
+              + "; ".join(row["problems"] + [f"({note})" for note in row["notes"]]))
+    failed = sum(row["status"] != "pass" for row in results)
+    print(f"{len(results) - failed}/{len(results)} reports passed")
@@ -0,0 +1,132 @@
+"""
+Full-Text Search over Mappings and Report Pages
+===============================================
+SQLite FTS5 index (.mooc_cache/search.sqlite) answering "which approved MOOC
+covers topic X?". Indexed per mapping:
+
+- mapping metadata (course names, codes, coordinators, institute, ...)
+- each comparison row
+- the text of every KTU and NPTEL page that goes into its report
+
+Every hit carries its location: source file and page, and the page number
+in the generated report. Page text comes from the cached layouts of
+text_cache. Each mapping is stored with its input digest and re-indexed
+only when the mapping or one of its source PDFs changed; generate updates
+the index for the reports it writes.
+"""
+
+import os
+import sqlite3
+
+from mooc_cache import CACHE_DIR, input_digest
+from mooc_mappings import MAPPINGS, get_file_path, pages_in_range
+from report_model import build_model, paginate
+from text_cache import document_layout, page_text
+
+SEARCH_DB = os.path.join(CACHE_DIR, "search.sqlite")
+INDEX_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed (code TEXT PRIMARY KEY, digest TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    text, code UNINDEXED, kind UNINDEXED, source UNINDEXED, page UNINDEXED,
+    report_page UNINDEXED, tokenize = 'porter unicode61'
+);
+"""
+
+_METADATA_FIELDS = ("ktu_code", "ktu_name", "category", "nptel_name", "nptel_id", "nptel_subject_id",
+                    "nptel_instructor", "nptel_department", "nptel_institute", "nptel_prerequisites",
+                    "nptel_intended_audience", "nptel_industry_support")
+
+
+def connect(db_path=SEARCH_DB):
+    """Open the search index, creating it if needed"""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)  # shard workers may update concurrently
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _source_pages(filename, pages=None):
+    """[(0-indexed page, text)] of a source PDF (all pages if pages is None)"""
+    if not filename or not os.path.exists(get_file_path(filename)):
+        return []
+    layout = document_layout(filename)
+    numbers = range(len(layout)) if pages is None else pages_in_range(pages, len(layout))
+    return [(p, page_text(layout[p])) for p in numbers]
+
+
+def mapping_chunks(mapping):
+    """Rows to index for one mapping: (text, kind, source, page, report_page)"""
+    chunks = [(" ".join(str(mapping.get(f) or "") for f in _METADATA_FIELDS), "mapping", "", None, 1)]
+
+    # Report page numbers come from the report model, as in the PDF
+    for section in paginate(build_model(mapping))["sections"]:
+        if section["kind"] == "source" and section["status"] == "ok" and section["report_pages"]:
+            pages = None if section["pages"] is None else [p - 1 for p in section["pages"]]
+            for n, (page, text) in enumerate(_source_pages(section["file"], pages)):
+                chunks.append((text, section["role"], section["file"], page + 1, section["report_pages"][0] + n))
+        elif section["kind"] == "comparison":
+            for row in mapping.get("comparison") or []:
+                chunks.append((" ".join(str(cell) for cell in row[:2]), "comparison", "", None,
+                               section["report_pages"][0]))
+    return chunks
+
+
+def update_index(mappings=None, conn=None, force=False):
+    """Re-index mappings whose inputs changed; returns the codes that were (re)indexed
+
+    Opens PDFs (PyMuPDF), so call it from one thread.
+    """
+    from text_fingerprint import refresh_fingerprints
+
+    own = conn is None
+    conn = conn or connect()
+    mappings = MAPPINGS if mappings is None else mappings
+    refresh_fingerprints(mappings)
+    known = dict(conn.execute("SELECT code, digest FROM indexed"))
+    updated = []
+    with conn:
+        for mapping in mappings:
+            code = mapping["ktu_code"]
+            digest = f"v{INDEX_VERSION}:{input_digest(mapping)}"
+            if known.get(code) == digest and not force:
+                continue
+            conn.execute("DELETE FROM chunks WHERE code = ?", (code,))
+            conn.executemany(
+                "INSERT INTO chunks (text, code, kind, source, page, report_page) VALUES (?, ?, ?, ?, ?, ?)",
+                [(text, code, kind, source, page, report_page)
+                 for text, kind, source, page, report_page in mapping_chunks(mapping)])
+            conn.execute("INSERT OR REPLACE INTO indexed VALUES (?, ?)", (code, digest))
+            updated.append(code)
+        current = {m["ktu_code"] for m in mappings}
+        if mappings is MAPPINGS or force:
+            for code in set(known) - current:
+                conn.execute("DELETE FROM chunks WHERE code = ?", (code,))
+                conn.execute("DELETE FROM indexed WHERE code = ?", (code,))
+    if own:
+        conn.close()
+    return updated
+
+
+def _fts_query(query):
+    """Quote each term so plain text ("c++", "object-oriented") is a valid FTS5 query"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(query, conn=None, limit=20):
+    """Best matches for a query: [{"code", "kind", "source", "page", "report_page", "snippet"}]"""
+    own = conn is None
+    conn = conn or connect()
+    sql = ("SELECT code, kind, source, page, report_page, "
+           "snippet(chunks, 0, '[', ']', '...', 12) FROM chunks WHERE chunks MATCH ? "
+           "ORDER BY bm25(chunks) LIMIT ?")
+    try:
+        rows = conn.execute(sql, (query, limit)).fetchall()
+    except sqlite3.OperationalError:
+        # Not valid FTS5 syntax: search for the words as plain terms
+        rows = conn.execute(sql, (_fts_query(query), limit)).fetchall()
+    if own:
+        conn.close()
+    keys = ("code", "kind", "source", "page", "report_page", "snippet")
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,170 @@
+"""
+Semester-over-Semester Diff
+===========================
+Shows what changed between two submissions, so only that needs re-review:
+
+- mappings: added / removed KTU codes and, per changed mapping, every field
+  that differs (old -> new)
+- reports: added / removed PDFs and, per changed report, the page ranges that
+  differ, found by comparing per-page content hashes (no rendering)
+
+A mapping store is a mooc_mappings.py-style file defining MAPPINGS, a JSON
+list of mappings, or "git:<rev>" for mooc_mappings.py at a git revision.
+Page hashes ignore the "Generated: <date>" footer, so a report regenerated
+from unchanged inputs compares equal.
+"""
+
+import difflib
+import json
+import os
+import runpy
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from mooc_mappings import BASE_DIR
+
+
+def load_semester_store(spec):
+    """(semester, MAPPINGS) from a .py file, a .json file or git:<rev>
+
+    The semester is the store's SEMESTER, a JSON store's "semester" key
+    ({"semester": ..., "mappings": [...]}) or else the spec itself.
+    """
+    if spec.startswith("git:"):
+        source = subprocess.run(["git", "show", f"{spec[4:]}:mooc_mappings.py"], cwd=BASE_DIR,
+                                check=True, capture_output=True, text=True).stdout
+        namespace = {"__file__": os.path.join(BASE_DIR, "mooc_mappings.py"), "__name__": "mooc_mappings_old"}
+        exec(compile(source, spec, "exec"), namespace)
+    elif spec.endswith(".json"):
+        with open(spec, encoding="utf-8") as f:
+            data = json.load(f)
+        namespace = data if isinstance(data, dict) else {"mappings": data}
+        return namespace.get("semester", spec), namespace["mappings"]
+    else:
+        namespace = runpy.run_path(spec)
+    return namespace.get("SEMESTER", spec), namespace["MAPPINGS"]
+
+
+def load_mapping_store(spec):
+    """MAPPINGS from a .py file, a .json file or git:<rev>"""
+    return load_semester_store(spec)[1]
+
+
+def _normalize(value):
+    # Tuples and lists compare equal (JSON stores have no tuples)
+    return json.loads(json.dumps(value, default=str))
+
+
+def diff_mappings(old, new):
+    """{"added": [codes], "removed": [codes], "changed": {code: {field: (old, new)}}}"""
+    old_by_code = {m["ktu_code"]: m for m in old}
+    new_by_code = {m["ktu_code"]: m for m in new}
+    changed = {}
+    for code in old_by_code.keys() & new_by_code.keys():
+        a, b = old_by_code[code], new_by_code[code]
+        fields = {}
+        for field in list(a) + [f for f in b if f not in a]:
+            before, after = _normalize(a.get(field)), _normalize(b.get(field))
+            if before != after:
+                fields[field] = (before, after)
+        if fields:
+            changed[code] = fields
+    return {
+        "added": [c for c in new_by_code if c not in old_by_code],
+        "removed": [c for c in old_by_code if c not in new_by_code],
+        "changed": {c: changed[c] for c in new_by_code if c in changed},
+    }
+
+
+def page_hashes(pdf_path):
+    """Per-page content hashes of a PDF, ignoring the generated-date footer"""
+    import fitz  # PyMuPDF
+    from previews import page_digest
+
+    with fitz.open(pdf_path) as doc:
+        return [page_digest(doc, page, ignore_volatile=True) for page in doc]
+
+
+def _ranges(start, end):
+    """1-based page range text for [start, end)"""
+    if end - start == 1:
+        return f"{start + 1}"
+    return f"{start + 1}-{end}"
+
+
+def _pages(text):
+    return f"pages {text}" if "-" in text else f"page {text}"
+
+
+def diff_pages(old_hashes, new_hashes):
+    """Page-level changes as [(kind, old pages, new pages)], kind = changed/added/removed"""
+    changes = []
+    matcher = difflib.SequenceMatcher(a=old_hashes, b=new_hashes, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "replace":
+            changes.append(("changed", _ranges(i1, i2), _ranges(j1, j2)))
+        elif tag == "delete":
+            changes.append(("removed", _ranges(i1, i2), ""))
+        elif tag == "insert":
+            changes.append(("added", "", _ranges(j1, j2)))
+    return changes
+
+
+def _pdf_files(folder):
+    return sorted(name for name in os.listdir(folder) if name.lower().endswith(".pdf"))
+
+
+def diff_outputs(old_folder, new_folder, workers=None):
+    """{"added": [files], "removed": [files], "changed": {file: [page changes]}, "unchanged": n}"""
+    old_files, new_files = set(_pdf_files(old_folder)), set(_pdf_files(new_folder))
+    common = sorted(old_files & new_files)
+    paths = [os.path.join(old_folder, f) for f in common] + [os.path.join(new_folder, f) for f in common]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(page_hashes, paths, chunksize=8))
+    old_hashes, new_hashes = hashes[:len(common)], hashes[len(common):]
+
+    changed = {}
+    for name, a, b in zip(common, old_hashes, new_hashes):
+        if a != b:
+            changed[name] = diff_pages(a, b)
+    return {
+        "added": sorted(new_files - old_files),
+        "removed": sorted(old_files - new_files),
+        "changed": changed,
+        "unchanged": len(common) - len(changed),
+    }
+
+
+def print_diff(mapping_diff=None, output_diff=None):
+    """Print a diff in review order: mappings first, then reports"""
+    if mapping_diff is not None:
+        print("MAPPINGS")
+        for code in mapping_diff["added"]:
+            print(f"  + {code}")
+        for code in mapping_diff["removed"]:
+            print(f"  - {code}")
+        for code, fields in mapping_diff["changed"].items():
+            print(f"  ~ {code}")
+            for field, (before, after) in fields.items():
+                print(f"      {field}: {json.dumps(before, ensure_ascii=False)[:70]}")
+                print(f"      {' ' * len(field)}  -> {json.dumps(after, ensure_ascii=False)[:70]}")
+        if not any(mapping_diff.values()):
+            print("  no changes")
+    if output_diff is not None:
+        print("REPORTS")
+        for name in output_diff["added"]:
+            print(f"  + {name}")
+        for name in output_diff["removed"]:
+            print(f"  - {name}")
+        for name, changes in output_diff["changed"].items():
+            print(f"  ~ {name}")
+            for kind, old_pages, new_pages in changes:
+                if kind == "changed" and old_pages == new_pages:
+                    print(f"      {_pages(old_pages)} changed")
+                elif kind == "changed":
+                    print(f"      {_pages(old_pages)} changed (now {_pages(new_pages)})")
+                elif kind == "added":
+                    print(f"      {_pages(new_pages)} added")
+                else:
+                    print(f"      {_pages(old_pages)} removed")
+        print(f"  {output_diff['unchanged']} reports unchanged")
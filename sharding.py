@@ -0,0 +1,259 @@
+"""
+Distributed Report Generation
+=============================
+Spreads the mappings over several build nodes.
+
+Shard mode (--shard i/N, i = 1..N) assigns each mapping to one node by a
+stable hash of its ktu_code, so every node computes the same split without
+coordination.
+
+Work-queue mode (--queue DIR, DIR on a shared filesystem) lets a node claim
+a mapping by atomically creating DIR/<ktu_code>.lease. Nodes work through
+their own shard first and then steal whatever is left. Leases are renewed
+while their mapping renders; leases older than the lease timeout (a crashed
+node) are taken over. A finished mapping gets a DIR/<ktu_code>.done marker.
+
+The merge step reads the checkpoint journal of every shard output folder and
+assembles the combined manifest and the principal proposal.
+
+Local test with three processes standing in for nodes:
+
+    for i in 1 2 3; do
+        python generate_final_reports.py generate --shard $i/3 --queue /tmp/q -o /tmp/out &
+    done; wait
+    python generate_final_reports.py merge /tmp/out
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+from datetime import datetime
+
+from checkpoint import CheckpointJournal
+from mooc_cache import atomic_output, file_digest
+from mooc_mappings import MAPPINGS, SEMESTER
+
+DEFAULT_LEASE_SECONDS = 600
+MANIFEST_NAME = "manifest.json"
+
+
+def parse_shard(spec):
+    """Parse "i/N" into (i, N) with 1 <= i <= N"""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/N such as 2/4")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', i must be between 1 and N")
+    return index, count
+
+
+def shard_of(ktu_code, count):
+    """Stable 1-based shard number of a mapping (independent of PYTHONHASHSEED)"""
+    digest = hashlib.sha1(ktu_code.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(mappings, index, count, steal=False):
+    """Mappings of shard `index`; with steal, the other shards' mappings follow them"""
+    own = [m for m in mappings if shard_of(m['ktu_code'], count) == index]
+    if not steal:
+        return own
+    return own + [m for m in mappings if shard_of(m['ktu_code'], count) != index]
+
+
+def default_worker_id():
+    """Identify this worker process across machines"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Lease/lock files on a shared filesystem, one per mapping
+
+    Each lease holds the worker ID and a random token. While a mapping is
+    being rendered, a heartbeat thread touches its lease every third of the
+    lease timeout, so a long render is never taken for a crashed one. A
+    worker checks owns() before publishing; a lease lost anyway (a node
+    paused past the timeout) means another worker has taken the mapping
+    over.
+    """
+
+    def __init__(self, queue_dir, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.queue_dir = queue_dir
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self._held = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+        os.makedirs(queue_dir, exist_ok=True)
+
+    def _path(self, ktu_code, suffix):
+        return os.path.join(self.queue_dir, f"{ktu_code}.{suffix}")
+
+    def _create_lease(self, ktu_code):
+        token = os.urandom(8).hex()
+        try:
+            fd = os.open(self._path(ktu_code, "lease"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{self.worker_id} {token} {datetime.now().isoformat(timespec='seconds')}\n")
+        with self._lock:
+            self._held[ktu_code] = token
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._renew_leases, daemon=True)
+                self._heartbeat.start()
+        return True
+
+    def claim(self, ktu_code):
+        """Try to take a mapping; False if it is done or leased by a live worker"""
+        if os.path.exists(self._path(ktu_code, "done")):
+            return False
+        lease_path = self._path(ktu_code, "lease")
+        if self._create_lease(ktu_code):
+            return True
+
+        # Take over a lease abandoned by a crashed worker. Only one of several
+        # competing workers wins the rename; the winner then checks it moved the
+        # very file it found stale (same inode and mtime), not a lease another
+        # worker created in between, and puts such a lease back.
+        try:
+            stale = os.stat(lease_path)
+        except FileNotFoundError:
+            return self._create_lease(ktu_code)
+        if time.time() - stale.st_mtime < self.lease_seconds:
+            return False
+        moved_path = f"{lease_path}.stale.{self.worker_id}"
+        try:
+            os.rename(lease_path, moved_path)
+        except FileNotFoundError:
+            return False
+        try:
+            moved = os.stat(moved_path)
+            if (moved.st_ino, moved.st_mtime_ns) != (stale.st_ino, stale.st_mtime_ns):
+                try:
+                    os.link(moved_path, lease_path)
+                except FileExistsError:
+                    pass  # a third worker leased it meanwhile; the owner notices in owns()
+                return False
+        finally:
+            os.remove(moved_path)
+        return self._create_lease(ktu_code)
+
+    def owns(self, ktu_code):
+        """True while this worker still holds the lease it claimed"""
+        with self._lock:
+            token = self._held.get(ktu_code)
+        if token is None:
+            return False
+        try:
+            with open(self._path(ktu_code, "lease"), encoding="utf-8") as f:
+                fields = f.read().split()
+        except FileNotFoundError:
+            return False
+        return fields[1:2] == [token]
+
+    def renew(self, ktu_code):
+        """Touch a held lease so it does not go stale; False (and forgotten) if it was lost"""
+        if self.owns(ktu_code):
+            try:
+                os.utime(self._path(ktu_code, "lease"))
+                return True
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._held.pop(ktu_code, None)
+        return False
+
+    def _renew_leases(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                codes = list(self._held)
+            for code in codes:
+                self.renew(code)
+
+    def complete(self, ktu_code):
+        """Mark a claimed mapping as finished"""
+        with open(self._path(ktu_code, "done"), "w") as f:
+            f.write(f"{self.worker_id} {datetime.now().isoformat(timespec='seconds')}\n")
+        self.release(ktu_code)
+
+    def release(self, ktu_code):
+        """Give a claimed mapping back (e.g. after an error) so others can retry it"""
+        # Never remove a lease that another worker has taken over meanwhile
+        if self.owns(ktu_code):
+            try:
+                os.remove(self._path(ktu_code, "lease"))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._held.pop(ktu_code, None)
+
+    def close(self):
+        """Stop the heartbeat (held leases then expire after the lease timeout)"""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+
+
+def merge_shards(shard_folders, output_folder, mappings=None):
+    """Collect shard outputs into output_folder; write the manifest and principal proposal
+
+    Returns (manifest, missing_codes).
+    """
+    from generate_mooc_reports import update_principal_proposal
+
+    mappings = MAPPINGS if mappings is None else mappings
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Newest completed entry per ktu_code across all shard journals
+    completed = {}
+    for folder in shard_folders:
+        for code, entry in CheckpointJournal(folder).entries.items():
+            report_path = os.path.join(folder, entry["output"])
+            if not os.path.exists(report_path):
+                continue
+            if code not in completed or entry["completed"] > completed[code][1]["completed"]:
+                completed[code] = (folder, entry)
+
+    merged_journal = CheckpointJournal(output_folder)
+    reports = []
+    missing = []
+    for mapping in mappings:
+        code = mapping['ktu_code']
+        if code not in completed:
+            missing.append(code)
+            continue
+        folder, entry = completed[code]
+        target = os.path.join(output_folder, entry["output"])
+        if os.path.abspath(folder) != os.path.abspath(output_folder):
+            with atomic_output(target) as tmp_path:
+                shutil.copy2(os.path.join(folder, entry["output"]), tmp_path)
+            merged_journal.record(code, entry["input_digest"], target)
+        reports.append({
+            "ktu_code": code,
+            "file": entry["output"],
+            "sha256": file_digest(target),
+            "input_digest": entry["input_digest"],
+            "shard": folder,
+            "completed": entry["completed"],
+        })
+
+    manifest = {
+        "semester": SEMESTER,
+        "merged": datetime.now().isoformat(timespec="seconds"),
+        "reports": reports,
+        "missing": missing,
+    }
+    with atomic_output(os.path.join(output_folder, MANIFEST_NAME)) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    done = {r["ktu_code"] for r in reports}
+    update_principal_proposal([m for m in mappings if m['ktu_code'] in done], output_folder)
+    return manifest, missing
@@ -0,0 +1,99 @@
+"""
+Cached Page Layout of Source PDFs
+=================================
+Extracts the word boxes and horizontal table rules of every page of a source
+PDF once per file version and keeps them in .mooc_cache/layout/<sha256>.json.
+Parsers (KTU syllabus tables, NPTEL course layouts, search, fingerprints)
+work on this cached layout instead of reopening the PDF.
+
+Page layout record:
+    {"width": 595.0, "height": 842.0,
+     "words": [[x0, y0, x1, y1, "text", block_no, line_no], ...],
+     "hrules": [[y, x0, x1], ...]}
+"""
+
+import json
+import os
+
+from mooc_cache import atomic_output, cache_path, file_digest
+from mooc_mappings import get_file_path
+
+LAYOUT_VERSION = 1
+
+_layout_memo = {}
+
+
+def _horizontal_rules(page):
+    """Horizontal lines and thin rectangles drawn on a page (table row borders)"""
+    rules = set()
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                if abs(p1.y - p2.y) < 1 and abs(p1.x - p2.x) > 5:
+                    rules.add((round(p1.y, 1), round(min(p1.x, p2.x), 1), round(max(p1.x, p2.x), 1)))
+            elif item[0] == "re":
+                rect = item[1]
+                if rect.height < 3 and rect.width > 5:
+                    rules.add((round(rect.y0, 1), round(rect.x0, 1), round(rect.x1, 1)))
+    return [list(rule) for rule in sorted(rules)]
+
+
+def extract_layout(path):
+    """Read word boxes and table rules of all pages of a PDF"""
+    import fitz  # PyMuPDF
+
+    pages = []
+    with fitz.open(path) as doc:
+        for page in doc:
+            words = [[round(w[0], 1), round(w[1], 1), round(w[2], 1), round(w[3], 1), w[4], w[5], w[6]]
+                     for w in page.get_text("words")]
+            pages.append({
+                "width": page.rect.width,
+                "height": page.rect.height,
+                "words": words,
+                "hrules": _horizontal_rules(page) if words else [],
+            })
+    return pages
+
+
+def document_layout(filename):
+    """Layout of every page of a source file, from the cache when the file is unchanged"""
+    path = get_file_path(filename)
+    digest = file_digest(path)
+    if digest in _layout_memo:
+        return _layout_memo[digest]
+
+    cached = cache_path("layout", f"{digest}.json")
+    pages = None
+    if os.path.exists(cached):
+        with open(cached, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == LAYOUT_VERSION:
+            pages = data["pages"]
+    if pages is None:
+        pages = extract_layout(path)
+        with atomic_output(cached) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": LAYOUT_VERSION, "file": filename, "pages": pages}, f)
+
+    _layout_memo[digest] = pages
+    return pages
+
+
+def page_lines(page_layout):
+    """Group a page's words into text lines: [(y0, x0, "line text"), ...] top to bottom"""
+    lines = {}
+    for x0, y0, x1, y1, text, block_no, line_no in page_layout["words"]:
+        lines.setdefault((block_no, line_no), []).append((x0, y0, text))
+    result = []
+    for words in lines.values():
+        words.sort()
+        result.append((min(w[1] for w in words), words[0][0], " ".join(w[2] for w in words)))
+    result.sort()
+    return result
+
+
+def page_text(page_layout):
+    """Plain text of a page, one line per text line"""
+    return "\n".join(line for _, _, line in page_lines(page_layout))
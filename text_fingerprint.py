@@ -0,0 +1,195 @@
+"""
+Text Fingerprints of NPTEL Course PDFs
+======================================
+NPTEL re-issues course PDFs with tiny edits; a new download has a new byte
+hash even when only its metadata changed. A fingerprint describes the text
+instead: per page, a MinHash signature (bottom-k: the SIGNATURE_SIZE
+smallest 64-bit hashes) of the page's word 5-grams, computed from the
+cached layout of text_cache.
+
+One baseline per nptel_subject_id is kept in .mooc_cache/fingerprints.
+compare() estimates the Jaccard similarity of every page against it in
+well under a millisecond:
+
+    unchanged   same file bytes
+    same text   new bytes, identical text (metadata, fonts, re-encoding)
+    minor       every page at least MINOR_SIMILARITY similar
+    material    pages added or removed, or a page below MINOR_SIMILARITY
+
+refresh_fingerprints() brings the baselines up to date: a version that
+differs materially becomes the new baseline, any other version is recorded
+as an accepted alias of the baseline. It opens PDFs (PyMuPDF), so it runs on
+the main thread or in a worker process, before digests are needed.
+material_key() then stands for an NPTEL PDF in input_digest(): read-only,
+without PyMuPDF, safe from any thread. It stays the baseline's key for the
+baseline and its aliases, so only material re-issues trigger report rebuilds
+and re-indexing; a version not fingerprinted yet counts by its bytes.
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from mooc_cache import atomic_output, cache_path, file_digest
+from mooc_mappings import get_file_path
+from text_cache import document_layout, page_text
+
+FINGERPRINT_VERSION = 1
+SHINGLE_WORDS = 5
+SIGNATURE_SIZE = 128
+MINOR_SIMILARITY = 0.9
+
+_WORD = re.compile(r"\w+")
+
+
+def shingle_hashes(text):
+    """64-bit hashes of the word 5-grams of a text (case and spacing ignored)"""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return set()
+    count = max(1, len(words) - SHINGLE_WORDS + 1)
+    return {int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode(), digest_size=8).digest(),
+                           "big") for i in range(count)}
+
+
+def signature(text):
+    """Bottom-k MinHash signature of a text: its SIGNATURE_SIZE smallest shingle hashes, sorted"""
+    return sorted(shingle_hashes(text))[:SIGNATURE_SIZE]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures (exact for short texts)"""
+    if not a and not b:
+        return 1.0
+    set_a, set_b = set(a), set(b)
+    union = sorted(set_a | set_b)[:SIGNATURE_SIZE]
+    return sum(h in set_a and h in set_b for h in union) / len(union)
+
+
+def fingerprint(filename):
+    """Fingerprint of a source file: {"file", "sha256", "pages": [signature per page], "key"}"""
+    pages = [signature(page_text(layout)) for layout in document_layout(filename)]
+    digest = file_digest(get_file_path(filename))
+    # Without a text layer (scanned or outlined text) only the bytes can tell versions apart
+    key = f"text:{hashlib.sha256(json.dumps(pages).encode()).hexdigest()}" if any(pages) else f"bytes:{digest}"
+    return {"version": FINGERPRINT_VERSION, "file": filename, "sha256": digest, "pages": pages, "key": key}
+
+
+def compare(baseline, current):
+    """{"status", "similarity" (lowest page), "changed_pages": [(page, similarity)], "pages": (old, new)}"""
+    old, new = baseline["pages"], current["pages"]
+    result = {"status": "unchanged", "similarity": 1.0, "changed_pages": [], "pages": (len(old), len(new))}
+    if baseline["sha256"] == current["sha256"]:
+        return result
+    if baseline["key"] == current["key"]:
+        result["status"] = "same text"
+        return result
+    if current["key"].startswith("bytes:"):
+        result["status"], result["similarity"] = "material", 0.0
+        return result
+    # Pages added or removed at the end count as entirely changed
+    scores = [similarity(a, b) for a, b in zip(old, new)] + [0.0] * abs(len(old) - len(new))
+    result["changed_pages"] = [(n + 1, score) for n, score in enumerate(scores) if score < 1.0]
+    result["similarity"] = min(scores, default=0.0)
+    material = len(old) != len(new) or result["similarity"] < MINOR_SIMILARITY
+    result["status"] = "material" if material else "minor"
+    return result
+
+
+def _baseline_path(subject_id):
+    return cache_path("fingerprints", re.sub(r"[^\w.-]+", "_", subject_id) + ".json")
+
+
+_baseline_memo = {}
+
+
+def load_baseline(subject_id):
+    """Stored baseline of a subject, or None (memoized per process on the file's mtime)"""
+    path = _baseline_path(subject_id)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _baseline_memo.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        cached = _baseline_memo[path] = (mtime, data if data.get("version") == FINGERPRINT_VERSION else None)
+    return cached[1]
+
+
+def save_baseline(subject_id, fp):
+    with atomic_output(_baseline_path(subject_id)) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(fp, subject_id=subject_id, stored=datetime.now().isoformat(timespec="seconds")), f)
+
+
+def subject_key(filename, subject_id=None):
+    """Name a fingerprint is stored under: the NPTEL subject ID, else the file name"""
+    if subject_id and subject_id != "N/A":
+        return subject_id
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def check_source(filename, subject_id=None):
+    """(baseline or None, current fingerprint, comparison or None) without storing anything
+
+    The current file is only fingerprinted when its bytes differ from the baseline's.
+    """
+    baseline = load_baseline(subject_key(filename, subject_id))
+    if baseline and baseline["sha256"] == file_digest(get_file_path(filename)):
+        return baseline, baseline, compare(baseline, baseline)
+    current = fingerprint(filename)
+    return baseline, current, compare(baseline, current) if baseline else None
+
+
+def material_key(filename, subject_id=None):
+    """Key of an NPTEL PDF that changes only with material text changes, or None if not fingerprinted
+
+    Read-only and without PyMuPDF: the baseline's key if the file is the
+    baseline or an accepted alias of it (see refresh_fingerprints).
+    """
+    baseline = load_baseline(subject_key(filename, subject_id))
+    if baseline is None:
+        return None
+    digest = file_digest(get_file_path(filename))
+    if digest == baseline["sha256"] or digest in baseline.get("aliases", ()):
+        return baseline["key"]
+    return None
+
+
+def refresh_fingerprint(filename, subject_id=None):
+    """Fingerprint a new version of an NPTEL PDF and update its baseline; returns the status
+
+    "new" and "material" versions become the baseline; "same text" and
+    "minor" ones are added to its aliases.
+    """
+    baseline, current, comparison = check_source(filename, subject_id)
+    status = comparison["status"] if comparison else "new"
+    if status in ("new", "material"):
+        save_baseline(subject_key(filename, subject_id), current)
+    elif status != "unchanged" and current["sha256"] not in baseline.get("aliases", ()):
+        aliases = baseline.get("aliases", []) + [current["sha256"]]
+        save_baseline(subject_key(filename, subject_id), dict(baseline, aliases=aliases))
+    return status
+
+
+def refresh_fingerprints(mappings):
+    """Bring the baselines of the mappings' NPTEL PDFs up to date; {file: status}
+
+    Uses PyMuPDF: call on one thread (or in a worker process) before the
+    input digests of the mappings are computed. Unreadable files are left
+    to count by their bytes.
+    """
+    statuses = {}
+    for mapping in mappings:
+        filename = mapping.get("nptel_pdf")
+        if not filename or filename in statuses or not os.path.exists(get_file_path(filename)):
+            continue
+        try:
+            statuses[filename] = refresh_fingerprint(filename, mapping.get("nptel_subject_id"))
+        except Exception as e:
+            statuses[filename] = f"error: {e}"
+    return statuses